@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Admission Flood Benchmark
+Legitimate miners on 127.0.0.1 submit shares to a pool while attackers on
+127.0.1.x flood it with connections and messages; share round-trip latency
+is compared before and during the attack, with and without admission control
+"""
+
+import os
+import sys
+import time
+import json
+import socket
+import logging
+import argparse
+import threading
+import multiprocessing
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for service_dir in ('common', 'pool'):
+    sys.path.insert(0, os.path.join(BASE_DIR, 'services', service_dir))
+
+from zerolinkchain_standin import StandInAPI
+from zerolinkchain_pool import ZeroLinkChainPool
+from zerolinkchain_admission import AdmissionController
+
+POOL_ADDRESS = 'ZLC' + 'a' * 61
+# Meets the pool's share target (difficulty 4) without being a block
+SHARE = json.dumps({'nonce': 1, 'hash': '00008' + '0' * 59}).encode() + b'\n'
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0.0
+
+def mine(port, stop, latencies, interval):
+    """A well-behaved miner: one share per interval, recording each round trip"""
+    sock = socket.create_connection(('127.0.0.1', port))
+    stream = sock.makefile('rb')
+    stream.readline()
+    while not stop.is_set():
+        start = time.perf_counter()
+        sock.sendall(SHARE)
+        stream.readline()
+        latencies.append(time.perf_counter() - start)
+        # The pool follows each result with a fresh template
+        stream.readline()
+        time.sleep(interval)
+    sock.close()
+
+def flood(port, source, deadline, counts):
+    """Reconnect and submit shares as fast as the pool answers, from one address"""
+    while time.time() < deadline:
+        counts[0] += 1
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.bind((source, 0))
+            sock.settimeout(1.0)
+            sock.connect(('127.0.0.1', port))
+            stream = sock.makefile('rb')
+            while time.time() < deadline and stream.readline():
+                sock.sendall(SHARE)
+                counts[1] += 1
+                stream.readline()
+        except OSError:
+            pass
+        finally:
+            sock.close()
+
+def attack(port, attackers, connections, seconds, results):
+    """Run in a separate process: connections flooding threads per attacking address"""
+    deadline = time.time() + seconds
+    counts = [[0, 0] for _ in range(attackers * connections)]
+    threads = [threading.Thread(target=flood, args=(port, f"127.0.1.{i // connections + 1}", deadline, counts[i]),
+                                daemon=True)
+               for i in range(attackers * connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put((sum(c[0] for c in counts), sum(c[1] for c in counts)))
+
+def run(protected=True, miners=4, attackers=32, connections=16, seconds=3.0, interval=0.02):
+    """Time legitimate shares for seconds without and then with an attack running"""
+    logging.getLogger('ZLC-Pool').setLevel(logging.ERROR)
+    if protected:
+        admission = AdmissionController()
+    else:
+        # Limits nobody reaches: every connection gets a thread
+        admission = AdmissionController(connect_rate=1e9, connect_burst=1e9, subnet_connect_rate=1e9,
+                                        subnet_connect_burst=1e9, message_rate=1e9, message_burst=1e9,
+                                        max_per_ip=10 ** 9, max_per_subnet=10 ** 9, max_connections=10 ** 9)
+    
+    with StandInAPI() as api:
+        pool = ZeroLinkChainPool(pool_address=POOL_ADDRESS, port=0, api_base=api.url, admission=admission)
+        pool.running = True
+        threading.Thread(target=pool.start_pool_server, daemon=True).start()
+        while not pool.port:
+            time.sleep(0.01)
+        
+        phases = {}
+        for phase in ('baseline', 'attack'):
+            stop = threading.Event()
+            latencies = []
+            threads = [threading.Thread(target=mine, args=(pool.port, stop, latencies, interval), daemon=True)
+                       for _ in range(miners)]
+            for thread in threads:
+                thread.start()
+            if phase == 'attack':
+                results = multiprocessing.Queue()
+                attacker = multiprocessing.Process(target=attack,
+                                                   args=(pool.port, attackers, connections, seconds, results))
+                attacker.start()
+            time.sleep(seconds)
+            stop.set()
+            for thread in threads:
+                thread.join()
+            phases[phase] = latencies
+        
+        connections, messages = results.get()
+        attacker.join()
+        stats = pool.get_pool_stats()['admission']
+        pool.running = False
+    
+    result = {'protected': protected, 'attack_connections': connections, 'attack_messages': messages,
+              'admitted': stats['admitted'], 'rejected': stats['rejected']}
+    for phase, latencies in phases.items():
+        result[f"{phase}_shares"] = len(latencies)
+        result[f"{phase}_p50_ms"] = percentile(latencies, 0.5) * 1000
+        result[f"{phase}_p99_ms"] = percentile(latencies, 0.99) * 1000
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--miners', type=int, default=4)
+    parser.add_argument('--attackers', type=int, default=32)
+    parser.add_argument('--connections', type=int, default=16, help='connections per attacking address')
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args()
+    
+    results = []
+    for protected in (True, False):
+        label = 'with admission control' if protected else 'without admission control'
+        print(f"🛡️ {args.miners} miners, {args.attackers} attacking addresses x {args.connections} connections, "
+              f"{label}...")
+        result = run(protected, args.miners, args.attackers, args.connections, args.seconds)
+        print(f"   Baseline: p50 {result['baseline_p50_ms']:.2f} ms, p99 {result['baseline_p99_ms']:.2f} ms "
+              f"({result['baseline_shares']} shares)")
+        print(f"   Attack:   p50 {result['attack_p50_ms']:.2f} ms, p99 {result['attack_p99_ms']:.2f} ms "
+              f"({result['attack_shares']} shares)")
+        print(f"   Attacker: {result['attack_connections']} connects, {result['attack_messages']} messages, "
+              f"{result['admitted']} admitted, rejected {result['rejected']}")
+        results.append(result)
+    print(json.dumps(results))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain ChainChat Benchmark
+Fills the ChainChat store with millions of messages across many users, then
+times fetching new messages, paging an inbox, unread counts and a restart
+"""
+
+import os
+import sys
+import time
+import json
+import random
+import logging
+import argparse
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'services', 'common'))
+
+from zerolinkchain_chainchat import ChainChatStore
+
+def run(messages=10000000, users=100000, batch_size=1000, queries=1000, seed=1):
+    """Append messages in batches, then time reads against the full store"""
+    logging.getLogger('ZLC-ChainChat').setLevel(logging.WARNING)
+    rng = random.Random(seed)
+    names = [f"user{i}" for i in range(users)]
+    
+    with tempfile.TemporaryDirectory() as root:
+        store = ChainChatStore(root)
+        start = time.perf_counter()
+        for batch in range(0, messages, batch_size):
+            store.send_many((names[rng.randrange(users)], names[rng.randrange(users)], f"message {i}", False)
+                            for i in range(batch, min(batch + batch_size, messages)))
+        append_seconds = time.perf_counter() - start
+        
+        # A client that is up to date polls for what arrived since its cursor
+        recipients = [names[rng.randrange(users)] for _ in range(queries)]
+        for recipient in recipients:
+            store.send('sender', recipient, 'new', False)
+        cursors = {recipient: store.inboxes[recipient][-1] - 1 for recipient in recipients}
+        start = time.perf_counter()
+        for recipient in recipients:
+            assert store.inbox(recipient, since=cursors[recipient])['messages']
+        new_seconds = (time.perf_counter() - start) / queries
+        
+        start = time.perf_counter()
+        for recipient in recipients:
+            store.inbox(recipient, limit=50)
+        page_seconds = (time.perf_counter() - start) / queries
+        
+        start = time.perf_counter()
+        for recipient in recipients:
+            store.mark_read(recipient, store.inboxes[recipient][len(store.inboxes[recipient]) // 2])
+            store.unread(recipient)
+        read_seconds = (time.perf_counter() - start) / queries
+        
+        stats = store.stats()
+        store.close()
+        start = time.perf_counter()
+        ChainChatStore(root).close()
+        load_seconds = time.perf_counter() - start
+    
+    return {
+        'messages': stats['messages'],
+        'users': users,
+        'segments': stats['segments'],
+        'store_megabytes': stats['bytes'] / 1e6,
+        'append_messages_per_second': messages / append_seconds,
+        'fetch_new_ms': new_seconds * 1000,
+        'inbox_page_ms': page_seconds * 1000,
+        'mark_read_ms': read_seconds * 1000,
+        'restart_seconds': load_seconds
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=10000000)
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--queries', type=int, default=1000)
+    args = parser.parse_args()
+    
+    print(f"💬 Storing {args.messages} messages across {args.users} users...")
+    result = run(args.messages, args.users, args.batch_size, args.queries)
+    print(f"   Append: {result['append_messages_per_second']:.0f} messages/s "
+          f"({result['store_megabytes']:.0f} MB in {result['segments']} segments)")
+    print(f"   Fetch new messages: {result['fetch_new_ms']:.3f} ms")
+    print(f"   Inbox page of 50: {result['inbox_page_ms']:.3f} ms")
+    print(f"   Mark read + unread count: {result['mark_read_ms']:.3f} ms")
+    print(f"   Restart (rebuild indexes): {result['restart_seconds']:.1f}s")
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
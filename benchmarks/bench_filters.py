@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Block Filter Benchmark
+Measures compact filter build time and size per block against the full
+block size a light client would otherwise download
+"""
+
+import os
+import sys
+import time
+import json
+import random
+import argparse
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'services', 'common'))
+
+from zerolinkchain_filters import build_filter, match_any
+
+def random_address(rng):
+    return f"ZLC{rng.getrandbits(244):061x}"
+
+def make_blocks(count, transactions_per_block, rng):
+    """Blocks of one-input, two-output transfers between random addresses"""
+    blocks = []
+    for height in range(count):
+        transactions = [{
+            'txid': f"{height}_{i}",
+            'type': 'transfer',
+            'inputs': [{'address': random_address(rng), 'amount': 5.0}],
+            'outputs': [{'address': random_address(rng), 'amount': 4.0},
+                        {'address': random_address(rng), 'amount': 1.0}]
+        } for i in range(transactions_per_block)]
+        blocks.append({'height': height, 'hash': f"{rng.getrandbits(256):064x}",
+                       'previous_hash': '0' * 64, 'timestamp': 1000 + height * 600,
+                       'transactions': transactions})
+    return blocks
+
+def run(blocks=200, transactions_per_block=100, seed=1):
+    """Build a filter per block and time a wallet scanning all of them"""
+    rng = random.Random(seed)
+    chain = make_blocks(blocks, transactions_per_block, rng)
+    
+    start = time.perf_counter()
+    filters = [build_filter(block) for block in chain]
+    build_seconds = time.perf_counter() - start
+    
+    # A wallet checks its address against every filter
+    wallet = random_address(rng)
+    start = time.perf_counter()
+    matches = sum(match_any(data, block['hash'], [wallet]) for data, block in zip(filters, chain))
+    match_seconds = time.perf_counter() - start
+    
+    filter_bytes = sum(len(data) for data in filters)
+    block_bytes = sum(len(json.dumps(block)) for block in chain)
+    return {
+        'blocks': blocks,
+        'addresses_per_block': transactions_per_block * 3,
+        'build_us_per_block': build_seconds / blocks * 1e6,
+        'match_us_per_block': match_seconds / blocks * 1e6,
+        'filter_bytes_per_block': filter_bytes / blocks,
+        'block_bytes_per_block': block_bytes / blocks,
+        'size_ratio': filter_bytes / block_bytes,
+        'false_positives': matches
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--blocks', type=int, default=200)
+    parser.add_argument('--transactions', type=int, default=100, help='transactions per block')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    print(f"🧮 Building filters for {args.blocks} blocks of {args.transactions} transactions...")
+    result = run(args.blocks, args.transactions, args.seed)
+    print(f"   Build: {result['build_us_per_block']:.0f} µs/block, "
+          f"match: {result['match_us_per_block']:.0f} µs/block")
+    print(f"   Size: {result['filter_bytes_per_block']:.0f} bytes/block vs "
+          f"{result['block_bytes_per_block']:.0f} bytes/block ({result['size_ratio'] * 100:.2f}%)")
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Metrics Benchmark
+Times counter increments and histogram observations from several threads at
+once, and how long a scrape of the result takes
+"""
+
+import os
+import sys
+import time
+import json
+import argparse
+import threading
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'services', 'common'))
+
+from zerolinkchain_metrics import Registry
+
+def record(metric, method, count, value):
+    """Call method count times"""
+    call = getattr(metric, method)
+    for _ in range(count):
+        call(value)
+
+def run(observations=1000000, threads=4):
+    """Per-call cost of inc() and observe() with threads recording concurrently"""
+    registry = Registry()
+    counter = registry.counter('zlc_bench_total')
+    histogram = registry.histogram('zlc_bench_seconds')
+    per_thread = observations // threads
+    
+    # The loop itself, to subtract from the timings
+    start = time.perf_counter()
+    for _ in range(per_thread):
+        pass
+    loop = (time.perf_counter() - start) / per_thread
+    
+    result = {'observations': per_thread * threads, 'threads': threads}
+    for name, metric, method, value in (('inc', counter, 'inc', 1), ('observe', histogram, 'observe', 0.003)):
+        workers = [threading.Thread(target=record, args=(metric, method, per_thread, value))
+                   for _ in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        # Threads take turns on the GIL, so wall time over all calls is the cost per call
+        result[f"{name}_ns"] = ((time.perf_counter() - start) / (per_thread * threads) - loop) * 1e9
+    
+    start = time.perf_counter()
+    registry.expose()
+    result['scrape_ms'] = (time.perf_counter() - start) * 1000
+    assert counter.value() == per_thread * threads
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--observations', type=int, default=1000000)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+    
+    print(f"📈 Recording {args.observations} observations from {args.threads} threads...")
+    result = run(args.observations, args.threads)
+    print(f"   Counter inc: {result['inc_ns']:.0f} ns")
+    print(f"   Histogram observe: {result['observe_ns']:.0f} ns")
+    print(f"   Scrape: {result['scrape_ms']:.3f} ms")
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Multi-Wallet Benchmark
+Measures balance refresh-cycle latency for a large keystore against the
+local API stand-in
+"""
+
+import os
+import sys
+import time
+import json
+import logging
+import argparse
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for service_dir in ('common', 'wallet'):
+    sys.path.insert(0, os.path.join(BASE_DIR, 'services', service_dir))
+
+from zerolinkchain_standin import StandInAPI
+from zerolinkchain_keystore import MultiWalletService
+
+def run(wallets=10000, latency=0.002, workers=32, batch_size=1000, api_base=None):
+    """Build a keystore of wallets and time a cold and a warm refresh cycle"""
+    logging.getLogger('ZLC-Wallet').setLevel(logging.WARNING)
+    
+    # An in-process stand-in shares the GIL with the clients; pass api_base to
+    # use one started separately with zerolinkchain_standin.py
+    api = StandInAPI(latency=latency, default_balance=1.5)
+    if not api_base:
+        api.start()
+    
+    with tempfile.TemporaryDirectory() as keystore_dir:
+        service = MultiWalletService(keystore_dir, api_base=api_base or api.url, max_workers=workers,
+                                     batch_size=batch_size)
+        
+        start = time.time()
+        for _ in range(wallets):
+            service.keystore.create()
+        create_seconds = time.time() - start
+        
+        # Cold cycle loads every wallet and opens its API session
+        cold = service.refresh_all()
+        # Warm cycle is the steady state: one balance call per wallet
+        warm = service.refresh_all()
+        
+        assert warm['errors'] == 0
+    
+    api.stop()
+    return {
+        'wallets': wallets,
+        'latency_ms': latency * 1000,
+        'workers': workers,
+        'create_seconds': create_seconds,
+        'cold_cycle_seconds': cold['cycle_seconds'],
+        'warm_cycle_seconds': warm['cycle_seconds'],
+        'warm_wallets_per_second': warm['wallets_per_second']
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--wallets', type=int, default=10000)
+    parser.add_argument('--latency', type=float, default=0.002, help='stand-in latency in seconds')
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--api-base', help='use an already running stand-in instead of an in-process one')
+    args = parser.parse_args()
+    
+    print(f"💰 Refreshing {args.wallets} wallets ({args.latency * 1000:.1f} ms upstream latency)...")
+    result = run(args.wallets, args.latency, args.workers, args.batch_size, args.api_base)
+    print(f"   Keystore built in {result['create_seconds']:.2f}s")
+    print(f"   Cold cycle: {result['cold_cycle_seconds']:.2f}s")
+    print(f"   Warm cycle: {result['warm_cycle_seconds']:.2f}s "
+          f"({result['warm_wallets_per_second']:.0f} wallets/s)")
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Real System Benchmark
+Runs the test_real_system.py workflow against an engine populated with
+100k users and thousands of hosts
+"""
+
+import os
+import sys
+import time
+import json
+import logging
+import argparse
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from zerolinkchain_real import ZeroLinkChainReal
+
+def timed(function, repeat):
+    """Mean seconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+def run(users=100000, hosts=10000, blocks=20, dead_txs=100000, difficulty=3, repeat=1000):
+    """Populate the engine, then time each call the test makes"""
+    logging.getLogger('ZLC-Real').setLevel(logging.WARNING)
+    system = ZeroLinkChainReal(difficulty=difficulty)
+    
+    start = time.perf_counter()
+    for i in range(users):
+        system.add_user(f"user{i}", is_mining=i % 100 == 0)
+    for i in range(hosts):
+        system.add_host(f"host_{i:06d}", f"City {i % 500}", 5 + i % 100, f"C{i % 60}",
+                        f"AS{i % 3000}", f"ISP {i % 800}", active=i % 10 != 0)
+    populate_seconds = time.perf_counter() - start
+    
+    status_seconds, status = timed(system.get_system_status, repeat)
+    hosts_seconds, _ = timed(lambda: system.get_hosts_data(limit=100), repeat)
+    lookup_seconds, _ = timed(lambda: system.get_user('ZLC' + '0' * 61), repeat)
+    
+    miner = next(user for user in system.users if user.is_mining)
+    start = time.perf_counter()
+    for i in range(blocks):
+        system.mine_block(f"Benchmark block {i}", miner.wallet_address)
+    mine_seconds = (time.perf_counter() - start) / blocks
+    
+    start = time.perf_counter()
+    for i in range(dead_txs):
+        system.create_dead_tx(f"user{i % users}", f"user{(i + 1) % users}", {'message': 'hi'}, 'chainchat')
+    dead_tx_seconds = (time.perf_counter() - start) / dead_txs
+    
+    status = system.get_system_status()
+    assert status['blocks_mined'] == blocks and status['dead_txs_processed'] == dead_txs
+    assert status['total_users'] == users and status['active_hosts'] == hosts - hosts // 10
+    
+    return {
+        'users': users,
+        'hosts': hosts,
+        'difficulty': difficulty,
+        'populate_seconds': populate_seconds,
+        'status_us': status_seconds * 1e6,
+        'hosts_page_us': hosts_seconds * 1e6,
+        'user_lookup_us': lookup_seconds * 1e6,
+        'mine_block_ms': mine_seconds * 1000,
+        'dead_txs_per_second': 1 / dead_tx_seconds
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--hosts', type=int, default=10000)
+    parser.add_argument('--blocks', type=int, default=20)
+    parser.add_argument('--dead-txs', type=int, default=100000)
+    parser.add_argument('--difficulty', type=int, default=3)
+    args = parser.parse_args()
+    
+    print(f"🧪 Real system with {args.users} users and {args.hosts} hosts...")
+    result = run(args.users, args.hosts, args.blocks, args.dead_txs, args.difficulty)
+    print(f"   Populate: {result['populate_seconds']:.2f}s")
+    print(f"   get_system_status: {result['status_us']:.1f} µs")
+    print(f"   get_hosts_data (100 hosts): {result['hosts_page_us']:.0f} µs")
+    print(f"   User lookup: {result['user_lookup_us']:.2f} µs")
+    print(f"   Mine block (difficulty {result['difficulty']}): {result['mine_block_ms']:.1f} ms")
+    print(f"   Dead TXs: {result['dead_txs_per_second']:.0f}/s")
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
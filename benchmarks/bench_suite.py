@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Benchmark Suite
+Times the node, pool, miner and wallet hot paths offline against a local API
+stand-in and writes the results as JSON; given a baseline from an earlier run
+it exits non-zero when any metric regressed past the threshold
+"""
+
+import os
+import sys
+import time
+import json
+import random
+import socket
+import logging
+import argparse
+import platform
+import tempfile
+import threading
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+for service_dir in ('common', 'node', 'pool', 'wallet'):
+    sys.path.insert(0, os.path.join(BASE_DIR, 'services', service_dir))
+
+from zerolinkchain_standin import StandInAPI
+from zerolinkchain_node import ZeroLinkChainNode
+from zerolinkchain_pool import ZeroLinkChainPool
+from zerolinkchain_wallet import ZeroLinkChainWallet
+from zerolinkchain_admission import AdmissionController
+from test_miner import ZeroLinkChainMiner
+
+POOL_ADDRESS = 'ZLC' + 'a' * 61
+# Metrics named like this are better higher; everything else (times) is better lower
+THROUGHPUT_SUFFIX = '_per_second'
+# Reported but not compared: sizes, and tails too noisy for a fixed threshold
+INFORMATIONAL = ('file_mb', 'p99_us')
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0.0
+
+def random_address(rng):
+    return f"ZLC{rng.getrandbits(244):061x}"
+
+def make_chain(count, transactions_per_block, rng):
+    """Linked blocks of a coinbase plus one-input, two-output transfers"""
+    blocks = []
+    previous_hash = '0' * 64
+    for height in range(count):
+        transactions = [{'txid': f"coinbase_{height}", 'type': 'coinbase', 'inputs': [],
+                         'outputs': [{'address': random_address(rng), 'amount': 10.0}]}]
+        transactions += [{
+            'txid': f"{height}_{i}",
+            'type': 'transfer',
+            'inputs': [{'address': random_address(rng), 'amount': 5.0}],
+            'outputs': [{'address': random_address(rng), 'amount': 4.0},
+                        {'address': random_address(rng), 'amount': 1.0}]
+        } for i in range(transactions_per_block - 1)]
+        block_hash = f"{rng.getrandbits(256):064x}"
+        blocks.append({'height': height, 'hash': block_hash, 'previous_hash': previous_hash,
+                       'timestamp': 1000 + height * 600, 'transactions': transactions})
+        previous_hash = block_hash
+    return blocks
+
+def bench_block_store(blocks=2000, transactions=20, batch_size=100, seed=1):
+    """Append blocks to the node's block file in batches, then load them back"""
+    chain = make_chain(blocks, transactions, random.Random(seed))
+    with tempfile.TemporaryDirectory() as data_dir:
+        node = ZeroLinkChainNode(data_dir=data_dir, port=0, api_port=0)
+        start = time.perf_counter()
+        for i in range(0, blocks, batch_size):
+            node.append_blocks(chain[i:i + batch_size])
+        append_seconds = time.perf_counter() - start
+        file_bytes = os.path.getsize(node.blockchain_file)
+        
+        # A fresh node reads the file and rebuilds every index, as on restart
+        reader = ZeroLinkChainNode(data_dir=data_dir, port=0, api_port=0)
+        start = time.perf_counter()
+        loaded = reader.load_blocks()
+        load_seconds = time.perf_counter() - start
+        assert len(loaded) == blocks
+    
+    return {
+        'append_blocks_per_second': blocks / append_seconds,
+        'load_blocks_per_second': blocks / load_seconds,
+        'file_mb': file_bytes / 1e6
+    }
+
+def bench_shares(shares=100000, seed=1):
+    """validate_share on a mix of accepted and rejected shares"""
+    rng = random.Random(seed)
+    pool = ZeroLinkChainPool(pool_address=POOL_ADDRESS, port=0, api_base='http://127.0.0.1:9/api')
+    # Three in four meet the share target (difficulty 4) without being a block; none reach the pool API
+    hashes = [('0000' if i % 4 else '0001') + f"{rng.getrandbits(240) | 1 << 239:060x}" for i in range(shares)]
+    
+    start = time.perf_counter()
+    for nonce, block_hash in enumerate(hashes):
+        pool.validate_share('bench_miner', nonce, block_hash)
+    seconds = time.perf_counter() - start
+    assert len(pool.shares) == shares - shares // 4 - (shares % 4 > 0)
+    return {'shares_per_second': shares / seconds, 'us_per_share': seconds / shares * 1e6}
+
+def bench_templates(templates=20000):
+    """create_work_template with network stats served by the stand-in (cached per stats_ttl)"""
+    with StandInAPI() as api:
+        pool = ZeroLinkChainPool(pool_address=POOL_ADDRESS, port=0, api_base=api.url, stats_ttl=60.0)
+        pool.create_work_template()
+        start = time.perf_counter()
+        for _ in range(templates):
+            pool.create_work_template()
+        seconds = time.perf_counter() - start
+    return {'templates_per_second': templates / seconds, 'us_per_template': seconds / templates * 1e6}
+
+def bench_miner():
+    """Hashes/sec of the test miner's loop against a target it never meets"""
+    miner = ZeroLinkChainMiner()
+    template = {'previous_hash': '0' * 64, 'coinbase_address': POOL_ADDRESS, 'timestamp': 1000,
+                'target': '0' * 64}
+    start = time.perf_counter()
+    miner.mine_share(template)
+    seconds = time.perf_counter() - start
+    # The full nonce range plus the fallback share
+    return {'hashes_per_second': 100001 / seconds}
+
+def bench_wallet(iterations=2000):
+    """save_wallet and load_wallet; a load also opens an API session with the stand-in"""
+    with StandInAPI() as api, tempfile.TemporaryDirectory() as data_dir:
+        wallet = ZeroLinkChainWallet(data_dir=data_dir, api_base=api.url)
+        wallet.create_wallet()
+        
+        start = time.perf_counter()
+        for i in range(iterations):
+            wallet.update_wallet(balance=float(i))
+            wallet.save_wallet()
+        save_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        for _ in range(iterations):
+            wallet.load_wallet()
+        load_seconds = time.perf_counter() - start
+        assert wallet.wallet_data['balance'] == float(iterations - 1)
+    
+    return {
+        'saves_per_second': iterations / save_seconds,
+        'loads_per_second': iterations / load_seconds
+    }
+
+def bench_p2p(messages=5000):
+    """Ping round trips over one peer connection; the node answers each with node_info"""
+    # Limits the benchmark never reaches, so it measures the handler and not the rate limit
+    admission = AdmissionController(message_rate=1e9, message_burst=1e9)
+    with tempfile.TemporaryDirectory() as data_dir:
+        node = ZeroLinkChainNode(data_dir=data_dir, port=0, api_port=0, admission=admission)
+        node.running = True
+        threading.Thread(target=node.start_p2p_server, daemon=True).start()
+        while not node.port:
+            time.sleep(0.01)
+        
+        sock = socket.create_connection(('127.0.0.1', node.port))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        stream = sock.makefile('rb')
+        stream.readline()
+        ping = json.dumps({'type': 'ping'}).encode() + b'\n'
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(messages):
+            sent = time.perf_counter()
+            sock.sendall(ping)
+            stream.readline()
+            latencies.append(time.perf_counter() - sent)
+        seconds = time.perf_counter() - start
+        
+        node.running = False
+        sock.close()
+        # Wake the accept loop so it sees running is off
+        socket.create_connection(('127.0.0.1', node.port)).close()
+    
+    return {
+        'messages_per_second': messages / seconds,
+        'p50_us': percentile(latencies, 0.5) * 1e6,
+        'p99_us': percentile(latencies, 0.99) * 1e6
+    }
+
+# Name -> (function, parameters at full and at --quick scale)
+CASES = {
+    'block_store': (bench_block_store, {'blocks': 2000}, {'blocks': 200}),
+    'validate_share': (bench_shares, {'shares': 100000}, {'shares': 10000}),
+    'work_template': (bench_templates, {'templates': 20000}, {'templates': 2000}),
+    'miner': (bench_miner, {}, {}),
+    'wallet': (bench_wallet, {'iterations': 2000}, {'iterations': 200}),
+    'p2p': (bench_p2p, {'messages': 5000}, {'messages': 500})
+}
+
+def best(runs):
+    """Per metric, the best value over repeated runs: the least disturbed by other load"""
+    merged = {}
+    for name in runs[0]:
+        values = [run[name] for run in runs]
+        merged[name] = max(values) if name.endswith(THROUGHPUT_SUFFIX) else min(values)
+    return merged
+
+def run(cases=None, quick=False, repeat=3):
+    """Run the named cases (all by default) repeat times each; returns the report"""
+    for name in ('ZLC-Node', 'ZLC-Pool', 'ZLC-Wallet', 'ZLC-Admission'):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    
+    results = {}
+    for name in cases or CASES:
+        function, full, small = CASES[name]
+        params = small if quick else full
+        results[name] = best([function(**params) for _ in range(repeat)])
+    
+    return {
+        'suite': 'zerolinkchain',
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'quick': quick,
+        'repeat': repeat,
+        'results': results
+    }
+
+def compare(report, baseline, threshold=0.2):
+    """Metrics that got worse than the baseline by more than threshold (a fraction),
+    as (case, metric, baseline value, new value, change)"""
+    regressions = []
+    for case, metrics in report['results'].items():
+        for metric, value in metrics.items():
+            old = baseline.get('results', {}).get(case, {}).get(metric)
+            if not old or metric in INFORMATIONAL:
+                continue
+            change = value / old - 1
+            worse = -change if metric.endswith(THROUGHPUT_SUFFIX) else change
+            if worse > threshold:
+                regressions.append((case, metric, old, value, change))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cases', help=f"comma-separated subset of {','.join(CASES)}")
+    parser.add_argument('--quick', action='store_true', help='a tenth of the work, for a smoke run')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per case; the best is kept')
+    parser.add_argument('--output', help='also write the JSON report here')
+    parser.add_argument('--baseline', help='report from an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown as a fraction')
+    args = parser.parse_args()
+    
+    cases = args.cases.split(',') if args.cases else None
+    unknown = set(cases or ()) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+    
+    print(f"⏱️  Running {', '.join(cases or CASES)} ({args.repeat} runs each)...")
+    report = run(cases, args.quick, args.repeat)
+    for case, metrics in report['results'].items():
+        print(f"   {case}: " + ', '.join(f"{metric}={value:.1f}" for metric, value in metrics.items()))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    
+    success = True
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('quick') != report['quick']:
+            print("⚠️  Baseline and this run differ in --quick; comparing anyway")
+        regressions = compare(report, baseline, args.threshold)
+        for case, metric, old, new, change in regressions:
+            print(f"❌ {case}.{metric}: {old:.1f} -> {new:.1f} ({change:+.0%})")
+        if regressions:
+            success = False
+        else:
+            print(f"✅ No metric regressed more than {args.threshold:.0%} against {args.baseline}")
+    
+    print(json.dumps(report))
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
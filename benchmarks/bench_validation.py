@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Block Validation Benchmark
+Measures blocks/sec validated during an initial sync, serially and through
+the parallel validation pipeline
+"""
+
+import os
+import sys
+import time
+import json
+import logging
+import argparse
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for service_dir in ('common', 'node'):
+    sys.path.insert(0, os.path.join(BASE_DIR, 'services', service_dir))
+
+from zerolinkchain_node import ZeroLinkChainNode
+from zerolinkchain_validation import ValidationPipeline, seal_block
+
+def make_chain(count, transactions_per_block, difficulty=1):
+    """Sealed blocks of transfers between a handful of addresses"""
+    addresses = [f"ZLC{i:061x}" for i in range(16)]
+    blocks = []
+    previous_hash = '0' * 64
+    for height in range(count):
+        transactions = [{'txid': f"coinbase_{height}", 'type': 'coinbase', 'inputs': [],
+                         'outputs': [{'address': addresses[height % 16], 'amount': 10.0}]}]
+        transactions += [{
+            'txid': f"tx_{height}_{i}",
+            'type': 'transfer',
+            'inputs': [{'address': addresses[i % 16], 'amount': 2.0}],
+            'outputs': [{'address': addresses[(i + 1) % 16], 'amount': 1.5},
+                        {'address': addresses[i % 16], 'amount': 0.5}]
+        } for i in range(transactions_per_block - 1)]
+        block = {'height': height, 'previous_hash': previous_hash,
+                 'timestamp': 1000 + height * 600, 'transactions': transactions}
+        previous_hash = seal_block(block, difficulty)['hash']
+        blocks.append(block)
+    return blocks
+
+def run(blocks=2000, transactions=50, workers=None, batch_size=64):
+    """Validate the same chain serially, in parallel, and as a full node import"""
+    logging.getLogger('ZLC-Node').setLevel(logging.WARNING)
+    workers = workers or os.cpu_count() or 1
+    start = time.time()
+    chain = make_chain(blocks, transactions)
+    generate_seconds = time.time() - start
+    
+    sink = []
+    serial = ValidationPipeline(workers=1, difficulty=1).validate(chain, sink.extend)
+    
+    pipeline = ValidationPipeline(workers=workers, batch_size=batch_size, difficulty=1)
+    # Warm the process pool so start-up is not counted
+    pipeline.validate(chain[:batch_size * 2], sink.extend)
+    parallel = pipeline.validate(chain, sink.extend)
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        node = ZeroLinkChainNode(data_dir=data_dir, api_port=0, difficulty=1)
+        node.validator = pipeline
+        synced = node.import_blocks(chain)
+        assert node.get_tip()['hash'] == chain[-1]['hash']
+    pipeline.close()
+    
+    return {
+        'blocks': blocks,
+        'transactions_per_block': transactions,
+        'workers': workers,
+        'generate_seconds': generate_seconds,
+        'serial_blocks_per_second': serial['blocks_per_second'],
+        'parallel_blocks_per_second': parallel['blocks_per_second'],
+        'sync_blocks_per_second': synced['blocks_per_second'],
+        'speedup': parallel['blocks_per_second'] / serial['blocks_per_second']
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--blocks', type=int, default=2000)
+    parser.add_argument('--transactions', type=int, default=50, help='transactions per block')
+    parser.add_argument('--workers', type=int, help='validation processes (default: CPU count)')
+    parser.add_argument('--batch-size', type=int, default=64)
+    args = parser.parse_args()
+    
+    print(f"🛡️ Validating {args.blocks} blocks of {args.transactions} transactions...")
+    result = run(args.blocks, args.transactions, args.workers, args.batch_size)
+    print(f"   Serial: {result['serial_blocks_per_second']:.0f} blocks/s")
+    print(f"   Pipeline ({result['workers']} workers): {result['parallel_blocks_per_second']:.0f} blocks/s "
+          f"({result['speedup']:.1f}x)")
+    print(f"   Initial sync incl. storage and indexes: {result['sync_blocks_per_second']:.0f} blocks/s")
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Admission Control
+Per-IP and per-subnet token buckets plus connection caps, checked in the
+accept loops so a flood is turned away before it costs a thread or a buffer
+"""
+
+import time
+import logging
+import ipaddress
+import threading
+
+logger = logging.getLogger('ZLC-Admission')
+
+def subnet_of(ip):
+    """The /24 of an IPv4 address or the /64 of an IPv6 one"""
+    if ':' not in ip:
+        return ip.rsplit('.', 1)[0]
+    try:
+        return str(ipaddress.ip_network(f"{ip}/64", strict=False).network_address)
+    except ValueError:
+        return ip
+
+class TokenBucket:
+    """Tokens left and when they were counted; refilled only when next used"""
+    __slots__ = ('tokens', 'updated')
+    
+    def __init__(self, tokens, updated):
+        self.tokens = tokens
+        self.updated = updated
+
+class BucketTable:
+    """Token buckets by key, split across shards so handler threads checking
+    different clients rarely wait on the same lock"""
+    
+    def __init__(self, rate, burst, shards=16, max_keys=100000):
+        self.rate = rate
+        self.burst = burst
+        self.shards = [({}, threading.Lock()) for _ in range(shards)]
+        self.shard_keys = max(max_keys // shards, 1)
+    
+    def __len__(self):
+        return sum(len(buckets) for buckets, _ in self.shards)
+    
+    def take(self, key, now, cost=1.0):
+        """Spend cost tokens from key's bucket; returns False if it has too few"""
+        buckets, lock = self.shards[hash(key) % len(self.shards)]
+        with lock:
+            bucket = buckets.get(key)
+            if bucket is None:
+                if len(buckets) >= self.shard_keys:
+                    # Forget the oldest key; at worst it comes back with a full bucket
+                    del buckets[next(iter(buckets))]
+                bucket = buckets[key] = TokenBucket(self.burst, now)
+            else:
+                bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+                bucket.updated = now
+            if bucket.tokens < cost:
+                return False
+            bucket.tokens -= cost
+            return True
+
+class AdmissionController:
+    """Decides whether a client may open a connection or send another message"""
+    
+    def __init__(self, connect_rate=1.0, connect_burst=10, subnet_connect_rate=5.0, subnet_connect_burst=50,
+                 message_rate=50.0, message_burst=200, max_per_ip=32, max_per_subnet=256,
+                 max_connections=1024, shards=16, max_keys=100000):
+        self.connects = BucketTable(connect_rate, connect_burst, shards, max_keys)
+        self.subnet_connects = BucketTable(subnet_connect_rate, subnet_connect_burst, shards, max_keys)
+        self.messages = BucketTable(message_rate, message_burst, shards, max_keys)
+        self.max_per_ip = max_per_ip
+        self.max_per_subnet = max_per_subnet
+        self.max_connections = max_connections
+        self.open_by_ip = {}
+        self.open_by_subnet = {}
+        self.open_total = 0
+        self.admitted = 0
+        self.rejected = {}
+        self.lock = threading.Lock()
+    
+    def reject(self, ip, reason):
+        """Count a refusal"""
+        with self.lock:
+            self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        logger.debug(f"Refused {ip}: {reason}")
+        return False
+    
+    def over_cap(self, ip, subnet):
+        """The connection cap ip is at, if any"""
+        if self.open_total >= self.max_connections:
+            return 'max_connections'
+        if self.open_by_ip.get(ip, 0) >= self.max_per_ip:
+            return 'ip_connections'
+        if self.open_by_subnet.get(subnet, 0) >= self.max_per_subnet:
+            return 'subnet_connections'
+        return None
+    
+    def admit(self, ip, now=None):
+        """Decide on a new connection from ip; after True the caller must
+        release(ip) when the connection closes"""
+        now = now or time.monotonic()
+        subnet = subnet_of(ip)
+        # Caps first: they cost a dict lookup and spend no tokens. Token buckets
+        # take only their shard's lock, so the global lock is held just long
+        # enough to recheck the caps and take the slot
+        reason = self.over_cap(ip, subnet)
+        if reason is None and not self.connects.take(ip, now):
+            reason = 'ip_rate'
+        if reason is None and not self.subnet_connects.take(subnet, now):
+            reason = 'subnet_rate'
+        if reason is None:
+            with self.lock:
+                reason = self.over_cap(ip, subnet)
+                if reason is None:
+                    self.open_by_ip[ip] = self.open_by_ip.get(ip, 0) + 1
+                    self.open_by_subnet[subnet] = self.open_by_subnet.get(subnet, 0) + 1
+                    self.open_total += 1
+                    self.admitted += 1
+                    return True
+        return self.reject(ip, reason)
+    
+    def release(self, ip):
+        """Give back the connection slot taken by admit(ip); returns False, changing
+        nothing, if ip holds no slot"""
+        subnet = subnet_of(ip)
+        with self.lock:
+            if not self.open_by_ip.get(ip):
+                return False
+            for counts, key in ((self.open_by_ip, ip), (self.open_by_subnet, subnet)):
+                counts[key] = counts.get(key, 0) - 1
+                if counts[key] <= 0:
+                    del counts[key]
+            self.open_total -= 1
+            return True
+    
+    def allow_message(self, ip, now=None):
+        """Spend a message token for ip; False means the client is flooding"""
+        if self.messages.take(ip, now or time.monotonic()):
+            return True
+        return self.reject(ip, 'message_rate')
+    
+    def stats(self):
+        with self.lock:
+            return {
+                'open_connections': self.open_total,
+                'clients': len(self.open_by_ip),
+                'admitted': self.admitted,
+                'rejected': dict(self.rejected),
+                'tracked_ips': len(self.connects),
+                'tracked_subnets': len(self.subnet_connects)
+            }
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain ChainChat Store
+Messages appended to JSONL segment files, with compact per-inbox and
+per-conversation indexes so reading "everything since message X" costs
+O(new messages) and unread counts are kept per inbox
+"""
+
+import os
+import json
+import time
+import bisect
+import hashlib
+import logging
+import threading
+from array import array
+
+logger = logging.getLogger('ZLC-ChainChat')
+
+def conversation_id(user_a, user_b):
+    """Stable id of the conversation between two users, whoever sent first"""
+    first, second = sorted((user_a, user_b))
+    return f"conv_{hashlib.sha256(f'{first}|{second}'.encode()).hexdigest()[:16]}"
+
+class Segment:
+    """One append-only segment file and the offset of each message in it"""
+    __slots__ = ('path', 'first_id', 'offsets', 'size', 'fd')
+    
+    def __init__(self, path, first_id):
+        self.path = path
+        self.first_id = first_id
+        self.offsets = array('Q')
+        self.size = 0
+        self.fd = None
+
+class ChainChatStore:
+    """Message log with inbox and conversation indexes kept in memory"""
+    
+    def __init__(self, root, segment_bytes=64 * 1024 * 1024, sync=False):
+        self.root = root
+        self.segment_bytes = segment_bytes
+        # fsync after each append; off by default, like the dead TX lane
+        self.sync = sync
+        self.segments = []
+        self.segment_starts = []
+        self.inboxes = {}
+        self.conversations = {}
+        self.last_read = {}
+        self.unread_counts = {}
+        self.next_id = 1
+        self.writer = None
+        self.reads_log = None
+        self.lock = threading.Lock()
+        
+        os.makedirs(root, mode=0o700, exist_ok=True)
+        self.load()
+    
+    def load(self):
+        """Rebuild the indexes from the segments and replay the read markers"""
+        names = sorted(name for name in os.listdir(self.root)
+                       if name.startswith('chat-') and name.endswith('.jsonl'))
+        for name in names:
+            segment = Segment(os.path.join(self.root, name), int(name[5:-6]))
+            with open(segment.path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        # Torn final write; the next append starts after it
+                        logger.warning(f"Ignoring partial record at the end of {name}")
+                        break
+                    record = json.loads(line)
+                    segment.offsets.append(segment.size)
+                    segment.size += len(line)
+                    self.index(record)
+                    self.next_id = record['id'] + 1
+            if segment.size != os.path.getsize(segment.path):
+                os.truncate(segment.path, segment.size)
+            segment.fd = os.open(segment.path, os.O_RDONLY)
+            self.segments.append(segment)
+            self.segment_starts.append(segment.first_id)
+        
+        reads_path = os.path.join(self.root, 'reads.jsonl')
+        if os.path.exists(reads_path):
+            with open(reads_path) as f:
+                for line in f:
+                    if line.endswith('\n'):
+                        user, message_id = json.loads(line)
+                        self.set_read(user, message_id)
+        self.reads_log = open(reads_path, 'a')
+        if self.segments:
+            self.writer = open(self.segments[-1].path, 'ab')
+        logger.info(f"ChainChat: {self.next_id - 1} messages in {len(self.segments)} segments")
+    
+    def index(self, record):
+        """Add a record to the inbox and conversation indexes (caller holds lock)"""
+        message_id = record['id']
+        recipient = record['recipient']
+        self.inboxes.setdefault(recipient, array('Q')).append(message_id)
+        self.conversations.setdefault(record['conversation'], array('Q')).append(message_id)
+        self.unread_counts[recipient] = self.unread_counts.get(recipient, 0) + 1
+    
+    def roll(self):
+        """Start a new segment at the next message id (caller holds lock)"""
+        if self.writer:
+            self.writer.close()
+        segment = Segment(os.path.join(self.root, f"chat-{self.next_id:012d}.jsonl"), self.next_id)
+        self.segments.append(segment)
+        self.segment_starts.append(segment.first_id)
+        self.writer = open(segment.path, 'ab')
+        segment.fd = os.open(segment.path, os.O_RDONLY)
+    
+    def send_many(self, messages):
+        """Append (sender, recipient, message, is_video) tuples in one write;
+        returns the stored records"""
+        now = time.time()
+        with self.lock:
+            if not self.segments or self.segments[-1].size >= self.segment_bytes:
+                self.roll()
+            segment = self.segments[-1]
+            records = []
+            lines = []
+            for sender, recipient, message, is_video in messages:
+                record = {
+                    'id': self.next_id,
+                    'sender': sender,
+                    'recipient': recipient,
+                    'conversation': conversation_id(sender, recipient),
+                    'message': message,
+                    'is_video': is_video,
+                    'timestamp': now
+                }
+                line = json.dumps(record, separators=(',', ':')).encode() + b'\n'
+                segment.offsets.append(segment.size)
+                segment.size += len(line)
+                lines.append(line)
+                records.append(record)
+                self.index(record)
+                self.next_id += 1
+            self.writer.write(b''.join(lines))
+            self.writer.flush()
+            if self.sync:
+                os.fsync(self.writer.fileno())
+        return records
+    
+    def send(self, sender, recipient, message, is_video=False):
+        """Append one message; returns its record"""
+        return self.send_many([(sender, recipient, message, is_video)])[0]
+    
+    def read_records(self, message_ids):
+        """Load records by id with one positioned read each"""
+        records = []
+        for message_id in message_ids:
+            segment = self.segments[bisect.bisect_right(self.segment_starts, message_id) - 1]
+            position = message_id - segment.first_id
+            start = segment.offsets[position]
+            end = segment.offsets[position + 1] if position + 1 < len(segment.offsets) else segment.size
+            records.append(json.loads(os.pread(segment.fd, end - start, start)))
+        return records
+    
+    def page(self, ids, since, limit):
+        """Ids after the cursor, up to limit, and the cursor of the next page"""
+        with self.lock:
+            start = bisect.bisect_right(ids, since)
+            selected = ids[start:start + max(limit, 0)]
+            more = start + len(selected) < len(ids)
+        messages = self.read_records(selected)
+        # An empty page has no last id to continue from
+        return messages, selected[-1] if more and selected else None
+    
+    def inbox(self, user, since=0, limit=100):
+        """Messages to user with id > since, oldest first"""
+        messages, next_cursor = self.page(self.inboxes.get(user, array('Q')), since, limit)
+        return {'messages': messages, 'next_cursor': next_cursor, 'unread': self.unread(user)}
+    
+    def conversation(self, user_a, user_b, since=0, limit=100):
+        """Messages between two users with id > since, oldest first"""
+        ids = self.conversations.get(conversation_id(user_a, user_b), array('Q'))
+        messages, next_cursor = self.page(ids, since, limit)
+        return {'messages': messages, 'next_cursor': next_cursor}
+    
+    def set_read(self, user, message_id):
+        """Move the read marker forward and recount unread (caller holds lock or is loading)"""
+        if message_id <= self.last_read.get(user, 0):
+            return False
+        self.last_read[user] = message_id
+        inbox = self.inboxes.get(user, array('Q'))
+        self.unread_counts[user] = len(inbox) - bisect.bisect_right(inbox, message_id)
+        return True
+    
+    def mark_read(self, user, message_id):
+        """Mark user's inbox read up to message_id; returns the unread count left"""
+        with self.lock:
+            if self.set_read(user, message_id):
+                self.reads_log.write(json.dumps([user, message_id]) + '\n')
+                self.reads_log.flush()
+            return self.unread_counts.get(user, 0)
+    
+    def unread(self, user):
+        return self.unread_counts.get(user, 0)
+    
+    def stats(self):
+        with self.lock:
+            return {
+                'messages': self.next_id - 1,
+                'segments': len(self.segments),
+                'bytes': sum(segment.size for segment in self.segments),
+                'inboxes': len(self.inboxes),
+                'conversations': len(self.conversations)
+            }
+    
+    def close(self):
+        with self.lock:
+            if self.writer:
+                self.writer.close()
+                self.writer = None
+            self.reads_log.close()
+            for segment in self.segments:
+                if segment.fd is not None:
+                    os.close(segment.fd)
+                    segment.fd = None
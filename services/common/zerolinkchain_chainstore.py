@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain ChainStore
+Content-addressed file storage: uploads are streamed through a content-defined
+chunker, each distinct chunk is stored once by hash, and files are manifests
+of chunk hashes that downloads stream back chunk by chunk
+"""
+
+import os
+import re
+import json
+import zlib
+import time
+import hashlib
+import logging
+import threading
+
+from zerolinkchain_storage import atomic_write_json, fsync_directory
+
+logger = logging.getLogger('ZLC-ChainStore')
+
+READ_SIZE = 1024 * 1024
+# Cut points end on one of these bytes (b % 64 == 10: newline, 'J', 0x8a, 0xca), so
+# candidates are found by the regex engine rather than a Python loop; 'J' keeps
+# base64 payloads as well covered as random bytes
+TRIGGER_BYTES = bytes(range(10, 256, 64))
+TRIGGER = re.compile(b'[' + re.escape(TRIGGER_BYTES) + b']')
+# Bytes before a candidate that decide whether it becomes a boundary
+WINDOW = 32
+
+class Chunker:
+    """Content-defined chunking: a trigger byte is a boundary when the CRC32 of
+    the window ending at it falls under a mask. Boundaries depend only on nearby
+    content, so an insertion early in a file only changes the chunks around it"""
+    
+    def __init__(self, min_size=16 * 1024, avg_size=64 * 1024, max_size=256 * 1024):
+        if not WINDOW <= min_size < avg_size < max_size:
+            raise ValueError(f"chunk sizes must satisfy {WINDOW} <= min < avg < max")
+        self.min_size = min_size
+        self.avg_size = avg_size
+        self.max_size = max_size
+        # Random data has a trigger byte every 64 bytes on average
+        bits = max(((avg_size - min_size) * len(TRIGGER_BYTES) // 256).bit_length() - 1, 1)
+        # Normalised chunking: harder to cut before the average size, easier after
+        self.mask_small = (1 << (bits + 1)) - 1
+        self.mask_large = (1 << max(bits - 1, 0)) - 1
+    
+    def cut(self, data, start, final):
+        """End offset of the chunk starting at start, or None if more data is needed"""
+        available = len(data) - start
+        if available < self.max_size and not final:
+            return None
+        if available <= self.min_size:
+            return len(data)
+        
+        end = start + min(available, self.max_size)
+        middle = start + self.avg_size
+        for match in TRIGGER.finditer(data, start + self.min_size - 1, end):
+            position = match.end()
+            mask = self.mask_small if position < middle else self.mask_large
+            if not zlib.crc32(data[position - WINDOW:position]) & mask:
+                return position
+        return end
+    
+    def chunks(self, stream, length=None):
+        """Yield chunks read from a file-like stream (at most length bytes)"""
+        buffer = b''
+        remaining = length
+        final = False
+        while not final:
+            size = READ_SIZE if remaining is None else min(READ_SIZE, remaining)
+            block = stream.read(size) if size else b''
+            if remaining is not None:
+                remaining -= len(block)
+            final = not block or remaining == 0
+            buffer += block
+            
+            start = 0
+            while start < len(buffer):
+                end = self.cut(buffer, start, final)
+                if end is None:
+                    break
+                yield buffer[start:end]
+                start = end
+            buffer = buffer[start:]
+
+class ChainStore:
+    """Chunks under chunks/<xx>/<hash>, manifests under manifests/<file_id>.json"""
+    
+    def __init__(self, root, chunker=None, sync=True):
+        self.root = root
+        self.chunk_dir = os.path.join(root, 'chunks')
+        self.manifest_dir = os.path.join(root, 'manifests')
+        self.chunker = chunker or Chunker()
+        # fsync each new chunk, and the directories holding it, before a manifest
+        # refers to it
+        self.sync = sync
+        self.lock = threading.Lock()
+        # Chunk hash -> [references, size]; rebuilt from the manifests on start
+        self.refs = {}
+        self.files = 0
+        self.logical_bytes = 0
+        self.stored_bytes = 0
+        self.chunk_subdirs = set()
+        
+        os.makedirs(self.chunk_dir, mode=0o700, exist_ok=True)
+        os.makedirs(self.manifest_dir, mode=0o700, exist_ok=True)
+        self.load()
+    
+    def load(self):
+        """Rebuild reference counts and totals from the manifests"""
+        for name in os.listdir(self.manifest_dir):
+            if name.endswith('.json'):
+                with open(os.path.join(self.manifest_dir, name)) as f:
+                    self.add_refs(json.load(f))
+        # Nothing is uploading yet, so leftovers of interrupted uploads can all go
+        self.sweep(tmp_age=0)
+        logger.info(f"ChainStore: {self.files} files, {self.stored_bytes} bytes stored")
+    
+    def add_refs(self, manifest):
+        """Count a manifest's chunks (caller holds lock)"""
+        self.files += 1
+        self.logical_bytes += manifest['size']
+        for chunk_hash, size in manifest['chunks']:
+            entry = self.refs.get(chunk_hash)
+            if entry is None:
+                self.refs[chunk_hash] = [1, size]
+                self.stored_bytes += size
+            else:
+                entry[0] += 1
+    
+    def chunk_path(self, chunk_hash):
+        return os.path.join(self.chunk_dir, chunk_hash[:2], chunk_hash)
+    
+    def manifest_path(self, file_id):
+        if not file_id.startswith('file_') or not file_id[5:].isalnum():
+            raise KeyError(file_id)
+        return os.path.join(self.manifest_dir, f"{file_id}.json")
+    
+    def reserve(self, chunk_hash, size):
+        """Take a reference on a chunk for an upload in progress, so a concurrent
+        delete cannot remove it; returns True if the store had no such chunk"""
+        with self.lock:
+            entry = self.refs.get(chunk_hash)
+            if entry is not None:
+                entry[0] += 1
+                return False
+            self.refs[chunk_hash] = [1, size]
+            self.stored_bytes += size
+            return True
+    
+    def release(self, chunks):
+        """Drop one reference per chunk, removing the chunks nothing uses any more"""
+        with self.lock:
+            for chunk_hash, size in chunks:
+                entry = self.refs.get(chunk_hash)
+                if entry is None:
+                    continue
+                entry[0] -= 1
+                if not entry[0]:
+                    del self.refs[chunk_hash]
+                    self.stored_bytes -= size
+                    # Under the lock, so no upload can reserve the chunk in between
+                    try:
+                        os.remove(self.chunk_path(chunk_hash))
+                    except FileNotFoundError:
+                        pass
+    
+    def write_chunk(self, chunk_hash, data):
+        """Write a chunk the caller has reserved unless its file exists; returns
+        True if it was written"""
+        path = self.chunk_path(chunk_hash)
+        if os.path.exists(path):
+            return False
+        if chunk_hash[:2] not in self.chunk_subdirs:
+            os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+            if self.sync:
+                fsync_directory(self.chunk_dir)
+            self.chunk_subdirs.add(chunk_hash[:2])
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            if self.sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return True
+    
+    def upload(self, stream, filename, uploader=None, pgp_key_id=None, length=None):
+        """Store a file read from stream; returns its manifest plus upload stats"""
+        start = time.time()
+        digest = hashlib.sha256()
+        chunks = []
+        size = 0
+        new_chunks = 0
+        new_bytes = 0
+        new_dirs = set()
+        try:
+            for data in self.chunker.chunks(stream, length):
+                chunk_hash = hashlib.sha256(data).hexdigest()
+                digest.update(data)
+                if self.reserve(chunk_hash, len(data)):
+                    new_chunks += 1
+                    new_bytes += len(data)
+                chunks.append([chunk_hash, len(data)])
+                size += len(data)
+                if self.write_chunk(chunk_hash, data):
+                    new_dirs.add(os.path.dirname(self.chunk_path(chunk_hash)))
+            
+            # Chunk contents are flushed already; flush their renames before the
+            # manifest naming them is written
+            if self.sync:
+                for directory in new_dirs:
+                    fsync_directory(directory)
+            seed = f"{digest.hexdigest()}:{filename}:{start}:{os.urandom(8).hex()}"
+            file_id = f"file_{hashlib.sha256(seed.encode()).hexdigest()[:24]}"
+            manifest = {
+                'file_id': file_id,
+                'filename': filename,
+                'uploader': uploader,
+                'pgp_key_id': pgp_key_id,
+                'size': size,
+                'sha256': digest.hexdigest(),
+                'chunks': chunks,
+                'created_at': start
+            }
+            atomic_write_json(self.manifest_path(file_id), manifest, mode=0o600)
+        except BaseException:
+            # An aborted upload gives its references back; chunks only it used go
+            self.release(chunks)
+            raise
+        # The chunk references were taken as the chunks were written
+        with self.lock:
+            self.files += 1
+            self.logical_bytes += size
+        
+        elapsed = time.time() - start
+        logger.info(f"Stored {filename} as {file_id}: {size} bytes in {len(chunks)} chunks, {new_bytes} new")
+        return dict(manifest, new_chunks=new_chunks, new_bytes=new_bytes, seconds=elapsed,
+                    mb_per_second=size / elapsed / 1e6 if elapsed else 0.0)
+    
+    def get_manifest(self, file_id):
+        """A file's manifest; raises KeyError if unknown"""
+        try:
+            with open(self.manifest_path(file_id)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(file_id)
+    
+    def read(self, file_id, verify=True):
+        """Yield a file's contents chunk by chunk; raises KeyError if unknown"""
+        manifest = self.get_manifest(file_id)
+        for chunk_hash, _ in manifest['chunks']:
+            with open(self.chunk_path(chunk_hash), 'rb') as f:
+                data = f.read()
+            if verify and hashlib.sha256(data).hexdigest() != chunk_hash:
+                raise IOError(f"Chunk {chunk_hash} of {file_id} is corrupt")
+            yield data
+    
+    def delete(self, file_id):
+        """Remove a file, and any chunks no other file uses; raises KeyError if unknown"""
+        manifest = self.get_manifest(file_id)
+        os.remove(self.manifest_path(file_id))
+        with self.lock:
+            self.files -= 1
+            self.logical_bytes -= manifest['size']
+        self.release(manifest['chunks'])
+        return manifest
+    
+    def sweep(self, tmp_age=3600):
+        """Remove chunk files no manifest or upload references, as left by a crash
+        mid-upload, and temporary files older than tmp_age seconds; returns how
+        many files were removed"""
+        removed = 0
+        cutoff = time.time() - tmp_age
+        for subdir in os.scandir(self.chunk_dir):
+            if not subdir.is_dir():
+                continue
+            for entry in os.scandir(subdir.path):
+                try:
+                    if entry.name.endswith('.tmp'):
+                        if entry.stat().st_mtime <= cutoff:
+                            os.remove(entry.path)
+                            removed += 1
+                        continue
+                    # Checked and removed under the lock, as release() does
+                    with self.lock:
+                        if entry.name not in self.refs:
+                            os.remove(entry.path)
+                            removed += 1
+                except FileNotFoundError:
+                    pass
+        if removed:
+            logger.info(f"ChainStore sweep removed {removed} unreferenced files")
+        return removed
+    
+    def stats(self):
+        with self.lock:
+            return {
+                'files': self.files,
+                'chunks': len(self.refs),
+                'logical_bytes': self.logical_bytes,
+                'stored_bytes': self.stored_bytes,
+                'dedup_ratio': self.logical_bytes / self.stored_bytes if self.stored_bytes else 1.0
+            }
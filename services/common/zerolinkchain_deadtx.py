@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Dead Transaction Lane
+Separate ingestion path for non-rewarded "dead TX" records (ChainChat
+messages, ChainStore uploads): a bounded queue drained by one writer thread
+into append-only JSONL segments with size and age based retention
+"""
+
+import os
+import json
+import time
+import queue
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger('ZLC-DeadTx')
+
+class DeadTxQueueFull(Exception):
+    """The lane is saturated; the caller should shed or retry later"""
+
+def make_dead_tx(tx_type, sender=None, recipient=None, data=None, tx_id=None):
+    """A dead TX record: stored, never rewarded, never in a block"""
+    timestamp = time.time()
+    if tx_id is None:
+        seed = f"{tx_type}:{sender}:{recipient}:{timestamp}:{os.urandom(8).hex()}"
+        tx_id = f"dead_{hashlib.sha256(seed.encode()).hexdigest()[:32]}"
+    return {
+        'tx_id': tx_id,
+        'tx_type': tx_type,
+        'sender': sender,
+        'recipient': recipient,
+        'data': data,
+        'timestamp': timestamp,
+        'is_dead': True,
+        'is_rewarded': False,
+        'affects_chain_speed': False
+    }
+
+def read_tail(path, count, block_size=64 * 1024):
+    """Up to count complete lines from the end of a file, newest first. A last
+    line without its newline is still being appended and is skipped"""
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        data = b''
+        while position > 0 and data.count(b'\n') <= count:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = data[:data.rfind(b'\n') + 1].splitlines()
+    if position > 0:
+        # Starts mid-line
+        lines = lines[1:]
+    return lines[::-1][:count]
+
+class DeadTxLane:
+    """Bounded, batched, append-only store for dead TXs"""
+    
+    def __init__(self, data_dir, max_queue=10000, batch_size=500, flush_interval=0.25,
+                 segment_bytes=16 * 1024 * 1024, retention_bytes=1024 * 1024 * 1024,
+                 retention_seconds=7 * 24 * 3600, fsync=False, retention_check_seconds=60):
+        self.data_dir = data_dir
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.segment_bytes = segment_bytes
+        self.retention_bytes = retention_bytes
+        self.retention_seconds = retention_seconds
+        # Age retention also runs this often between rotations, for quiet lanes
+        self.retention_check_seconds = retention_check_seconds
+        self.last_retention = 0.0
+        self.fsync = fsync
+        self.segment = None
+        self.segment_path = None
+        self.writer = None
+        self.start_lock = threading.Lock()
+        self.started_at = None
+        # Counters are bumped by submitting threads and the writer
+        self.lock = threading.Lock()
+        self.counters = {'submitted': 0, 'rejected': 0, 'written': 0, 'batches': 0,
+                         'bytes_written': 0, 'segments_deleted': 0, 'write_seconds': 0.0}
+        
+        os.makedirs(data_dir, mode=0o700, exist_ok=True)
+    
+    def start(self):
+        """Start the writer thread (also done by the first submit)"""
+        with self.start_lock:
+            if self.writer is None:
+                self.started_at = time.time()
+                self.writer = threading.Thread(target=self.write_loop, name='zlc-deadtx', daemon=True)
+                self.writer.start()
+    
+    def submit(self, record):
+        """Queue a record without blocking; raises DeadTxQueueFull when saturated"""
+        if self.writer is None:
+            self.start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self.lock:
+                self.counters['rejected'] += 1
+            raise DeadTxQueueFull(f"Dead TX lane full ({self.queue.maxsize} queued)")
+        with self.lock:
+            self.counters['submitted'] += 1
+        return record['tx_id']
+    
+    def stop(self, timeout=10):
+        """Write everything queued so far and stop the writer"""
+        if self.writer is None:
+            return
+        self.queue.put(None)
+        self.writer.join(timeout)
+        self.writer = None
+        if self.segment:
+            self.segment.close()
+            self.segment = None
+            self.segment_path = None
+    
+    def write_loop(self):
+        """Drain the queue in batches until stopped"""
+        while True:
+            try:
+                first = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self.expire()
+                continue
+            
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            stopping = batch[-1] is None
+            records = [record for record in batch if record is not None]
+            if records:
+                try:
+                    self.write_batch(records)
+                except Exception as e:
+                    logger.error(f"Dead TX batch of {len(records)} lost: {e}")
+            if stopping:
+                return
+            self.expire()
+    
+    def write_batch(self, records):
+        """Append records to the current segment, one write per segment touched,
+        spilling into new segments so none grows past segment_bytes (unless one record does)"""
+        start = time.time()
+        lines = [(json.dumps(record, separators=(',', ':')) + '\n').encode() for record in records]
+        
+        index = 0
+        while index < len(lines):
+            if self.segment is None or self.segment.tell() + len(lines[index]) > self.segment_bytes:
+                self.rotate()
+            room = self.segment_bytes - self.segment.tell()
+            end = index
+            size = 0
+            while end < len(lines) and (end == index or size + len(lines[end]) <= room):
+                size += len(lines[end])
+                end += 1
+            self.segment.write(b''.join(lines[index:end]))
+            self.segment.flush()
+            if self.fsync:
+                os.fsync(self.segment.fileno())
+            index = end
+        
+        with self.lock:
+            self.counters['written'] += len(records)
+            self.counters['batches'] += 1
+            self.counters['bytes_written'] += sum(len(line) for line in lines)
+            self.counters['write_seconds'] += time.time() - start
+    
+    def segments(self):
+        """Segment file names, oldest first"""
+        return sorted(name for name in os.listdir(self.data_dir)
+                      if name.startswith('deadtx-') and name.endswith('.jsonl'))
+    
+    def rotate(self):
+        """Start a new segment and apply retention to the closed ones"""
+        if self.segment:
+            self.segment.close()
+        name = f"deadtx-{time.time_ns():020d}.jsonl"
+        self.segment_path = os.path.join(self.data_dir, name)
+        self.segment = open(self.segment_path, 'ab')
+        self.apply_retention()
+    
+    def expire(self, now=None):
+        """Age retention between rotations, at most every retention_check_seconds;
+        an idle current segment past the age limit is closed so it can go too"""
+        now = now or time.time()
+        if now - self.last_retention < self.retention_check_seconds:
+            return
+        if self.segment and os.path.getmtime(self.segment_path) < now - self.retention_seconds:
+            self.segment.close()
+            self.segment = None
+            self.segment_path = None
+        self.apply_retention(now)
+    
+    def apply_retention(self, now=None):
+        """Delete the oldest closed segments beyond the size or age limits"""
+        now = now or time.time()
+        self.last_retention = now
+        paths = [os.path.join(self.data_dir, name) for name in self.segments()]
+        sizes = {path: os.path.getsize(path) for path in paths}
+        total = sum(sizes.values())
+        cutoff = now - self.retention_seconds
+        
+        for path in paths:
+            if path == self.segment_path:
+                break
+            if total <= self.retention_bytes and os.path.getmtime(path) >= cutoff:
+                break
+            os.remove(path)
+            total -= sizes[path]
+            with self.lock:
+                self.counters['segments_deleted'] += 1
+    
+    def recent(self, limit=100):
+        """Newest records first, read back from the ends of the segments"""
+        records = []
+        for name in reversed(self.segments()):
+            try:
+                lines = read_tail(os.path.join(self.data_dir, name), limit - len(records))
+            except FileNotFoundError:
+                # Removed by retention since it was listed
+                continue
+            records += [json.loads(line) for line in lines]
+            if len(records) >= limit:
+                break
+        return records
+    
+    def metrics(self):
+        """Throughput and backlog of the lane"""
+        elapsed = time.time() - self.started_at if self.started_at else 0.0
+        with self.lock:
+            metrics = dict(self.counters)
+        metrics.update({
+            'queue_depth': self.queue.qsize(),
+            'queue_capacity': self.queue.maxsize,
+            'segments': len(self.segments()),
+            'records_per_second': metrics['written'] / elapsed if elapsed else 0.0
+        })
+        return metrics
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Compact Block Filters
+Golomb-coded sets of the addresses touched by a block, small enough for a
+light client to download for every block and test locally
+"""
+
+import hashlib
+
+# Golomb-Rice parameter and false-positive rate 1/M, as in BIP158
+FILTER_P = 19
+FILTER_M = 784931
+
+def block_addresses(block):
+    """Every address paid or spent from in block"""
+    addresses = set()
+    for tx in block.get('transactions', []):
+        for entry in tx.get('inputs', []) + tx.get('outputs', []):
+            if entry.get('address'):
+                addresses.add(entry['address'])
+    return addresses
+
+def filter_key(block_hash):
+    """Per-block hashing key, so collisions differ from block to block"""
+    return hashlib.sha256(block_hash.encode()).digest()[:16]
+
+def hashed_values(items, key, count):
+    """Map items uniformly onto [0, count * M)"""
+    modulus = count * FILTER_M
+    return sorted(
+        int.from_bytes(hashlib.blake2b(item.encode(), key=key, digest_size=8).digest(), 'big')
+        * modulus >> 64
+        for item in items
+    )
+
+def write_varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+def read_varint(data, offset=0):
+    """Decode a varint; returns (value, offset past it)"""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+def build_filter(block):
+    """Serialized filter: varint item count followed by the Golomb-Rice coded deltas"""
+    items = block_addresses(block)
+    if not items:
+        return write_varint(0)
+    
+    out = bytearray(write_varint(len(items)))
+    accumulator = 0
+    bits = 0
+    previous = 0
+    mask = (1 << FILTER_P) - 1
+    for value in hashed_values(items, filter_key(block['hash']), len(items)):
+        delta = value - previous
+        previous = value
+        quotient = delta >> FILTER_P
+        # Unary quotient (ones then a zero) followed by P remainder bits
+        accumulator = (accumulator << (quotient + 1)) | (((1 << quotient) - 1) << 1)
+        accumulator = (accumulator << FILTER_P) | (delta & mask)
+        bits += quotient + 1 + FILTER_P
+        while bits >= 8:
+            bits -= 8
+            out.append((accumulator >> bits) & 0xff)
+        accumulator &= (1 << bits) - 1
+    
+    if bits:
+        out.append((accumulator << (8 - bits)) & 0xff)
+    return bytes(out)
+
+def decode_filter(data):
+    """Generator of the sorted hashed values in a serialized filter"""
+    count, offset = read_varint(data)
+    bitstring = ''.join(f"{byte:08b}" for byte in data[offset:])
+    position = 0
+    value = 0
+    for _ in range(count):
+        # Unary quotient ends at the next zero bit
+        end = bitstring.index('0', position)
+        quotient = end - position
+        position = end + 1
+        value += (quotient << FILTER_P) | int(bitstring[position:position + FILTER_P], 2)
+        position += FILTER_P
+        yield value
+
+def match_any(data, block_hash, items):
+    """Whether the filter may contain any of items (false positives at rate 1/M)"""
+    count, _ = read_varint(data)
+    if not count or not items:
+        return False
+    
+    wanted = hashed_values(items, filter_key(block_hash), count)
+    index = 0
+    # Both sides are sorted, so a single merge pass answers the query
+    for value in decode_filter(data):
+        while index < len(wanted) and wanted[index] < value:
+            index += 1
+        if index == len(wanted):
+            return False
+        if wanted[index] == value:
+            return True
+    return False
+
+def filter_header(filter_data, previous_header):
+    """Chain of filter hashes, letting clients check filters from several peers agree"""
+    filter_hash = hashlib.sha256(filter_data).digest()
+    return hashlib.sha256(filter_hash + bytes.fromhex(previous_header)).hexdigest()
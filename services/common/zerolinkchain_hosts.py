@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Host Registry
+VPN hosts kept alive by heartbeats and expired through a timer wheel, with
+per-type and per-location counters maintained as hosts come and go
+"""
+
+import time
+import bisect
+import logging
+import threading
+
+logger = logging.getLogger('ZLC-Hosts')
+
+# host_type codes used by the API
+HOST_TYPES = {1: 'found_by_chain', 2: 'joined_for_rewards', 3: 'donated'}
+# A host missing heartbeats for this long is marked inactive
+HEARTBEAT_TIMEOUT = 90
+# Fields a heartbeat may set
+HOST_FIELDS = ('host_type', 'location', 'country', 'asn', 'isp', 'bandwidth_mbps')
+
+class HostRecord:
+    """One registered host"""
+    __slots__ = ('host_id', 'host_type', 'location', 'country', 'asn', 'isp', 'bandwidth_mbps',
+                 'active', 'last_seen', 'expires_at', 'slot', 'seq')
+    
+    def __init__(self, host_id, seq):
+        self.host_id = host_id
+        self.host_type = 1
+        self.location = ''
+        self.country = ''
+        self.asn = ''
+        self.isp = ''
+        self.bandwidth_mbps = 0
+        self.active = False
+        self.last_seen = 0.0
+        self.expires_at = None
+        self.slot = None
+        self.seq = seq
+    
+    def to_dict(self):
+        return {
+            'host_id': self.host_id,
+            'host_type': self.host_type,
+            'type': HOST_TYPES.get(self.host_type, 'unknown'),
+            'location': self.location,
+            'country': self.country,
+            'asn': self.asn,
+            'isp': self.isp,
+            'bandwidth_mbps': self.bandwidth_mbps,
+            'active': self.active,
+            'last_seen': self.last_seen
+        }
+
+class TimerWheel:
+    """Deadlines bucketed by tick; advancing visits only the buckets that came due"""
+    
+    def __init__(self, horizon, tick=1.0, now=None):
+        self.tick = tick
+        # One rotation covers the longest deadline, so a due bucket holds no future entries
+        self.buckets = [set() for _ in range(int(horizon / tick) + 2)]
+        self.current = int((now or time.time()) / tick)
+    
+    def schedule(self, key, deadline):
+        """Place key in the bucket of its deadline; returns the bucket index"""
+        slot = max(int(deadline / self.tick), self.current + 1) % len(self.buckets)
+        self.buckets[slot].add(key)
+        return slot
+    
+    def cancel(self, key, slot):
+        self.buckets[slot].discard(key)
+    
+    def advance(self, now):
+        """Keys from every bucket passed since the last advance"""
+        target = int(now / self.tick)
+        due = []
+        # After a long pause one full rotation covers every bucket
+        for tick in range(max(self.current + 1, target - len(self.buckets) + 1), target + 1):
+            bucket = self.buckets[tick % len(self.buckets)]
+            due.extend(bucket)
+            bucket.clear()
+        self.current = max(self.current, target)
+        return due
+
+class HostRegistry:
+    """Hosts by id, with running counters and registration-order pagination"""
+    
+    def __init__(self, timeout=HEARTBEAT_TIMEOUT, tick=1.0, on_change=None):
+        self.timeout = timeout
+        self.wheel = TimerWheel(timeout, tick)
+        # on_change(record) runs whenever a host becomes active or inactive
+        self.on_change = on_change
+        self.hosts = {}
+        # Registration sequence numbers, ascending, for cursors; removed hosts
+        # leave holes that are skipped and compacted lazily
+        self.order = []
+        self.by_seq = {}
+        self.next_seq = 1
+        self.active_count = 0
+        self.active_bandwidth = 0
+        self.type_counts = {}
+        self.location_counts = {}
+        self.lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self.hosts)
+    
+    def __contains__(self, host_id):
+        return host_id in self.hosts
+    
+    def get(self, host_id):
+        return self.hosts.get(host_id)
+    
+    def count(self, record, sign):
+        """Add (1) or remove (-1) a record from the counters (caller holds lock)"""
+        totals = self.type_counts.setdefault(record.host_type, {'total': 0, 'active': 0})
+        totals['total'] += sign
+        if record.active:
+            totals['active'] += sign
+            self.active_count += sign
+            self.active_bandwidth += sign * record.bandwidth_mbps
+            self.location_counts[record.location] = self.location_counts.get(record.location, 0) + sign
+            if not self.location_counts[record.location]:
+                del self.location_counts[record.location]
+    
+    def heartbeat(self, host_id, now=None, **details):
+        """Register or refresh a host and mark it active until the next deadline.
+        details may set host_type, location, country, asn, isp and bandwidth_mbps.
+        Raises ValueError, leaving the registry untouched, on a bad field"""
+        # Checked up front: counters and the wheel are updated in place below
+        for field, value in details.items():
+            if field not in HOST_FIELDS:
+                raise ValueError(f"Unknown host field: {field}")
+            if field in ('host_type', 'bandwidth_mbps') and (isinstance(value, bool) or
+                                                            not isinstance(value, (int, float))):
+                raise ValueError(f"{field} must be a number, got {value!r}")
+        now = now or time.time()
+        with self.lock:
+            record = self.hosts.get(host_id)
+            if record is None:
+                record = HostRecord(host_id, self.next_seq)
+                self.next_seq += 1
+                self.hosts[host_id] = record
+                self.order.append(record.seq)
+                self.by_seq[record.seq] = host_id
+                was_active = None
+            else:
+                self.count(record, -1)
+                was_active = record.active
+                if record.slot is not None:
+                    self.wheel.cancel(host_id, record.slot)
+            
+            for field, value in details.items():
+                setattr(record, field, value)
+            record.active = True
+            record.last_seen = now
+            record.expires_at = now + self.timeout if self.timeout else None
+            record.slot = self.wheel.schedule(host_id, record.expires_at) if self.timeout else None
+            self.count(record, 1)
+        
+        if self.on_change and (not was_active or details):
+            self.on_change(record)
+        return record
+    
+    def set_active(self, host_id, active, now=None):
+        """Mark a host up (as a heartbeat) or down; returns False if unknown"""
+        if active:
+            if host_id not in self.hosts:
+                return False
+            self.heartbeat(host_id, now)
+            return True
+        
+        with self.lock:
+            record = self.hosts.get(host_id)
+            if record is None:
+                return False
+            changed = self.deactivate(record)
+        if changed and self.on_change:
+            self.on_change(record)
+        return True
+    
+    def deactivate(self, record):
+        """Mark a record inactive (caller holds lock); returns False if it already was"""
+        if not record.active:
+            return False
+        self.count(record, -1)
+        record.active = False
+        if record.slot is not None:
+            self.wheel.cancel(record.host_id, record.slot)
+            record.slot = None
+        self.count(record, 1)
+        return True
+    
+    def remove(self, host_id):
+        """Forget a host; returns the removed record or None"""
+        with self.lock:
+            record = self.hosts.pop(host_id, None)
+            if record is None:
+                return None
+            was_active = record.active
+            self.count(record, -1)
+            if record.slot is not None:
+                self.wheel.cancel(host_id, record.slot)
+            del self.by_seq[record.seq]
+            if len(self.order) > 2 * len(self.by_seq) + 1024:
+                self.order = [seq for seq in self.order if seq in self.by_seq]
+            record.active = False
+        if was_active and self.on_change:
+            self.on_change(record)
+        return record
+    
+    def expire(self, now=None):
+        """Deactivate hosts whose heartbeat deadline passed; costs O(due hosts)"""
+        now = now or time.time()
+        expired = []
+        with self.lock:
+            for host_id in self.wheel.advance(now):
+                record = self.hosts.get(host_id)
+                if record is None or not record.active:
+                    continue
+                if record.expires_at > now:
+                    # Deadline falls later within the same tick
+                    record.slot = self.wheel.schedule(host_id, record.expires_at)
+                    continue
+                record.slot = None
+                self.deactivate(record)
+                expired.append(record)
+        
+        for record in expired:
+            logger.info(f"Host {record.host_id} missed its heartbeat")
+            if self.on_change:
+                self.on_change(record)
+        return expired
+    
+    def list_hosts(self, cursor=None, limit=100, active_only=False):
+        """A page of hosts in registration order after cursor, plus the cursor of
+        the next page (None at the end)"""
+        with self.lock:
+            page = []
+            position = bisect.bisect_right(self.order, cursor or 0)
+            while position < len(self.order) and (limit is None or len(page) < limit):
+                host_id = self.by_seq.get(self.order[position])
+                position += 1
+                if host_id is None:
+                    continue
+                record = self.hosts[host_id]
+                if active_only and not record.active:
+                    continue
+                page.append(record)
+            
+            # The last page may come back empty if only removed hosts followed
+            return {
+                'hosts': [record.to_dict() for record in page],
+                'next_cursor': page[-1].seq if page and position < len(self.order) else None
+            }
+    
+    def counts(self, locations=True):
+        """Totals by state, type and (optionally) location, all maintained incrementally"""
+        with self.lock:
+            counts = {
+                'total': len(self.hosts),
+                'active': self.active_count,
+                'active_bandwidth': self.active_bandwidth,
+                'types': {HOST_TYPES.get(host_type, str(host_type)): dict(totals)
+                          for host_type, totals in self.type_counts.items()}
+            }
+            if locations:
+                counts['locations'] = dict(self.location_counts)
+            return counts
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Shared HTTP Client
+Pooled keep-alive sessions, response caching, concurrent fan-out and
+per-host circuit breaking for calls to the ZeroLinkChain API
+"""
+
+import os
+import time
+import threading
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from zerolinkchain_metrics import REGISTRY
+
+upstream_latency = {method: REGISTRY.histogram('zlc_upstream_request_seconds', 'Upstream API request time',
+                                                method=method)
+                    for method in ('GET', 'POST')}
+upstream_cache_hits = REGISTRY.counter('zlc_upstream_cache_hits_total', 'Upstream GETs answered from the cache')
+upstream_errors = REGISTRY.counter('zlc_upstream_errors_total', 'Upstream requests that failed or returned 5xx')
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of calling a host whose circuit is open"""
+
+class CircuitBreaker:
+    """Fails fast after repeated errors, probes again after a cool-down"""
+    
+    def __init__(self, failure_threshold=3, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+    
+    def allow(self):
+        """Whether a call may go through (one probe is let through when half-open)"""
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Half-open: let this call probe, keep others failing fast
+                self.opened_at = time.monotonic()
+                return True
+            return False
+    
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+    
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+    
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+class ZeroLinkChainHTTPClient:
+    """Thread-safe HTTP client shared by the services"""
+    
+    def __init__(self, pool_connections=4, pool_maxsize=8, timeout=(3.05, 10),
+                 max_workers=8, failure_threshold=3, reset_timeout=30.0):
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        
+        # pool_block caps concurrent connections per host at pool_maxsize
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                              max_retries=0, pool_block=True)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Re-reading proxy/CA settings from the environment on every request costs
+        # more than a local round trip; skip it when there is nothing to pick up
+        if not requests.utils.getproxies() and not any(
+                os.environ.get(name) for name in ('REQUESTS_CA_BUNDLE', 'CURL_CA_BUNDLE')):
+            self.session.trust_env = False
+        
+        self.breakers = {}
+        self.cache = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='zlc-http')
+    
+    def get_breaker(self, url):
+        """Circuit breaker for the host serving url"""
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        with self.lock:
+            breaker = self.breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self.breakers[host] = breaker
+            return breaker
+    
+    def request(self, method, url, headers=None, json=None, timeout=None, ttl=0):
+        """Perform a request; successful GETs are cached for ttl seconds"""
+        cache_key = None
+        if method == 'GET' and ttl > 0:
+            cache_key = (url, (headers or {}).get('Authorization'))
+            cached = self.cache.get(cache_key)
+            if cached and cached[0] > time.monotonic():
+                upstream_cache_hits.inc()
+                return cached[1]
+        
+        breaker = self.get_breaker(url)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {url}")
+        
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, headers=headers, json=json,
+                                            timeout=timeout or self.timeout)
+        except requests.RequestException:
+            upstream_errors.inc()
+            breaker.record_failure()
+            raise
+        finally:
+            if method in upstream_latency:
+                upstream_latency[method].observe(time.perf_counter() - start)
+        
+        if response.status_code >= 500:
+            upstream_errors.inc()
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+            if cache_key and response.status_code == 200:
+                self.cache[cache_key] = (time.monotonic() + ttl, response)
+        
+        return response
+    
+    def get(self, url, headers=None, timeout=None, ttl=0):
+        return self.request('GET', url, headers=headers, timeout=timeout, ttl=ttl)
+    
+    def post(self, url, json=None, headers=None, timeout=None):
+        return self.request('POST', url, headers=headers, json=json, timeout=timeout)
+    
+    def fan_out(self, calls, return_exceptions=False):
+        """Run independent (method, url, kwargs) calls concurrently, results in order"""
+        futures = [
+            self.executor.submit(self.request, method, url, **kwargs)
+            for method, url, kwargs in calls
+        ]
+        
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+    
+    def invalidate(self, url=None):
+        """Drop cached responses, for one URL or all of them"""
+        with self.lock:
+            if url is None:
+                self.cache.clear()
+            else:
+                for key in [key for key in self.cache if key[0] == url]:
+                    del self.cache[key]
+    
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.session.close()
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Process-wide shared client"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ZeroLinkChainHTTPClient()
+        return _client
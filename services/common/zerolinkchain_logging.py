@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Logging
+Services log through a queue: the calling thread only enqueues the record and
+a background listener formats it and writes it to the console and log file.
+Repeated per-event messages are rate limited, and hot paths can sample them
+"""
+
+import os
+import sys
+import queue
+import atexit
+import logging
+import itertools
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_DIR = '/var/log'
+
+class Sampler:
+    """True for one call in every `every`; next() on a count needs no lock"""
+    
+    def __init__(self, every=1):
+        self.every = max(int(every), 1)
+        self.counter = itertools.count()
+    
+    def __call__(self):
+        return next(self.counter) % self.every == 0
+
+class RateLimitFilter(logging.Filter):
+    """Lets each message template through rate times per second after a burst.
+    Records above max_level always pass. The next record let through notes how
+    many were dropped. Keyed on the unformatted message, so per-event messages
+    should pass their values as % args rather than in an f-string"""
+    
+    def __init__(self, rate=5.0, burst=20, max_level=logging.WARNING, max_keys=10000):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.max_level = max_level
+        self.max_keys = max_keys
+        # (logger name, template) -> [tokens, last update, dropped since last pass]
+        self.buckets = {}
+        self.suppressed = 0
+        self.lock = threading.Lock()
+    
+    def filter(self, record):
+        if record.levelno > self.max_level or not isinstance(record.msg, str):
+            return True
+        key = (record.name, record.msg)
+        now = record.created
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                if len(self.buckets) >= self.max_keys:
+                    # f-string messages never repeat; start over rather than grow
+                    self.buckets.clear()
+                bucket = self.buckets[key] = [self.burst, now, 0]
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                self.suppressed += 1
+                return False
+            bucket[0] -= 1
+            dropped, bucket[2] = bucket[2], 0
+        if dropped:
+            record.msg = f"{record.msg} ({dropped} similar messages suppressed)"
+        return True
+
+class BackgroundHandler(QueueHandler):
+    """Enqueues records as they are and drops them when the queue is full,
+    so a slow disk never blocks the thread that logged"""
+    
+    def __init__(self, records):
+        super().__init__(records)
+        self.dropped = 0
+    
+    def prepare(self, record):
+        # Leave formatting to the listener thread; args must not be mutated
+        # after logging, which holds for the strings and numbers services log
+        return record
+    
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class BackgroundListener(QueueListener):
+    """Writes queued records to the real handlers from its own thread"""
+    
+    def enqueue_sentinel(self):
+        # Wait for room rather than fail: the listener is draining the queue
+        self.queue.put(self._sentinel)
+    
+    def stop(self):
+        """Write what is queued and stop; a second call does nothing"""
+        if self._thread is not None:
+            super().stop()
+
+def setup_logging(service, level=None, log_file=None, queue_size=10000, rate=5.0, burst=20):
+    """Route every logger through a queue to the console and the service log
+    (ZLC_LOG_FILE, default /var/log/zerolinkchain-<service>.log) at ZLC_LOG_LEVEL
+    (default INFO); returns the listener, which is stopped and flushed at exit"""
+    level = level or os.environ.get('ZLC_LOG_LEVEL', 'INFO').upper()
+    log_file = log_file or os.environ.get('ZLC_LOG_FILE') or os.path.join(LOG_DIR, f"zerolinkchain-{service}.log")
+    
+    handlers = []
+    try:
+        handlers.append(logging.FileHandler(log_file))
+    except OSError as e:
+        print(f"Cannot open {log_file}, logging to the console only: {e}", file=sys.stderr)
+    handlers.append(logging.StreamHandler())
+    formatter = logging.Formatter(LOG_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    records = queue.Queue(queue_size)
+    handler = BackgroundHandler(records)
+    handler.addFilter(RateLimitFilter(rate, burst))
+    root = logging.getLogger()
+    for old in root.handlers[:]:
+        root.removeHandler(old)
+    root.addHandler(handler)
+    root.setLevel(level)
+    
+    listener = BackgroundListener(records, *handlers)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Merkle Trees
+Merkle commitments over block transactions, with an index from txid to block
+position and cached tree levels for serving inclusion proofs
+"""
+
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+def leaf_hash(tx):
+    """Leaf hash of a transaction (domain-separated from inner nodes)"""
+    data = json.dumps(tx, sort_keys=True, separators=(',', ':')).encode()
+    return hashlib.sha256(b'\x00' + data).digest()
+
+def node_hash(left, right):
+    return hashlib.sha256(b'\x01' + left + right).digest()
+
+def merkle_levels(leaves):
+    """All tree levels from the leaves up to the root; an odd last node is carried up"""
+    levels = [list(leaves) or [hashlib.sha256(b'').digest()]]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parent = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parent.append(level[-1])
+        levels.append(parent)
+    return levels
+
+def block_levels(block):
+    return merkle_levels([leaf_hash(tx) for tx in block.get('transactions', [])])
+
+def merkle_proof(levels, index):
+    """Sibling path for leaf index as [side, hash] pairs, side being where the sibling sits"""
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(['left' if sibling < index else 'right', level[sibling].hex()])
+        index //= 2
+    return proof
+
+def verify_proof(leaf, proof, root):
+    """Check a proof from merkle_proof against a hex root"""
+    current = leaf
+    for side, sibling in proof:
+        sibling = bytes.fromhex(sibling)
+        current = node_hash(sibling, current) if side == 'left' else node_hash(current, sibling)
+    return current.hex() == root
+
+class MerkleIndex:
+    """Roots per height, txid -> (height, index), and an LRU of recent trees"""
+    
+    def __init__(self, cache_size=256):
+        self.cache_size = cache_size
+        self.roots = []
+        self.txids = {}
+        self.levels = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def add_block(self, block, levels=None):
+        """Index a block appended at the tip; levels may be prebuilt outside any lock"""
+        levels = levels or block_levels(block)
+        with self.lock:
+            self.roots.append(levels[-1][0].hex())
+            for index, tx in enumerate(block.get('transactions', [])):
+                self.txids[tx.get('txid') or levels[0][index].hex()] = (block['height'], index)
+            self.cache(block['hash'], levels)
+    
+    def remove_block(self, block):
+        """Drop the tip block from the index"""
+        with self.lock:
+            self.roots.pop()
+            for index, tx in enumerate(block.get('transactions', [])):
+                txid = tx.get('txid') or leaf_hash(tx).hex()
+                if self.txids.get(txid) == (block['height'], index):
+                    del self.txids[txid]
+            self.levels.pop(block['hash'], None)
+    
+    def cache(self, block_hash, levels):
+        """Remember a block's levels (caller holds lock)"""
+        self.levels[block_hash] = levels
+        self.levels.move_to_end(block_hash)
+        while len(self.levels) > self.cache_size:
+            self.levels.popitem(last=False)
+    
+    def locate(self, txid):
+        """(height, index) of a transaction, or None"""
+        with self.lock:
+            return self.txids.get(txid)
+    
+    def proof(self, txid, block, index):
+        """Inclusion proof for txid at index in block, rebuilding the tree if it is
+        not cached. The caller locates txid, so a reorg in between cannot lose it"""
+        with self.lock:
+            levels = self.levels.get(block['hash'])
+            if levels is not None:
+                self.levels.move_to_end(block['hash'])
+        if levels is None:
+            levels = block_levels(block)
+            with self.lock:
+                self.cache(block['hash'], levels)
+        
+        return {
+            'txid': txid,
+            'height': block['height'],
+            'block_hash': block['hash'],
+            'index': index,
+            'leaf': levels[0][index].hex(),
+            'merkle_root': levels[-1][0].hex(),
+            'proof': merkle_proof(levels, index)
+        }
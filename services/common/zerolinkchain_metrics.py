@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Metrics
+Counters and fixed-bucket latency histograms for the hot paths, exposed in the
+Prometheus text format. Each thread records into its own cells, so recording
+takes no lock; a scrape adds the cells up
+"""
+
+import os
+import math
+import time
+import logging
+import threading
+from bisect import bisect_left
+from urllib.parse import urlsplit
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+logger = logging.getLogger('ZLC-Metrics')
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Seconds, from 50 µs to 10 s
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def format_value(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+def format_labels(labels):
+    """{name="value",...} with quotes, backslashes and newlines escaped"""
+    if not labels:
+        return ''
+    pairs = []
+    for name, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+class ThreadCells:
+    """One list of numbers per thread; cells of threads that have exited are
+    folded into a base total when read, so connection churn does not pile up"""
+    
+    def __init__(self, size):
+        self.size = size
+        self.local = threading.local()
+        self.cells = []
+        self.base = [0] * size
+        self.lock = threading.Lock()
+    
+    def cell(self):
+        """This thread's cell; the lock is only taken the first time"""
+        try:
+            return self.local.cell
+        except AttributeError:
+            cell = self.local.cell = [0] * self.size
+            with self.lock:
+                self.cells.append((threading.current_thread(), cell))
+            return cell
+    
+    def totals(self):
+        with self.lock:
+            totals = list(self.base)
+            live = []
+            for thread, cell in self.cells:
+                values = list(cell)
+                for i, value in enumerate(values):
+                    totals[i] += value
+                if thread.is_alive():
+                    live.append((thread, cell))
+                else:
+                    for i, value in enumerate(values):
+                        self.base[i] += value
+            self.cells = live
+        return totals
+
+class Counter:
+    """A monotonically increasing count"""
+    kind = 'counter'
+    
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.cells = ThreadCells(1)
+        self.local = self.cells.local
+    
+    def inc(self, amount=1):
+        try:
+            self.local.cell[0] += amount
+        except AttributeError:
+            self.cells.cell()[0] += amount
+    
+    def value(self):
+        return self.cells.totals()[0]
+    
+    def samples(self):
+        yield self.name, self.labels, self.value()
+
+class Timer:
+    """Context manager observing the time spent inside it"""
+    __slots__ = ('histogram', 'start')
+    
+    def __init__(self, histogram):
+        self.histogram = histogram
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+class Histogram:
+    """Counts of observations per fixed bucket, plus their sum"""
+    kind = 'histogram'
+    
+    def __init__(self, name, labels, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # A count per bucket, one for +Inf, then the sum
+        self.cells = ThreadCells(len(self.buckets) + 2)
+        self.local = self.cells.local
+    
+    def observe(self, value):
+        try:
+            cell = self.local.cell
+        except AttributeError:
+            cell = self.cells.cell()
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+    
+    def time(self):
+        return Timer(self)
+    
+    def snapshot(self):
+        """(count, sum, cumulative count per bucket bound including +Inf)"""
+        totals = self.cells.totals()
+        cumulative = []
+        running = 0
+        for bound, count in zip(self.buckets + (math.inf,), totals):
+            running += count
+            cumulative.append((bound, running))
+        return running, totals[-1], cumulative
+    
+    def samples(self):
+        count, total, cumulative = self.snapshot()
+        for bound, running in cumulative:
+            yield f"{self.name}_bucket", self.labels + (('le', format_value(float(bound))),), running
+        yield f"{self.name}_sum", self.labels, total
+        yield f"{self.name}_count", self.labels, count
+
+class Gauge:
+    """A value read from the service when scraped"""
+    kind = 'gauge'
+    
+    def __init__(self, name, labels, read):
+        self.name = name
+        self.labels = labels
+        self.read = read
+    
+    def samples(self):
+        yield self.name, self.labels, self.read()
+
+class Registry:
+    """Metrics by name and labels, created on first use"""
+    
+    def __init__(self):
+        self.metrics = {}
+        self.help = {}
+        self.lock = threading.Lock()
+    
+    def get(self, cls, name, help, labels, *args):
+        key = (name, tuple(sorted(labels.items())))
+        # Lock-free once the metric exists; callers may look it up per event
+        metric = self.metrics.get(key)
+        if metric is None:
+            with self.lock:
+                metric = self.metrics.get(key)
+                if metric is None:
+                    metric = self.metrics[key] = cls(name, key[1], *args)
+                    self.help.setdefault(name, help)
+        if not isinstance(metric, cls):
+            raise ValueError(f"{name} is already registered as a {metric.kind}")
+        return metric
+    
+    def counter(self, name, help='', **labels):
+        return self.get(Counter, name, help, labels)
+    
+    def histogram(self, name, help='', buckets=LATENCY_BUCKETS, **labels):
+        return self.get(Histogram, name, help, labels, buckets)
+    
+    def gauge(self, name, help, read, **labels):
+        """Register read() as a gauge; registering again replaces the reader"""
+        gauge = self.get(Gauge, name, help, labels, read)
+        gauge.read = read
+        return gauge
+    
+    def expose(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        families = {}
+        for metric in metrics:
+            families.setdefault(metric.name, []).append(metric)
+        
+        lines = []
+        for name, members in families.items():
+            lines.append(f"# HELP {name} {self.help.get(name, '')}")
+            lines.append(f"# TYPE {name} {members[0].kind}")
+            for metric in members:
+                for sample, labels, value in metric.samples():
+                    lines.append(f"{sample}{format_labels(labels)} {format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+# Shared by everything in the process
+REGISTRY = Registry()
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves GET /metrics from a registry"""
+    
+    def __init__(self, registry, *args, **kwargs):
+        self.registry = registry
+        super().__init__(*args, **kwargs)
+    
+    def do_GET(self):
+        if urlsplit(self.path).path != '/metrics':
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = self.registry.expose().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        """Stay quiet, scrapes arrive every few seconds"""
+        pass
+
+def metrics_port(default):
+    """The /metrics port from ZLC_METRICS_PORT, or default when it is unset or not
+    a valid port (0 disables)"""
+    value = os.environ.get('ZLC_METRICS_PORT')
+    if value is None:
+        return default
+    try:
+        port = int(value)
+    except ValueError:
+        port = -1
+    if not 0 <= port <= 65535:
+        logger.error(f"Invalid ZLC_METRICS_PORT {value!r}, using {default}")
+        return default
+    return port
+
+def serve_metrics(port, host='127.0.0.1', registry=REGISTRY):
+    """Serve /metrics from a daemon thread; returns the server (port 0 picks a free port)"""
+    def handler(*args, **kwargs):
+        return MetricsHandler(registry, *args, **kwargs)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Profiling
+On-demand profiling of a running service: a stack dump of every thread, or a
+sampling profile of all threads for N seconds, written to the data directory.
+Triggered by SIGUSR1 (stacks) / SIGUSR2 (profile) or the node's admin API
+"""
+
+import os
+import sys
+import time
+import signal
+import logging
+import threading
+import traceback
+from datetime import datetime
+
+logger = logging.getLogger('ZLC-Profiling')
+
+class ProfilerBusy(Exception):
+    """A profile is already running"""
+    pass
+
+def frame_stack(frame):
+    """Function names from the outermost call to frame, as module:function"""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{os.path.splitext(os.path.basename(code.co_filename))[0]}:{code.co_name}")
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+def format_stacks():
+    """The current stack of every thread, named so per-connection handler
+    threads can be told apart"""
+    threads = {thread.ident: thread for thread in threading.enumerate()}
+    lines = [f"Stacks of {len(threads)} threads at {datetime.now().isoformat()}", ""]
+    for ident, frame in sys._current_frames().items():
+        thread = threads.get(ident)
+        name = thread.name if thread else 'unknown'
+        daemon = ' daemon' if thread and thread.daemon else ''
+        lines.append(f"Thread {name} (ident {ident}{daemon}):")
+        lines.extend(line.rstrip('\n') for line in traceback.format_stack(frame))
+        lines.append("")
+    return '\n'.join(lines)
+
+class Profiler:
+    """Writes stack dumps and sampling profiles to out_dir, one profile at a time"""
+    
+    def __init__(self, out_dir, interval=0.01):
+        self.out_dir = out_dir
+        self.interval = interval
+        self.thread = None
+        self.last_report = None
+        self.lock = threading.Lock()
+    
+    def path(self, kind, extension):
+        os.makedirs(self.out_dir, mode=0o700, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        return os.path.join(self.out_dir, f"{kind}-{stamp}.{extension}")
+    
+    def dump_stacks(self):
+        """Write every thread's stack to stacks-<time>.txt; returns the path"""
+        path = self.path('stacks', 'txt')
+        with open(path, 'w') as f:
+            f.write(format_stacks())
+        logger.info(f"Thread stacks written to {path}")
+        return path
+    
+    def sample(self, seconds):
+        """Count the stacks of all other threads every interval for seconds;
+        returns ({stack: samples}, number of sampling rounds)"""
+        own = threading.get_ident()
+        counts = {}
+        rounds = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    stack = frame_stack(frame)
+                    counts[stack] = counts.get(stack, 0) + 1
+            rounds += 1
+            time.sleep(self.interval)
+        return counts, rounds
+    
+    def profile(self, seconds):
+        """Sample for seconds, then write profile-<time>.folded (one line per
+        stack, for flame graph tools) and profile-<time>.txt (top functions and
+        the thread stacks at the end); returns the report path"""
+        counts, rounds = self.sample(seconds)
+        folded = self.path('profile', 'folded')
+        with open(folded, 'w') as f:
+            for stack, count in sorted(counts.items(), key=lambda item: -item[1]):
+                f.write(f"{';'.join(stack)} {count}\n")
+        
+        own = {}
+        inclusive = {}
+        for stack, count in counts.items():
+            own[stack[-1]] = own.get(stack[-1], 0) + count
+            for function in set(stack):
+                inclusive[function] = inclusive.get(function, 0) + count
+        total = sum(counts.values()) or 1
+        
+        lines = [f"Sampling profile: {seconds:g}s, {rounds} rounds every {self.interval * 1000:g} ms, "
+                 f"{total} thread samples", "", "Own samples (where threads are, running or blocked):"]
+        for function, count in sorted(own.items(), key=lambda item: -item[1])[:40]:
+            lines.append(f"{count:8d} {100 * count / total:6.1f}%  {function}")
+        lines += ["", "Inclusive samples:"]
+        for function, count in sorted(inclusive.items(), key=lambda item: -item[1])[:40]:
+            lines.append(f"{count:8d} {100 * count / total:6.1f}%  {function}")
+        report = folded[:-len('.folded')] + '.txt'
+        with open(report, 'w') as f:
+            f.write('\n'.join(lines) + '\n\n' + format_stacks())
+        self.last_report = report
+        logger.info(f"Profile written to {report}")
+        return report
+    
+    def start(self, seconds=30):
+        """Profile for seconds in a background thread; raises ProfilerBusy if
+        one is running"""
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                raise ProfilerBusy("A profile is already running")
+            self.thread = threading.Thread(target=self.profile, args=(seconds,), name='zlc-profiler')
+            self.thread.daemon = True
+            self.thread.start()
+        logger.info(f"Profiling all threads for {seconds}s into {self.out_dir}")
+    
+    def running(self):
+        return bool(self.thread and self.thread.is_alive())
+    
+    def install_signals(self, seconds=30):
+        """SIGUSR1 dumps stacks, SIGUSR2 starts a profile (main thread only)"""
+        def on_stacks(signum, frame):
+            self.dump_stacks()
+        
+        def on_profile(signum, frame):
+            try:
+                self.start(seconds)
+            except ProfilerBusy as e:
+                logger.warning(str(e))
+        
+        signal.signal(signal.SIGUSR1, on_stacks)
+        signal.signal(signal.SIGUSR2, on_profile)
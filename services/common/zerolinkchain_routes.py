@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain ChainRoute Planner
+Multi-hop VPN routes whose hops all sit in different ASNs and ISPs, picked
+from an index of active hosts kept in bandwidth order
+"""
+
+import time
+import bisect
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger('ZLC-Routes')
+
+# Lower bounds (Mbps) of the bandwidth tiers reported in stats
+BANDWIDTH_TIERS = (1000, 100, 10, 0)
+
+class RouteError(ValueError):
+    """No route satisfies the request"""
+
+def bandwidth_tier(bandwidth_mbps):
+    for tier in BANDWIDTH_TIERS:
+        if bandwidth_mbps >= tier:
+            return tier
+    return 0
+
+class RouteHost:
+    """Routing view of an active host"""
+    __slots__ = ('host_id', 'asn', 'isp', 'bandwidth_mbps', 'location')
+    
+    def __init__(self, host_id, asn, isp, bandwidth_mbps, location=''):
+        self.host_id = host_id
+        self.asn = asn
+        self.isp = isp
+        self.bandwidth_mbps = bandwidth_mbps
+        self.location = location
+
+class DiverseSet:
+    """Hosts with pairwise distinct ASNs and ISPs, as a matching between ASNs
+    and ISPs in which every host is an edge. Each offered host may trigger a
+    backtracking search that moves chosen hosts aside, so the set stays as
+    large as the hosts offered so far allow"""
+    
+    def __init__(self, blocked_asns=(), blocked_isps=()):
+        self.blocked_asns = blocked_asns
+        self.blocked_isps = blocked_isps
+        # Offered hosts by ASN, and the chosen host per ASN and per ISP
+        self.edges = {}
+        self.asn_host = {}
+        self.isp_host = {}
+    
+    def __len__(self):
+        return len(self.asn_host)
+    
+    def offer(self, host):
+        """Consider one more host; returns True if the set grew"""
+        if host.asn in self.blocked_asns or host.isp in self.blocked_isps:
+            return False
+        self.edges.setdefault(host.asn, []).append(host)
+        if host.asn not in self.asn_host:
+            return self.augment(host.asn, set())
+        # A longer set now has to route through this host from an ASN left out so far
+        visited = set()
+        for asn in self.edges:
+            if asn not in self.asn_host and self.augment(asn, visited):
+                return True
+        return False
+    
+    def augment(self, asn, visited):
+        """Give asn a host, moving the holders of its ISPs to other ISPs if they can"""
+        for host in self.edges[asn]:
+            if host.isp in visited:
+                continue
+            visited.add(host.isp)
+            holder = self.isp_host.get(host.isp)
+            if holder is None or self.augment(holder.asn, visited):
+                self.asn_host[asn] = host
+                self.isp_host[host.isp] = host
+                return True
+        return False
+
+class RoutePlanner:
+    """Active hosts indexed by ASN, ISP and bandwidth, with a route cache"""
+    
+    def __init__(self, cache_size=1024):
+        self.hosts = {}
+        self.by_asn = {}
+        self.by_isp = {}
+        self.tier_counts = {tier: 0 for tier in BANDWIDTH_TIERS}
+        # (-bandwidth, host_id), so the fastest hosts come first
+        self.ranked = []
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.routes_created = 0
+        self.lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self.hosts)
+    
+    def add_host(self, host_id, asn, isp, bandwidth_mbps, location=''):
+        """Make a host available for routes (replacing any previous entry)"""
+        with self.lock:
+            self.remove_locked(host_id)
+            host = RouteHost(host_id, asn, isp, bandwidth_mbps, location)
+            self.hosts[host_id] = host
+            self.by_asn.setdefault(asn, set()).add(host_id)
+            self.by_isp.setdefault(isp, set()).add(host_id)
+            self.tier_counts[bandwidth_tier(bandwidth_mbps)] += 1
+            bisect.insort(self.ranked, (-bandwidth_mbps, host_id))
+            self.cache.clear()
+    
+    def remove_host(self, host_id):
+        """Stop routing through a host; returns False if it was not routable"""
+        with self.lock:
+            return self.remove_locked(host_id)
+    
+    def remove_locked(self, host_id):
+        """Drop a host from every index (caller holds lock)"""
+        host = self.hosts.pop(host_id, None)
+        if host is None:
+            return False
+        for index, key in ((self.by_asn, host.asn), (self.by_isp, host.isp)):
+            index[key].discard(host_id)
+            if not index[key]:
+                del index[key]
+        self.tier_counts[bandwidth_tier(host.bandwidth_mbps)] -= 1
+        position = bisect.bisect_left(self.ranked, (-host.bandwidth_mbps, host_id))
+        del self.ranked[position]
+        self.cache.clear()
+        return True
+    
+    def select_hops(self, min_hops, max_hops, min_bandwidth):
+        """As many hops as possible, up to max_hops, with pairwise distinct ASNs and
+        ISPs and the fastest possible slowest hop; ties go to the faster hosts
+        in bandwidth order (caller holds lock)"""
+        # At most one hop per ASN and per ISP
+        reachable = min(max_hops, len(self.by_asn), len(self.by_isp))
+        if reachable < min_hops:
+            raise RouteError(f"Only {reachable} ASN/ISP-diverse hops available, {min_hops} required")
+        
+        # Offer hosts fastest first: the host that completes the largest diverse set
+        # bounds the bottleneck, no route of that length can avoid a slower hop
+        candidates = []
+        diverse = DiverseSet()
+        bound = 0
+        for negative_bandwidth, host_id in self.ranked:
+            if -negative_bandwidth < min_bandwidth:
+                break
+            candidates.append(self.hosts[host_id])
+            if diverse.offer(candidates[-1]):
+                bound = len(candidates)
+                if len(diverse) == reachable:
+                    break
+        
+        length = len(diverse)
+        if length < min_hops:
+            raise RouteError(f"Only {length} diverse hops at {min_bandwidth} Mbps or more, {min_hops} required")
+        
+        # Branch on hosts within the bound in bandwidth order, keeping one only
+        # if the hosts after it can still complete the route
+        candidates = candidates[:bound]
+        hops = []
+        used_asns = set()
+        used_isps = set()
+        for index, host in enumerate(candidates):
+            if host.asn in used_asns or host.isp in used_isps:
+                continue
+            needed = length - len(hops) - 1
+            rest = DiverseSet(used_asns | {host.asn}, used_isps | {host.isp})
+            for later in candidates[index + 1:]:
+                if len(rest) >= needed:
+                    break
+                rest.offer(later)
+            if len(rest) < needed:
+                continue
+            hops.append(host)
+            used_asns.add(host.asn)
+            used_isps.add(host.isp)
+            if len(hops) == length:
+                break
+        return tuple(hops)
+    
+    def create_route(self, min_hops=3, max_hops=5, min_bandwidth=0):
+        """Plan a route of min_hops..max_hops hops; raises RouteError if impossible.
+        Planning is deterministic: every request of the same shape gets the same
+        best route, cached until a host joins, leaves or changes state"""
+        if min_hops < 1 or max_hops < min_hops:
+            raise RouteError(f"Invalid hop range {min_hops}..{max_hops}")
+        
+        key = (min_hops, max_hops, min_bandwidth)
+        with self.lock:
+            hops = self.cache.get(key)
+            if hops is None:
+                hops = self.select_hops(min_hops, max_hops, min_bandwidth)
+                self.cache[key] = hops
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+            else:
+                self.cache.move_to_end(key)
+                self.cache_hits += 1
+            self.routes_created += 1
+            sequence = self.routes_created
+        
+        created_at = time.time()
+        route_id = hashlib.sha256(f"{sequence}:{created_at}:{hops[0].host_id}".encode()).hexdigest()[:16]
+        return {
+            'route_id': f"route_{route_id}",
+            'hops': [{'host_id': hop.host_id, 'asn': hop.asn, 'isp': hop.isp,
+                      'location': hop.location, 'bandwidth_mbps': hop.bandwidth_mbps} for hop in hops],
+            # Share of hops in a distinct ASN / ISP; planned routes are always 1.0
+            'asn_diversity': len({hop.asn for hop in hops}) / len(hops),
+            'isp_diversity': len({hop.isp for hop in hops}) / len(hops),
+            # A route carries what its slowest hop carries
+            'total_bandwidth': min(hop.bandwidth_mbps for hop in hops),
+            'created_at': created_at
+        }
+    
+    def stats(self):
+        with self.lock:
+            return {
+                'active_hosts': len(self.hosts),
+                'asns': len(self.by_asn),
+                'isps': len(self.by_isp),
+                'bandwidth_tiers': {f"{tier}+": count for tier, count in self.tier_counts.items()},
+                'cached_routes': len(self.cache),
+                'cache_hits': self.cache_hits,
+                'routes_created': self.routes_created
+            }
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain API Stand-in
+Local replacement for the zerolinkchain.com API with deterministic responses
+and injectable latency, for offline testing and benchmarking of the services
+"""
+
+import sys
+import time
+import json
+import hashlib
+import threading
+from collections import Counter
+from urllib.parse import urlsplit
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+class StandInAPI:
+    """In-process HTTP server answering the endpoints the services call"""
+    
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, height=18, difficulty=4,
+                 hashrate_hps=66666.67, default_balance=0.0):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.path_latency = {}
+        self.failures = {}
+        self.height = height
+        self.difficulty = difficulty
+        self.hashrate_hps = hashrate_hps
+        self.default_balance = default_balance
+        self.balances = {}
+        self.sessions = {}
+        self.request_counts = Counter()
+        self.connection_count = 0
+        self.lock = threading.Lock()
+        self.server = None
+        self.server_thread = None
+    
+    @property
+    def url(self):
+        """API base URL to hand to the services"""
+        return f"http://{self.host}:{self.port}/api"
+    
+    def start(self):
+        """Start serving in a background thread"""
+        self.server = ThreadingHTTPServer((self.host, self.port), create_standin_handler(self))
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        
+        self.server_thread = threading.Thread(target=self.server.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+        return self
+    
+    def stop(self):
+        """Stop the server"""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+    
+    def set_latency(self, seconds, path=None):
+        """Delay every response, or only responses for one path"""
+        if path is None:
+            self.latency = seconds
+        else:
+            self.path_latency[path] = seconds
+    
+    def fail(self, path, status=503):
+        """Make a path answer with an error status until cleared"""
+        self.failures[path] = status
+    
+    def clear_failures(self):
+        """Restore normal responses on all paths"""
+        self.failures.clear()
+    
+    def set_balance(self, private_key, balance, mining_rewards=0.0):
+        """Set the balance returned for the wallet owning private_key"""
+        with self.lock:
+            self.balances[self.derive_address(private_key)] = (balance, mining_rewards)
+    
+    def derive_address(self, private_key):
+        """Deterministic address for a private key"""
+        return f"ZLC{hashlib.sha256(private_key.encode()).hexdigest()[:61]}"
+    
+    def handle(self, method, path, body, headers):
+        """Produce (status, payload) for a request"""
+        with self.lock:
+            self.request_counts[path] += 1
+        
+        delay = self.path_latency.get(path, self.latency)
+        if delay:
+            time.sleep(delay)
+        
+        if path in self.failures:
+            return self.failures[path], {'error': 'injected_failure'}
+        
+        if method == 'GET' and path == '/api/health':
+            return 200, {'status': 'ok'}
+        
+        if method == 'GET' and path == '/api/miner/stats':
+            return 200, {
+                'height': self.height,
+                'difficulty': self.difficulty,
+                'hashrate_hps': self.hashrate_hps,
+                'attempts': 72000
+            }
+        
+        if method == 'GET' and path == '/api/integrity/status':
+            rolling_hash = hashlib.sha256(f"chain_{self.height}".encode()).hexdigest()
+            return 200, {
+                'height': self.height,
+                'last_block_time': 1756837361 + self.height * 600,
+                'chain_integrity': 'verified',
+                'rolling_hash': rolling_hash
+            }
+        
+        if method == 'POST' and path == '/api/wallet/import/privatekey':
+            private_key = (body or {}).get('private_key', '').strip()
+            if not private_key:
+                return 400, {'error': 'private_key_required'}
+            
+            address = self.derive_address(private_key)
+            token = hashlib.sha256(f"session_{private_key}".encode()).hexdigest()
+            with self.lock:
+                self.sessions[token] = address
+            return 200, {'address': address, 'session_token': token}
+        
+        if method == 'GET' and path == '/api/wallet/balance':
+            auth = headers.get('Authorization', '')
+            if not auth.startswith('Bearer '):
+                return 401, {'error': 'authorization_required'}
+            
+            address = self.sessions.get(auth[len('Bearer '):])
+            if not address:
+                return 401, {'error': 'invalid_or_expired_session'}
+            
+            balance, mining_rewards = self.balances.get(address, (self.default_balance, 0.0))
+            return 200, {'wallet': address, 'balance': balance, 'mining_rewards': mining_rewards}
+        
+        return 404, {'error': 'endpoint_not_found'}
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """HTTP handler delegating to a StandInAPI"""
+    
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out as separate writes; Nagle would delay keep-alive replies
+    disable_nagle_algorithm = True
+    
+    def __init__(self, api, *args, **kwargs):
+        self.api = api
+        with api.lock:
+            api.connection_count += 1
+        super().__init__(*args, **kwargs)
+    
+    def respond(self, method):
+        body = None
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            try:
+                body = json.loads(self.rfile.read(length))
+            except json.JSONDecodeError:
+                body = None
+        
+        status, payload = self.api.handle(method, urlsplit(self.path).path, body, self.headers)
+        data = json.dumps(payload).encode()
+        
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def do_GET(self):
+        self.respond('GET')
+    
+    def do_POST(self):
+        self.respond('POST')
+    
+    def log_message(self, format, *args):
+        """Stay quiet, the stand-in is used in tight benchmark loops"""
+        pass
+
+def create_standin_handler(api):
+    """Create handler class bound to a stand-in"""
+    def handler(*args, **kwargs):
+        return StandInHandler(api, *args, **kwargs)
+    return handler
+
+def main():
+    """Run the stand-in in the foreground"""
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8080
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    
+    api = StandInAPI(port=port, latency=latency).start()
+    print(f"ZeroLinkChain API stand-in at {api.url} (latency {latency}s)")
+    print(f"Point the services at it with: export ZLC_API_BASE={api.url}")
+    
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        api.stop()
+
+if __name__ == "__main__":
+    main()
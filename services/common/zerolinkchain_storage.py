@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Storage Helpers
+Crash-safe file writes shared by the services
+"""
+
+import os
+import json
+import tempfile
+
+def fsync_directory(directory):
+    """Flush a directory's entries, making renames and new files in it durable"""
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+def atomic_write(path, data, mode=0o644, sync_directory=True):
+    """Replace path with data so readers see either the old or the new file.
+    Without sync_directory the caller flushes the directory, e.g. once per batch"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    
+    # Persist the rename itself
+    if sync_directory:
+        fsync_directory(directory)
+
+def atomic_write_json(path, obj, mode=0o644, sync_directory=True):
+    """Atomically write obj as compact JSON"""
+    atomic_write(path, json.dumps(obj, separators=(',', ':')).encode(), mode, sync_directory)
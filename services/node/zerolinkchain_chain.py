@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Chain Index
+Block tree keyed by hash with parent pointers and cumulative work, used to
+pick the best tip and to find the blocks to swap on a reorganisation
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger('ZLC-Node')
+
+# Network difficulty unless the node is configured otherwise
+DEFAULT_DIFFICULTY = 4
+
+def block_work(difficulty):
+    """Expected hashes to find a block: difficulty counts leading hex zeros"""
+    return 16 ** difficulty
+
+class ChainEntry:
+    """One block in the tree"""
+    __slots__ = ('hash', 'parent', 'height', 'work', 'block')
+    
+    def __init__(self, block, parent, work):
+        self.hash = block['hash']
+        self.parent = parent
+        self.height = block['height']
+        self.work = (parent.work if parent else 0) + work
+        self.block = block
+
+class ChainIndex:
+    """All known blocks, on the best chain or not"""
+    
+    def __init__(self, max_orphans=1000, difficulty=DEFAULT_DIFFICULTY, max_orphans_per_parent=8):
+        self.entries = {}
+        # Every block counts the work of the network difficulty, never the
+        # difficulty it claims: validation rejects blocks that do not meet it
+        self.work = block_work(difficulty)
+        self.best = None
+        # Blocks waiting for their parent, by parent hash; they are unvalidated, so
+        # both the total and the number per parent are capped, oldest evicted first
+        self.orphans = {}
+        # Orphan block hash -> parent hash, oldest first
+        self.orphan_parents = OrderedDict()
+        self.max_orphans = max_orphans
+        self.max_orphans_per_parent = max_orphans_per_parent
+        self.lock = threading.Lock()
+    
+    def __contains__(self, block_hash):
+        return block_hash in self.entries
+    
+    def get(self, block_hash):
+        return self.entries.get(block_hash)
+    
+    def insert(self, block, validate=None):
+        """Add a block (and any orphans it unblocks); returns its entry, or None
+        if it is an orphan. Known blocks are returned unchanged. validate(block,
+        parent_block) runs once the parent is known and may raise ValueError"""
+        with self.lock:
+            entry = self.entries.get(block['hash'])
+            if entry is not None:
+                return entry
+            
+            previous_hash = block.get('previous_hash')
+            if previous_hash is None and self.best is not None and self.best.height == block['height'] - 1:
+                # Block files from before previous_hash was stored link linearly
+                previous_hash = self.best.hash
+            parent = self.entries.get(previous_hash)
+            if parent is None and block['height'] > 0:
+                if previous_hash is not None:
+                    self.add_orphan(block, previous_hash, validate)
+                return None
+            
+            entry = self.attach(block, parent, validate)
+            pending = [entry]
+            while pending:
+                for child, child_validate in self.orphans.pop(pending.pop().hash, []):
+                    del self.orphan_parents[child['hash']]
+                    try:
+                        pending.append(self.attach(child, self.entries[child['previous_hash']],
+                                                   child_validate))
+                    except ValueError as e:
+                        logger.warning(f"Dropping orphan block: {e}")
+            return entry
+    
+    def add_orphan(self, block, previous_hash, validate):
+        """Hold a block until its parent arrives (caller holds lock)"""
+        if block['hash'] in self.orphan_parents:
+            return
+        siblings = self.orphans.get(previous_hash, [])
+        if len(siblings) >= self.max_orphans_per_parent:
+            self.drop_orphan(siblings[0][0]['hash'])
+        while len(self.orphan_parents) >= self.max_orphans:
+            self.drop_orphan(next(iter(self.orphan_parents)))
+        self.orphans.setdefault(previous_hash, []).append((block, validate))
+        self.orphan_parents[block['hash']] = previous_hash
+    
+    def drop_orphan(self, block_hash):
+        """Forget a held orphan (caller holds lock)"""
+        previous_hash = self.orphan_parents.pop(block_hash)
+        siblings = [item for item in self.orphans[previous_hash] if item[0]['hash'] != block_hash]
+        if siblings:
+            self.orphans[previous_hash] = siblings
+        else:
+            del self.orphans[previous_hash]
+    
+    def attach(self, block, parent, validate=None):
+        """Link a block under its parent and update the best tip (caller holds lock)"""
+        expected_height = parent.height + 1 if parent else 0
+        if block['height'] != expected_height:
+            raise ValueError(f"Block {block['hash']} has height {block['height']}, expected {expected_height}")
+        if validate is not None:
+            validate(block, parent.block if parent else None)
+        
+        entry = ChainEntry(block, parent, self.work)
+        self.entries[entry.hash] = entry
+        # Ties keep the first-seen tip
+        if self.best is None or entry.work > self.best.work:
+            self.best = entry
+        return entry
+    
+    def fork_path(self, from_hash, to_hash):
+        """Blocks to disconnect (tip first) and connect (lowest first) to move the
+        active tip from from_hash to to_hash; O(depth of the fork)"""
+        with self.lock:
+            old = self.entries.get(from_hash)
+            new = self.entries.get(to_hash)
+        
+        disconnect, connect = [], []
+        while old is not None and (new is None or old.height > new.height):
+            disconnect.append(old.block)
+            old = old.parent
+        while new is not None and (old is None or new.height > old.height):
+            connect.append(new.block)
+            new = new.parent
+        while old is not new:
+            disconnect.append(old.block)
+            connect.append(new.block)
+            old, new = old.parent, new.parent
+        
+        connect.reverse()
+        return disconnect, connect
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Mempool
+Unconfirmed transactions indexed by txid and sender nonce, with fee-rate
+heaps for template selection and lowest-fee eviction under a byte cap
+"""
+
+import json
+import heapq
+import bisect
+import logging
+import threading
+import itertools
+
+from zerolinkchain_validation import check_transactions
+
+logger = logging.getLogger('ZLC-Node')
+
+# A replacement for the same sender and nonce must pay this much more per byte
+REPLACEMENT_FEE_FACTOR = 1.1
+
+class MempoolError(ValueError):
+    """A transaction was not accepted into the mempool"""
+
+class MempoolEntry:
+    """One pending transaction"""
+    __slots__ = ('tx', 'txid', 'sender', 'nonce', 'fee', 'size', 'fee_rate', 'seq')
+    
+    def __init__(self, tx, seq):
+        self.tx = tx
+        self.txid = tx['txid']
+        self.sender = tx['inputs'][0]['address']
+        self.nonce = tx['nonce']
+        # Always what the transaction actually leaves over, never a stated fee
+        self.fee = sum(i['amount'] for i in tx['inputs']) - sum(o['amount'] for o in tx['outputs'])
+        self.size = len(json.dumps(tx, separators=(',', ':')))
+        self.fee_rate = self.fee / self.size
+        self.seq = seq
+
+class Mempool:
+    """Pending transfers, each sender's executed strictly in nonce order"""
+    
+    def __init__(self, max_bytes=50 * 1024 * 1024, nonce_of=None):
+        self.max_bytes = max_bytes
+        # Next nonce the chain expects from an address
+        self.nonce_of = nonce_of or (lambda address: 0)
+        self.entries = {}
+        self.by_sender = {}
+        self.sender_nonces = {}
+        self.total_bytes = 0
+        # Max-heap of sender heads (lowest pending nonce) and min-heap of all
+        # entries; both use lazy deletion, stale items are skipped when popped
+        self.ready = []
+        self.evictable = []
+        self.sequence = itertools.count()
+        self.lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def __contains__(self, txid):
+        return txid in self.entries
+    
+    def add(self, tx):
+        """Accept a transaction; raises MempoolError if it is invalid or priced out"""
+        if not isinstance(tx.get('nonce'), int) or not tx.get('inputs') or tx.get('type') == 'coinbase':
+            raise MempoolError("transaction needs inputs and an integer nonce")
+        senders = {i.get('address') for i in tx['inputs']}
+        if len(senders) != 1:
+            raise MempoolError("all inputs must come from one sender")
+        reason = check_transactions({'transactions': [tx]})
+        if reason:
+            raise MempoolError(reason)
+        
+        with self.lock:
+            entry = MempoolEntry(tx, next(self.sequence))
+            if entry.txid in self.entries:
+                raise MempoolError(f"transaction {entry.txid} already in mempool")
+            if entry.fee < 0:
+                raise MempoolError("outputs exceed inputs")
+            stated = tx.get('fee', entry.fee)
+            if not isinstance(stated, (int, float)) or abs(stated - entry.fee) > 1e-9:
+                raise MempoolError(f"stated fee {stated} is not inputs minus outputs ({entry.fee})")
+            if entry.nonce < self.nonce_of(entry.sender):
+                raise MempoolError(f"nonce {entry.nonce} already used")
+            
+            existing = self.by_sender.get(entry.sender, {}).get(entry.nonce)
+            if existing is not None:
+                if entry.fee_rate < existing.fee_rate * REPLACEMENT_FEE_FACTOR:
+                    raise MempoolError(f"replacement for nonce {entry.nonce} pays too little")
+                self.remove_entry(existing)
+            
+            self.entries[entry.txid] = entry
+            self.by_sender.setdefault(entry.sender, {})[entry.nonce] = entry
+            bisect.insort(self.sender_nonces.setdefault(entry.sender, []), entry.nonce)
+            self.total_bytes += entry.size
+            heapq.heappush(self.evictable, (entry.fee_rate, entry.seq, entry.txid))
+            if self.sender_nonces[entry.sender][0] == entry.nonce:
+                heapq.heappush(self.ready, (-entry.fee_rate, entry.seq, entry.txid))
+            
+            self.evict()
+            if entry.txid not in self.entries:
+                raise MempoolError("fee rate too low for a full mempool")
+            return entry.txid
+    
+    def remove_entry(self, entry):
+        """Drop one entry and make the sender's next transaction its head (caller holds lock)"""
+        del self.entries[entry.txid]
+        del self.by_sender[entry.sender][entry.nonce]
+        nonces = self.sender_nonces[entry.sender]
+        index = bisect.bisect_left(nonces, entry.nonce)
+        del nonces[index]
+        self.total_bytes -= entry.size
+        
+        if not nonces:
+            del self.by_sender[entry.sender]
+            del self.sender_nonces[entry.sender]
+        elif index == 0:
+            head = self.by_sender[entry.sender][nonces[0]]
+            heapq.heappush(self.ready, (-head.fee_rate, head.seq, head.txid))
+    
+    def remove_from_nonce(self, sender, nonce):
+        """Drop a sender's transactions from nonce upwards (caller holds lock)"""
+        nonces = self.sender_nonces.get(sender, [])
+        for later in reversed(nonces[bisect.bisect_left(nonces, nonce):]):
+            self.remove_entry(self.by_sender[sender][later])
+    
+    def evict(self):
+        """Evict the lowest fee rates until under the byte cap (caller holds lock)"""
+        while self.total_bytes > self.max_bytes and self.evictable:
+            _, seq, txid = heapq.heappop(self.evictable)
+            entry = self.entries.get(txid)
+            if entry is None or entry.seq != seq:
+                continue
+            # Later nonces from the same sender can no longer execute
+            self.remove_from_nonce(entry.sender, entry.nonce)
+        
+        # Keep stale heap items from piling up
+        if len(self.evictable) > 2 * len(self.entries) + 1024:
+            self.evictable = [(e.fee_rate, e.seq, e.txid) for e in self.entries.values()]
+            heapq.heapify(self.evictable)
+        if len(self.ready) > 2 * len(self.by_sender) + 1024:
+            self.ready = [
+                (-head.fee_rate, head.seq, head.txid)
+                for head in (self.by_sender[sender][nonces[0]] for sender, nonces in self.sender_nonces.items())
+            ]
+            heapq.heapify(self.ready)
+    
+    def is_head(self, item):
+        entry = self.entries.get(item[2])
+        return (entry is not None and entry.seq == item[1]
+                and self.sender_nonces[entry.sender][0] == entry.nonce)
+    
+    def select(self, max_bytes=1024 * 1024, max_count=5000):
+        """Best fee-rate transaction set for a template, respecting nonce order.
+        Costs O(k log n) for k selected transactions"""
+        selected = []
+        size = 0
+        with self.lock:
+            taken = []
+            # Next nonces of senders already in the template
+            followers = []
+            expected = {}
+            while len(selected) < max_count:
+                while self.ready and not self.is_head(self.ready[0]):
+                    heapq.heappop(self.ready)
+                if not self.ready and not followers:
+                    break
+                if followers and (not self.ready or followers[0] < self.ready[0]):
+                    item = heapq.heappop(followers)
+                else:
+                    item = heapq.heappop(self.ready)
+                    taken.append(item)
+                
+                entry = self.entries[item[2]]
+                if entry.sender not in expected:
+                    expected[entry.sender] = self.nonce_of(entry.sender)
+                if entry.nonce != expected[entry.sender]:
+                    # Waiting for an earlier nonce that is not in the mempool
+                    continue
+                if size + entry.size > max_bytes:
+                    continue
+                
+                selected.append(entry)
+                size += entry.size
+                expected[entry.sender] += 1
+                nonces = self.sender_nonces[entry.sender]
+                index = bisect.bisect_right(nonces, entry.nonce)
+                if index < len(nonces) and nonces[index] == entry.nonce + 1:
+                    follower = self.by_sender[entry.sender][nonces[index]]
+                    heapq.heappush(followers, (-follower.fee_rate, follower.seq, follower.txid))
+            
+            for item in taken:
+                heapq.heappush(self.ready, item)
+        
+        return {
+            'transactions': [entry.tx for entry in selected],
+            'fees': sum(entry.fee for entry in selected),
+            'bytes': size
+        }
+    
+    def remove_block(self, block):
+        """Drop transactions confirmed by block and any their nonces made stale"""
+        with self.lock:
+            senders = set()
+            for tx in block.get('transactions', []):
+                entry = self.entries.get(tx.get('txid'))
+                if entry is not None:
+                    self.remove_entry(entry)
+                for entry in tx.get('inputs', []):
+                    senders.add(entry.get('address'))
+            
+            for sender in senders:
+                nonces = self.sender_nonces.get(sender)
+                expected = self.nonce_of(sender)
+                while nonces and nonces[0] < expected:
+                    self.remove_entry(self.by_sender[sender][nonces[0]])
+                    nonces = self.sender_nonces.get(sender)
+    
+    def stats(self):
+        with self.lock:
+            return {'count': len(self.entries), 'bytes': self.total_bytes,
+                    'max_bytes': self.max_bytes, 'senders': len(self.by_sender)}
@@ -6,38 +6,142 @@ Hosts a blockchain node for network participation and block data distribution
 
 import os
 import sys
+import math
 import time
 import json
+import hmac
 import hashlib
 import socket
 import threading
-import requests
 import logging
 from datetime import datetime
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from collections import deque
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('/var/log/zerolinkchain-node.log'),
-        logging.StreamHandler()
-    ]
-)
+# Shared modules live in services/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from zerolinkchain_http import get_client
+from zerolinkchain_state import BalanceIndex
+from zerolinkchain_chain import ChainIndex, DEFAULT_DIFFICULTY
+from zerolinkchain_validation import ValidationPipeline, BlockValidationError, seal_block
+from zerolinkchain_mempool import Mempool, MempoolError
+from zerolinkchain_deadtx import DeadTxLane, DeadTxQueueFull, make_dead_tx
+from zerolinkchain_chainstore import ChainStore
+from zerolinkchain_chainchat import ChainChatStore
+from zerolinkchain_filters import build_filter, filter_header
+from zerolinkchain_merkle import MerkleIndex, block_levels
+from zerolinkchain_admission import AdmissionController
+from zerolinkchain_logging import setup_logging, Sampler
+from zerolinkchain_metrics import REGISTRY, CONTENT_TYPE
+from zerolinkchain_profiling import Profiler, ProfilerBusy
+
+# Logging is configured by main(); importing the module leaves it alone
 logger = logging.getLogger('ZLC-Node')
 
+# Upstream API, override with ZLC_API_BASE (e.g. a local stand-in)
+API_BASE = os.environ.get('ZLC_API_BASE', 'https://zerolinkchain.com/api')
+
+# Log one API request in this many, override with ZLC_ACCESS_LOG_SAMPLE
+access_sample = Sampler(int(os.environ.get('ZLC_ACCESS_LOG_SAMPLE', '100')))
+
+# Message types timed separately; anything else counts as 'other'
+P2P_MESSAGE_TYPES = ('get_blocks', 'new_block', 'get_filters', 'ping')
+p2p_latency = {msg_type: REGISTRY.histogram('zlc_p2p_message_seconds', 'Time to handle a P2P message',
+                                            type=msg_type)
+               for msg_type in P2P_MESSAGE_TYPES + ('other',)}
+# API request histograms and response counters, created per route and code on first use
+api_latency = {}
+api_responses = {}
+
+# Longest a /subscribe request is held open
+MAX_SUBSCRIBE_TIMEOUT = 60
+# Recent disconnects kept for /subscribe long-polls to check against
+REORG_HISTORY = 64
+
+# /admin/* requires this X-Admin-Token and is disabled without one; override with ZLC_ADMIN_TOKEN
+ADMIN_TOKEN = os.environ.get('ZLC_ADMIN_TOKEN')
+
+# Longest profile /admin/profile will run
+MAX_PROFILE_SECONDS = 300
+MIN_PROFILE_SECONDS = 0.1
+
+class QueryError(ValueError):
+    """A query parameter did not parse; answered with 400"""
+
+def query_number(query, name, default, cast=int, minimum=None):
+    """A query parameter as an int (or float) of at least minimum, default if
+    absent; raises QueryError"""
+    values = query.get(name)
+    if not values:
+        return default
+    try:
+        value = cast(values[0])
+    except ValueError:
+        raise QueryError(f"{name} must be {'an integer' if cast is int else 'a number'}") from None
+    if not math.isfinite(value):
+        raise QueryError(f"{name} must be finite")
+    if minimum is not None and value < minimum:
+        raise QueryError(f"{name} must be at least {minimum}")
+    return value
+
+def block_touches(block, address):
+    """Whether any transaction in block pays or spends from address"""
+    for tx in block.get('transactions', []):
+        for entry in tx.get('outputs', []) + tx.get('inputs', []):
+            if entry.get('address') == address:
+                return True
+    return False
+
 class ZeroLinkChainNode:
-    def __init__(self, data_dir="/var/lib/zerolinkchain/node", port=8334, api_port=8335):
+    def __init__(self, data_dir="/var/lib/zerolinkchain/node", port=8334, api_port=8335, api_base=None,
+                 admission=None, admin_token=None, difficulty=DEFAULT_DIFFICULTY):
         self.data_dir = data_dir
         self.port = port
         self.api_port = api_port
         self.blockchain_file = os.path.join(data_dir, "blockchain.dat")
         self.peers = set()
+        # Connection caps and rate limits for the P2P port
+        self.admission = admission or AdmissionController()
+        # Network difficulty: the work every block in the tree counts for
+        self.difficulty = difficulty
+        # Active chain by height; self.chain also holds side branches
         self.blocks = []
-        self.api_base = "https://zerolinkchain.com/api"
+        self.chain = ChainIndex(difficulty=difficulty)
+        self.reorg_lock = threading.Lock()
+        # Blocks from peers and sync must prove work at the network difficulty
+        self.validator = ValidationPipeline(difficulty=difficulty)
+        self.mempool = Mempool(nonce_of=lambda address: self.state.get(address)['nonce'])
+        # File offset of each block record, for truncating on disconnect
+        self.block_offsets = []
+        # Compact filter and filter header per block, built as blocks are stored
+        self.filters = []
+        self.filter_headers = []
+        self.chain_lock = threading.Lock()
+        # Wakes /subscribe long-polls whenever blocks are appended or disconnected
+        self.block_added = threading.Condition(self.chain_lock)
+        # (serial, disconnected blocks) per disconnect, newest last
+        self.reorg_serial = 0
+        self.reorgs = deque(maxlen=REORG_HISTORY)
+        self.api_base = api_base or API_BASE
+        self.http = get_client()
+        self.state = BalanceIndex(os.path.join(data_dir, "state.json"))
+        self.merkle = MerkleIndex()
+        # ChainChat/ChainStore records: own queue and segments, never in blocks
+        self.dead_txs = DeadTxLane(os.path.join(data_dir, "deadtx"))
+        self.chainstore = ChainStore(os.path.join(data_dir, "chainstore"))
+        self.chat = ChainChatStore(os.path.join(data_dir, "chainchat"))
+        # Stack dumps and profiles on demand (SIGUSR1/SIGUSR2 or /admin/*)
+        self.profiler = Profiler(os.path.join(data_dir, "profiles"))
+        self.admin_token = admin_token or ADMIN_TOKEN
         self.running = False
         
+        REGISTRY.gauge('zlc_node_height', 'Blocks in the active chain', lambda: len(self.blocks))
+        REGISTRY.gauge('zlc_node_peers', 'Connected P2P peers', lambda: len(self.peers))
+        REGISTRY.gauge('zlc_node_mempool_transactions', 'Transactions in the mempool', lambda: len(self.mempool))
+        REGISTRY.gauge('zlc_p2p_open_connections', 'Admitted P2P connections',
+                       lambda: self.admission.stats()['open_connections'])
+        
         # Ensure data directory exists
         os.makedirs(data_dir, exist_ok=True)
         
@@ -60,6 +164,267 @@ class ZeroLinkChainNode:
             logger.error(f"Failed to load blockchain: {e}")
             return b''
     
+    def load_blocks(self):
+        """Load stored blocks into memory"""
+        data = self.load_blockchain()
+        blocks = []
+        offsets = []
+        offset = 0
+        
+        while offset + 4 <= len(data):
+            length = int.from_bytes(data[offset:offset + 4], 'big')
+            record = data[offset + 4:offset + 4 + length]
+            if len(record) < length:
+                break
+            blocks.append(json.loads(record))
+            offsets.append(offset)
+            offset += 4 + length
+        
+        if offset < len(data):
+            # Drop a partial record left by an interrupted append
+            logger.warning(f"Truncating {len(data) - offset} trailing bytes from blockchain file")
+            with open(self.blockchain_file, 'r+b') as f:
+                f.truncate(offset)
+        
+        filters = [build_filter(block) for block in blocks]
+        
+        with self.chain_lock:
+            self.blocks = blocks
+            self.chain = ChainIndex(difficulty=self.difficulty)
+            for block in blocks:
+                self.chain.insert(block)
+            self.block_offsets = offsets
+            self.filters = []
+            self.filter_headers = []
+            self.add_filters(filters)
+            self.merkle = MerkleIndex()
+            for block in blocks:
+                self.merkle.add_block(block)
+            self.state.load(blocks)
+        logger.info(f"Loaded {len(blocks)} blocks")
+        return blocks
+    
+    def append_blocks(self, blocks):
+        """Append blocks extending the active tip to the chain and to the block file"""
+        records = []
+        for block in blocks:
+            block_json = json.dumps(block).encode()
+            records.append(len(block_json).to_bytes(4, 'big') + block_json)
+        filters = [build_filter(block) for block in blocks]
+        trees = [block_levels(block) for block in blocks]
+        
+        with self.chain_lock:
+            with open(self.blockchain_file, 'ab') as f:
+                offset = f.seek(0, os.SEEK_END)
+                for record in records:
+                    self.block_offsets.append(offset)
+                    offset += len(record)
+                f.write(b''.join(records))
+            self.blocks.extend(blocks)
+            for block in blocks:
+                self.chain.insert(block)
+            self.add_filters(filters)
+            for block, levels in zip(blocks, trees):
+                self.merkle.add_block(block, levels)
+            self.state.connect_blocks(blocks)
+            self.block_added.notify_all()
+        
+        for block in blocks:
+            self.mempool.remove_block(block)
+    
+    def disconnect_tip(self):
+        """Remove the active tip from the chain, the block file and the indexes"""
+        return self.disconnect_blocks(1)[0]
+    
+    def disconnect_blocks(self, count):
+        """Remove count blocks from the active tip, tip first; the block file is
+        truncated once. Disconnected blocks stay in the chain index"""
+        disconnected = []
+        if count <= 0:
+            return disconnected
+        with self.chain_lock:
+            for _ in range(count):
+                block = self.blocks.pop()
+                offset = self.block_offsets.pop()
+                self.filters.pop()
+                self.filter_headers.pop()
+                self.merkle.remove_block(block)
+                self.state.disconnect_block(block, self.blocks[-1] if self.blocks else None)
+                disconnected.append(block)
+            with open(self.blockchain_file, 'r+b') as f:
+                f.truncate(offset)
+            self.reorg_serial += 1
+            self.reorgs.append((self.reorg_serial, disconnected))
+            self.block_added.notify_all()
+        
+        # Disconnected transfers go back to the mempool, oldest first
+        for block in reversed(disconnected):
+            for tx in block.get('transactions', []):
+                if tx.get('type') != 'coinbase' and 'nonce' in tx:
+                    try:
+                        self.mempool.add(tx)
+                    except MempoolError:
+                        pass
+        return disconnected
+    
+    def import_blocks(self, blocks, atomic=False):
+        """Validate and append blocks extending the active tip (initial sync).
+        Raises BlockValidationError after appending the blocks before a bad one,
+        or with atomic after appending none of them"""
+        with self.reorg_lock:
+            previous = self.blocks[-1] if self.blocks else None
+            if not atomic:
+                return self.validator.validate(blocks, self.append_blocks, previous)
+            staged = []
+            stats = self.validator.validate(blocks, staged.extend, previous)
+            self.append_blocks(staged)
+            return stats
+    
+    def receive_block(self, block):
+        """Add a block from the network, reorganising if it leads a heavier chain.
+        Returns True if the active chain changed"""
+        with self.reorg_lock:
+            if block['hash'] in self.chain:
+                return False
+            if self.chain.insert(block, validate=self.validator.check_block) is None:
+                logger.info(f"Holding orphan block {block['hash']} until its parent arrives")
+                return False
+            
+            tip = self.blocks[-1]['hash'] if self.blocks else None
+            best = self.chain.best.hash
+            if best == tip:
+                return False
+            
+            # Only the divergent suffix is swapped
+            disconnect, connect = self.chain.fork_path(tip, best)
+            if disconnect:
+                logger.warning(f"Reorganising: disconnecting {len(disconnect)} blocks, "
+                               f"connecting {len(connect)} to tip {best}")
+            self.disconnect_blocks(len(disconnect))
+            self.append_blocks(connect)
+            return True
+    
+    def add_filters(self, filters):
+        """Extend the filter and filter header chains (caller holds chain_lock)"""
+        previous_header = self.filter_headers[-1] if self.filter_headers else '00' * 32
+        for block_filter in filters:
+            previous_header = filter_header(block_filter, previous_header)
+            self.filters.append(block_filter)
+            self.filter_headers.append(previous_header)
+    
+    def get_filters(self, start, limit=1000):
+        """Compact filters from height start onwards"""
+        start = max(start, 0)
+        with self.chain_lock:
+            return [
+                {'height': height, 'hash': self.blocks[height]['hash'],
+                 'filter': self.filters[height].hex(), 'header': self.filter_headers[height]}
+                for height in range(start, min(start + limit, len(self.filters)))
+            ]
+    
+    def get_proof(self, txid):
+        """Merkle inclusion proof for a transaction, or None if it is not on the chain"""
+        with self.chain_lock:
+            location = self.merkle.locate(txid)
+            if location is None:
+                return None
+            height, index = location
+            block = self.blocks[height]
+        # Blocks are never modified, so the proof can be built outside the lock
+        return self.merkle.proof(txid, block, index)
+    
+    def submit_transaction(self, tx):
+        """Add a transaction to the mempool; raises MempoolError if rejected"""
+        txid = self.mempool.add(tx)
+        logger.debug("Accepted transaction %s into mempool", txid)
+        return txid
+    
+    def submit_dead_tx(self, payload):
+        """Queue a dead TX on its own lane; raises DeadTxQueueFull when saturated"""
+        tx_type = payload.get('tx_type')
+        if tx_type not in ('chainchat', 'chainstore'):
+            raise ValueError(f"Unknown dead TX type: {tx_type}")
+        record = make_dead_tx(tx_type, payload.get('sender'), payload.get('recipient'), payload.get('data'))
+        return self.dead_txs.submit(record)
+    
+    def store_file(self, stream, length, filename, uploader=None, pgp_key_id=None):
+        """Stream an upload into ChainStore and record it as a dead TX"""
+        stored = self.chainstore.upload(stream, filename, uploader, pgp_key_id, length)
+        summary = {key: stored[key] for key in ('file_id', 'filename', 'size', 'sha256', 'new_bytes')}
+        try:
+            self.dead_txs.submit(make_dead_tx('chainstore', uploader, None, summary))
+        except DeadTxQueueFull as e:
+            # The file itself is stored; only its ledger entry is shed
+            logger.warning(f"Upload {stored['file_id']} not recorded: {e}")
+        return dict(summary, chunks=len(stored['chunks']), mb_per_second=stored['mb_per_second'])
+    
+    def send_chat_message(self, sender, recipient, message, is_video=False):
+        """Store a ChainChat message and record it as a dead TX"""
+        record = self.chat.send(sender, recipient, message, is_video)
+        summary = {'message_id': record['id'], 'conversation': record['conversation']}
+        try:
+            self.dead_txs.submit(make_dead_tx('chainchat', sender, recipient, summary))
+        except DeadTxQueueFull as e:
+            logger.warning(f"Message {record['id']} not recorded: {e}")
+        return record
+    
+    def get_balance(self, address):
+        """Balance and nonce of address from the local state index"""
+        return self.state.get(address)
+    
+    def get_blocks(self, start, limit=500):
+        """Blocks from height start onwards"""
+        start = max(start, 0)
+        with self.chain_lock:
+            return self.blocks[start:start + max(limit, 0)]
+    
+    def get_tip(self):
+        """Height and hash of the best block"""
+        with self.chain_lock:
+            if not self.blocks:
+                return {'height': -1, 'hash': None}
+            tip = self.blocks[-1]
+            return {'height': tip['height'], 'hash': tip['hash']}
+    
+    def rewound_height(self, serial, since, address=None):
+        """Lowest height at or below since disconnected after reorg serial, in a
+        block touching address if given; None if there is none (caller holds chain_lock)"""
+        heights = [block['height'] for event, blocks in self.reorgs if event > serial for block in blocks
+                   if block['height'] <= since and (address is None or block_touches(block, address))]
+        return min(heights) if heights else None
+    
+    def wait_for_blocks(self, since, address=None, timeout=25.0):
+        """Wait for blocks above height since, touching address if given, or for a
+        reorganisation disconnecting such a block at or below since. Returns the
+        heights of the matching blocks and the height the chain was rewound to
+        (None without a reorganisation); ([], None) on timeout"""
+        since = max(since, -1)
+        checked = since
+        deadline = time.monotonic() + timeout
+        with self.block_added:
+            serial = self.reorg_serial
+            while True:
+                # Heights disconnected since the last look may hold new blocks now
+                for event, blocks in self.reorgs:
+                    if event > serial:
+                        checked = max(min(checked, blocks[-1]['height'] - 1), since)
+                new_blocks = self.blocks[checked + 1:]
+                if address is None:
+                    heights = [block['height'] for block in new_blocks]
+                else:
+                    heights = [block['height'] for block in new_blocks if block_touches(block, address)]
+                rewound = self.rewound_height(serial, since, address)
+                if heights or rewound is not None:
+                    return heights, rewound
+                
+                # Only blocks arriving from now on can matter
+                checked = max(checked, len(self.blocks) - 1)
+                serial = self.reorg_serial
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return [], None
+                self.block_added.wait(remaining)
+    
     def save_blockchain(self, data):
         """Save blockchain data to file"""
         try:
@@ -72,45 +437,52 @@ class ZeroLinkChainNode:
     def sync_with_network(self):
         """Sync blockchain with the network"""
         try:
-            # Get blockchain stats
-            response = requests.get(f"{self.api_base}/miner/stats", timeout=10)
-            if response.status_code == 200:
-                stats = response.json()
+            # Fetch blockchain stats and integrity status concurrently
+            stats_response, integrity_response = self.http.fan_out([
+                ('GET', f"{self.api_base}/miner/stats", {}),
+                ('GET', f"{self.api_base}/integrity/status", {})
+            ])
+            if stats_response.status_code == 200:
+                stats = stats_response.json()
                 logger.info(f"Network height: {stats['height']}, difficulty: {stats['difficulty']}")
                 
-                # Get integrity status
-                response = requests.get(f"{self.api_base}/integrity/status", timeout=10)
-                if response.status_code == 200:
-                    integrity = response.json()
+                if integrity_response.status_code == 200:
+                    integrity = integrity_response.json()
                     logger.info(f"Chain integrity: {integrity['chain_integrity']}")
                     
                     # Simulate blockchain sync (in production, would download actual blocks)
                     self.simulate_blockchain_data(stats['height'])
                     
+        except BlockValidationError as e:
+            logger.warning(f"Network sync rejected: {e}")
         except Exception as e:
             logger.warning(f"Network sync failed: {e}")
     
     def simulate_blockchain_data(self, height):
-        """Simulate blockchain data for testing"""
-        # Create simulated block data
-        blocks_data = b''
-        for i in range(height + 1):
+        """Simulate blockchain data for testing, extending the local chain up to height.
+        The blocks are sealed and imported like any others; one bad block rejects them all"""
+        # Create simulated blocks on top of the local tip
+        previous_hash = self.blocks[-1]['hash'] if self.blocks else '0' * 64
+        new_blocks = []
+        for i in range(len(self.blocks), height + 1):
             block = {
                 'height': i,
-                'hash': hashlib.sha256(f"block_{i}_{time.time()}".encode()).hexdigest(),
+                'previous_hash': previous_hash,
                 'timestamp': int(time.time()) - (height - i) * 600,  # 10 min blocks
                 'transactions': []
             }
-            block_json = json.dumps(block).encode()
-            blocks_data += len(block_json).to_bytes(4, 'big') + block_json
+            seal_block(block, self.difficulty)
+            new_blocks.append(block)
+            previous_hash = block['hash']
         
-        self.save_blockchain(blocks_data)
+        self.import_blocks(new_blocks, atomic=True)
         logger.info(f"Simulated blockchain with {height + 1} blocks")
     
-    def handle_peer_connection(self, conn, addr):
+    def handle_peer_connection(self, conn, addr, admitted=False):
         """Handle P2P peer connection"""
         peer_id = f"{addr[0]}:{addr[1]}"
-        logger.info(f"Peer connected: {peer_id}")
+        # Per-event messages pass % args: formatted later, grouped by the rate limit
+        logger.info("Peer connected: %s", peer_id)
         self.peers.add(peer_id)
         
         try:
@@ -132,11 +504,20 @@ class ZeroLinkChainNode:
                 try:
                     data = conn.recv(1024).decode().strip()
                     if data:
+                        if not self.admission.allow_message(addr[0]):
+                            logger.warning("Peer %s exceeded the message rate", peer_id)
+                            break
                         try:
                             message = json.loads(data)
-                            self.handle_peer_message(peer_id, message)
+                            msg_type = message.get('type')
+                            start = time.perf_counter()
+                            reply = self.handle_peer_message(peer_id, message)
+                            p2p_latency[msg_type if msg_type in P2P_MESSAGE_TYPES else 'other'].observe(
+                                time.perf_counter() - start)
+                            if reply is not None:
+                                conn.sendall((json.dumps(reply) + '\n').encode())
                         except json.JSONDecodeError:
-                            logger.warning(f"Invalid message from {peer_id}")
+                            logger.warning("Invalid message from %s", peer_id)
                             
                 except socket.timeout:
                     # Send keepalive
@@ -144,46 +525,70 @@ class ZeroLinkChainNode:
                     conn.send(keepalive.encode())
                     
         except Exception as e:
-            logger.warning(f"Peer {peer_id} disconnected: {e}")
+            logger.warning("Peer %s disconnected: %s", peer_id, e)
         finally:
             conn.close()
             self.peers.discard(peer_id)
-            logger.info(f"Peer disconnected: {peer_id}")
+            # Only a connection the accept loop admitted holds a slot to give back
+            if admitted:
+                self.admission.release(addr[0])
+            logger.info("Peer disconnected: %s", peer_id)
     
     def handle_peer_message(self, peer_id, message):
-        """Handle messages from peers"""
+        """Handle messages from peers, returning a reply message if one is due"""
         msg_type = message.get('type')
         
         if msg_type == 'get_blocks':
             # Peer requesting blocks
             start_height = message.get('start_height', 0)
-            logger.info(f"Peer {peer_id} requesting blocks from height {start_height}")
+            logger.info("Peer %s requesting blocks from height %s", peer_id, start_height)
             
         elif msg_type == 'new_block':
             # Peer announcing new block
             block_data = message.get('block')
-            logger.info(f"New block announced by {peer_id}: {block_data.get('hash', 'unknown')}")
+            logger.info("New block announced by %s: %s", peer_id, block_data.get('hash', 'unknown'))
+            try:
+                self.receive_block(block_data)
+            except (KeyError, ValueError) as e:
+                logger.warning("Rejected block from %s: %s", peer_id, e)
+        
+        elif msg_type == 'get_filters':
+            # Light peer scanning for relevant blocks
+            start_height = message.get('start_height', 0)
+            count = message.get('count', 1000)
+            # bool is an int subclass, but not a height or a count
+            if type(start_height) is not int or start_height < 0:
+                return {'type': 'error', 'error': 'start_height must be a non-negative integer'}
+            if type(count) is not int or not 1 <= count <= 5000:
+                return {'type': 'error', 'error': 'count must be an integer from 1 to 5000'}
+            return {'type': 'filters', 'filters': self.get_filters(start_height, count)}
             
         elif msg_type == 'ping':
             # Respond to ping
-            logger.debug(f"Ping from {peer_id}")
+            logger.debug("Ping from %s", peer_id)
     
     def start_p2p_server(self):
         """Start P2P server for peer connections"""
         server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         server_socket.bind(('0.0.0.0', self.port))
-        server_socket.listen(10)
+        server_socket.listen(128)
+        # Port 0 picks a free port; report the real one
+        self.port = server_socket.getsockname()[1]
         
         logger.info(f"P2P server listening on port {self.port}")
         
         while self.running:
             try:
                 conn, addr = server_socket.accept()
+                # Turn floods away before they cost a thread
+                if not self.admission.admit(addr[0]):
+                    conn.close()
+                    continue
                 # Handle each peer in a separate thread
                 peer_thread = threading.Thread(
                     target=self.handle_peer_connection,
-                    args=(conn, addr)
+                    args=(conn, addr, True)
                 )
                 peer_thread.daemon = True
                 peer_thread.start()
@@ -210,7 +615,8 @@ class ZeroLinkChainNode:
             'blocks_count': len(self.blocks),
             'p2p_port': self.port,
             'api_port': self.api_port,
-            'data_directory': self.data_dir
+            'data_directory': self.data_dir,
+            'admission': self.admission.stats()
         }
 
 class NodeAPIHandler(BaseHTTPRequestHandler):
@@ -220,9 +626,28 @@ class NodeAPIHandler(BaseHTTPRequestHandler):
         self.node = node
         super().__init__(*args, **kwargs)
     
+    def send_json(self, data, status=200):
+        """Send a JSON response"""
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps(data).encode())
+    
     def do_GET(self):
         """Handle GET requests"""
-        if self.path == '/stats':
+        url = urlsplit(self.path)
+        try:
+            self.route_get(url.path, parse_qs(url.query))
+        except QueryError as e:
+            # Raised before a route writes anything
+            self.send_json({'error': str(e)}, status=400)
+    
+    def route_get(self, path, query):
+        """Answer a GET; query_number raises QueryError on bad parameters"""
+        if path == '/metrics':
+            self.send_metrics()
+        
+        elif path == '/stats':
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
             self.end_headers()
@@ -230,7 +655,7 @@ class NodeAPIHandler(BaseHTTPRequestHandler):
             stats = self.node.get_node_stats()
             self.wfile.write(json.dumps(stats, indent=2).encode())
             
-        elif self.path == '/peers':
+        elif path == '/peers':
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
             self.end_headers()
@@ -238,22 +663,237 @@ class NodeAPIHandler(BaseHTTPRequestHandler):
             peers_list = list(self.node.peers)
             self.wfile.write(json.dumps({'peers': peers_list}).encode())
             
-        elif self.path == '/blockchain':
+        elif path == '/blockchain':
             self.send_response(200)
             self.send_header('Content-Type', 'application/octet-stream')
             self.end_headers()
             
             blockchain_data = self.node.load_blockchain()
             self.wfile.write(blockchain_data)
+        
+        elif path == '/tip':
+            self.send_json(self.node.get_tip())
+        
+        elif path == '/blocks':
+            start = query_number(query, 'start', 0)
+            limit = min(query_number(query, 'limit', 500, minimum=1), 2000)
+            blocks = self.node.get_blocks(start, limit)
+            self.send_json({'tip': self.node.get_tip(), 'blocks': blocks})
+        
+        elif path == '/filters':
+            start = query_number(query, 'start', 0)
+            limit = min(query_number(query, 'limit', 1000, minimum=1), 5000)
+            self.send_json({'tip': self.node.get_tip(), 'filters': self.node.get_filters(start, limit)})
+        
+        elif path.startswith('/proof/'):
+            proof = self.node.get_proof(path[len('/proof/'):])
+            if proof is None:
+                self.send_json({'error': 'Transaction not found'}, status=404)
+            else:
+                self.send_json(proof)
+        
+        elif path == '/mempool':
+            self.send_json(self.node.mempool.stats())
+        
+        elif path == '/mempool/template':
+            max_bytes = query_number(query, 'max_bytes', 1024 * 1024, minimum=0)
+            max_count = query_number(query, 'max_count', 5000, minimum=0)
+            selection = self.node.mempool.select(max_bytes, max_count)
+            selection['tip'] = self.node.get_tip()
+            self.send_json(selection)
+        
+        elif path == '/deadtx':
+            limit = min(query_number(query, 'limit', 100, minimum=1), 1000)
+            self.send_json({'metrics': self.node.dead_txs.metrics(), 'dead_txs': self.node.dead_txs.recent(limit)})
+        
+        elif path == '/chainchat/messages':
+            user = query.get('user', [None])[0]
+            if not user:
+                self.send_json({'error': 'user required'}, status=400)
+                return
+            since = query_number(query, 'since', 0)
+            limit = min(query_number(query, 'limit', 100, minimum=1), 1000)
+            partner = query.get('with', [None])[0]
+            if partner:
+                self.send_json(self.node.chat.conversation(user, partner, since, limit))
+            else:
+                self.send_json(self.node.chat.inbox(user, since, limit))
+        
+        elif path == '/chainstore/stats':
+            self.send_json(self.node.chainstore.stats())
+        
+        elif path.startswith('/chainstore/files/'):
+            try:
+                manifest = self.node.chainstore.get_manifest(path[len('/chainstore/files/'):])
+            except KeyError:
+                self.send_json({'error': 'File not found'}, status=404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Length', str(manifest['size']))
+            self.end_headers()
+            # One chunk in memory at a time
+            for data in self.node.chainstore.read(manifest['file_id']):
+                self.wfile.write(data)
+        
+        elif path.startswith('/balance/'):
+            self.send_json(self.node.get_balance(path[len('/balance/'):]))
+        
+        elif path.startswith('/admin/'):
+            self.handle_admin('GET', path, query)
+        
+        elif path == '/subscribe':
+            # Long-poll: answers as soon as a matching block arrives, or on timeout
+            since = query_number(query, 'since', -1)
+            address = query.get('address', [None])[0]
+            timeout = min(query_number(query, 'timeout', 25.0, float, minimum=0), MAX_SUBSCRIBE_TIMEOUT)
+            heights, rewound = self.node.wait_for_blocks(since, address, timeout)
+            self.send_json({'tip': self.node.get_tip(), 'changed': bool(heights) or rewound is not None,
+                            'heights': heights, 'reorg': rewound})
             
         else:
             self.send_response(404)
             self.end_headers()
             self.wfile.write(b'Not Found')
     
+    def send_metrics(self):
+        """Send every metric in the Prometheus text format"""
+        body = REGISTRY.expose().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_POST(self):
+        """Handle POST requests"""
+        path = urlsplit(self.path).path
+        
+        if path == '/tx':
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                tx = json.loads(self.rfile.read(length))
+                if not isinstance(tx, dict):
+                    raise ValueError("transaction must be a JSON object")
+                txid = self.node.submit_transaction(tx)
+                self.send_json({'accepted': True, 'txid': txid})
+            except (ValueError, KeyError, TypeError) as e:
+                # MempoolError and malformed JSON are both ValueErrors
+                self.send_json({'accepted': False, 'error': str(e)}, status=400)
+        
+        elif path in ('/chainchat/send', '/chainchat/read'):
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length))
+                if path == '/chainchat/read':
+                    unread = self.node.chat.mark_read(body['user'], int(body['message_id']))
+                    self.send_json({'success': True, 'unread': unread})
+                    return
+                record = self.node.send_chat_message(body['sender'], body['recipient'], body['message'],
+                                                     bool(body.get('is_video', False)))
+                self.send_json({'success': True, 'message_id': record['id'],
+                                'conversation': record['conversation'], 'dead_tx': True, 'rewarded': False})
+            except (ValueError, KeyError, TypeError) as e:
+                self.send_json({'success': False, 'error': str(e)}, status=400)
+        
+        elif path == '/chainstore/upload':
+            query = parse_qs(urlsplit(self.path).query)
+            filename = query.get('filename', [None])[0]
+            if not filename or 'Content-Length' not in self.headers:
+                self.send_json({'success': False, 'error': 'filename and Content-Length required'}, status=400)
+                return
+            stored = self.node.store_file(self.rfile, int(self.headers['Content-Length']), filename,
+                                          query.get('uploader', [None])[0], query.get('pgp_key_id', [None])[0])
+            self.send_json(dict(stored, success=True, dead_tx=True, rewarded=False))
+        
+        elif path.startswith('/admin/'):
+            self.handle_admin('POST', path, parse_qs(urlsplit(self.path).query))
+        
+        elif path == '/deadtx':
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                tx_id = self.node.submit_dead_tx(json.loads(self.rfile.read(length)))
+                # Accepted for writing; the lane persists it in the background
+                self.send_json({'accepted': True, 'tx_id': tx_id, 'dead_tx': True, 'rewarded': False}, status=202)
+            except DeadTxQueueFull as e:
+                self.send_json({'accepted': False, 'error': str(e)}, status=503)
+            except (ValueError, AttributeError) as e:
+                self.send_json({'accepted': False, 'error': str(e)}, status=400)
+        
+        else:
+            self.send_response(404)
+            self.end_headers()
+            self.wfile.write(b'Not Found')
+    
+    def handle_admin(self, method, path, query):
+        """Profiling endpoints, for loopback clients with the admin token"""
+        token = self.node.admin_token
+        if not token:
+            self.send_json({'error': 'admin API disabled: set ZLC_ADMIN_TOKEN to enable it'}, status=404)
+            return
+        if (self.client_address[0] not in ('127.0.0.1', '::1') or
+                # Bytes, since compare_digest refuses non-ASCII str
+                not hmac.compare_digest(self.headers.get('X-Admin-Token', '').encode(), token.encode())):
+            self.send_json({'error': 'forbidden'}, status=403)
+            return
+        
+        profiler = self.node.profiler
+        if method == 'POST' and path == '/admin/stacks':
+            stacks_path = profiler.dump_stacks()
+            with open(stacks_path) as f:
+                self.send_json({'path': stacks_path, 'stacks': f.read()})
+        elif method == 'POST' and path == '/admin/profile':
+            try:
+                seconds = query_number(query, 'seconds', 30.0, float, minimum=0)
+                seconds = min(max(seconds, MIN_PROFILE_SECONDS), MAX_PROFILE_SECONDS)
+                profiler.start(seconds)
+                self.send_json({'profiling': True, 'seconds': seconds, 'out_dir': profiler.out_dir}, status=202)
+            except ValueError as e:
+                self.send_json({'profiling': False, 'error': str(e)}, status=400)
+            except ProfilerBusy as e:
+                self.send_json({'profiling': False, 'error': str(e)}, status=409)
+        elif method == 'GET' and path == '/admin/profile':
+            self.send_json({'running': profiler.running(), 'last_report': profiler.last_report})
+        else:
+            self.send_json({'error': 'not found'}, status=404)
+    
+    def handle_one_request(self):
+        """Handle one request and record its latency by route"""
+        self.status = None
+        # Only set once a request line parses; cleared so a bad line on a kept-alive
+        # connection is not counted under the previous request's route
+        self.path = None
+        start = time.perf_counter()
+        super().handle_one_request()
+        if self.status is None:
+            return
+        # Unmatched paths share one series so clients cannot create new ones
+        if self.path is None:
+            route = 'invalid'
+        elif self.status == 404:
+            route = 'unmatched'
+        else:
+            route = '/' + urlsplit(self.path).path.split('/')[1]
+        histogram = api_latency.get(route)
+        if histogram is None:
+            histogram = api_latency[route] = REGISTRY.histogram(
+                'zlc_api_request_seconds', 'Node API request time', route=route)
+        histogram.observe(time.perf_counter() - start)
+        counter = api_responses.get(self.status)
+        if counter is None:
+            counter = api_responses[self.status] = REGISTRY.counter(
+                'zlc_api_responses_total', 'Node API responses', code=self.status)
+        counter.inc()
+    
+    def log_request(self, code='-', size='-'):
+        """Note the status and log a sample of requests (see ZLC_ACCESS_LOG_SAMPLE)"""
+        self.status = getattr(code, 'value', code)
+        if access_sample():
+            logger.info('API: "%s" %s %s', self.requestline, getattr(code, 'value', code), size)
+    
     def log_message(self, format, *args):
-        """Override to use our logger"""
-        logger.info(f"API: {format % args}")
+        """Override to use our logger; formatted by the log writer, not here"""
+        logger.warning("API: " + format, *args)
 
 def create_api_handler(node):
     """Create API handler with node reference"""
@@ -262,33 +902,44 @@ def create_api_handler(node):
     return handler
 
 class ZeroLinkChainNodeService:
-    def __init__(self):
-        self.node = ZeroLinkChainNode()
+    def __init__(self, node=None):
+        self.node = node or ZeroLinkChainNode()
         self.start_time = time.time()
+        self.api_server = None
+    
+    def create_api_server(self):
+        """Bind the HTTP API server (api_port 0 picks a free port)"""
+        handler = create_api_handler(self.node)
+        # Threaded so long-polling subscribers do not block other requests
+        self.api_server = ThreadingHTTPServer(('0.0.0.0', self.node.api_port), handler)
+        self.node.api_port = self.api_server.server_address[1]
+        return self.api_server
     
     def start_api_server(self):
         """Start HTTP API server"""
-        handler = create_api_handler(self.node)
-        api_server = HTTPServer(('0.0.0.0', self.node.api_port), handler)
+        api_server = self.api_server or self.create_api_server()
         
         logger.info(f"API server listening on port {self.node.api_port}")
         
-        while self.node.running:
-            try:
-                api_server.handle_request()
-            except Exception as e:
-                if self.node.running:
-                    logger.error(f"API server error: {e}")
-                    time.sleep(1)
+        # Errors in individual requests are handled by the server itself
+        api_server.serve_forever()
+    
+    def stop_api_server(self):
+        """Stop the HTTP API server"""
+        if self.api_server:
+            self.api_server.shutdown()
+            self.api_server.server_close()
+            self.api_server = None
     
     def run_service(self):
         """Run node as a service"""
         logger.info("Starting ZeroLinkChain Node Service")
         self.node.running = True
+        self.node.profiler.install_signals()
         self.node.start_time = self.start_time
         
         # Load existing blockchain
-        self.node.load_blockchain()
+        self.node.load_blocks()
         
         # Sync with network
         self.node.sync_with_network()
@@ -321,6 +972,7 @@ class ZeroLinkChainNodeService:
             except KeyboardInterrupt:
                 logger.info("Node service stopped by user")
                 self.node.running = False
+                self.node.dead_txs.stop()
                 break
             except Exception as e:
                 logger.error(f"Service error: {e}")
@@ -328,6 +980,7 @@ class ZeroLinkChainNodeService:
 
 def main():
     """Main service entry point"""
+    setup_logging('node')
     node_service = ZeroLinkChainNodeService()
     
     if len(sys.argv) > 1:
@@ -339,6 +992,7 @@ def main():
             
         elif command == "sync":
             print("Syncing with network...")
+            node_service.node.load_blocks()
             node_service.node.sync_with_network()
             print("Sync completed")
             
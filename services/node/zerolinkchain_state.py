@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Node State
+Address balance and nonce index kept up to date as blocks are connected and
+disconnected, persisted as periodic snapshots
+"""
+
+import os
+import json
+import logging
+import threading
+from collections import OrderedDict
+
+from zerolinkchain_storage import atomic_write_json
+
+logger = logging.getLogger('ZLC-Node')
+
+def block_deltas(block):
+    """Per-address [balance change, nonce change] for the transactions in block"""
+    deltas = {}
+    for tx in block.get('transactions', []):
+        senders = set()
+        for entry in tx.get('inputs', []):
+            delta = deltas.setdefault(entry['address'], [0.0, 0])
+            delta[0] -= entry['amount']
+            senders.add(entry['address'])
+        for entry in tx.get('outputs', []):
+            delta = deltas.setdefault(entry['address'], [0.0, 0])
+            delta[0] += entry['amount']
+        # Every transfer advances the nonce of each address it spends from
+        for address in senders:
+            deltas[address][1] += 1
+    return deltas
+
+class BalanceIndex:
+    """address -> [balance, nonce] for the current best chain"""
+    
+    def __init__(self, snapshot_file=None, snapshot_interval=1000, undo_depth=1000):
+        self.snapshot_file = snapshot_file
+        self.snapshot_interval = snapshot_interval
+        self.undo_depth = undo_depth
+        self.accounts = {}
+        self.height = -1
+        self.hash = None
+        # Previous account values per connected block hash, for exact rollback
+        self.undo = OrderedDict()
+        self.unsaved_blocks = 0
+        self.lock = threading.Lock()
+    
+    def get(self, address):
+        """Balance and nonce of address at the indexed height"""
+        with self.lock:
+            balance, nonce = self.accounts.get(address, (0.0, 0))
+            return {'address': address, 'balance': balance, 'nonce': nonce, 'height': self.height}
+    
+    def connect_block(self, block):
+        """Apply a block on top of the indexed tip"""
+        with self.lock:
+            undo = {}
+            for address, (amount, nonce) in block_deltas(block).items():
+                account = self.accounts.get(address)
+                undo[address] = None if account is None else tuple(account)
+                if account is None:
+                    account = self.accounts[address] = [0.0, 0]
+                account[0] += amount
+                account[1] += nonce
+            
+            self.undo[block['hash']] = undo
+            while len(self.undo) > self.undo_depth:
+                self.undo.popitem(last=False)
+            
+            self.height = block['height']
+            self.hash = block['hash']
+            self.unsaved_blocks += 1
+    
+    def connect_blocks(self, blocks):
+        """Apply consecutive blocks, snapshotting every snapshot_interval blocks"""
+        for block in blocks:
+            self.connect_block(block)
+        if self.snapshot_file and self.unsaved_blocks >= self.snapshot_interval:
+            self.save_snapshot()
+    
+    def disconnect_block(self, block, previous_block=None):
+        """Roll back the indexed tip block; previous_block becomes the new tip"""
+        with self.lock:
+            if block['hash'] != self.hash:
+                raise ValueError(f"Block {block['hash']} is not the indexed tip")
+            
+            undo = self.undo.pop(block['hash'], None)
+            if undo is not None:
+                for address, previous in undo.items():
+                    if previous is None:
+                        self.accounts.pop(address, None)
+                    else:
+                        self.accounts[address] = list(previous)
+            else:
+                # Older than the undo window: reverse the block's own deltas
+                for address, (amount, nonce) in block_deltas(block).items():
+                    account = self.accounts.setdefault(address, [0.0, 0])
+                    account[0] -= amount
+                    account[1] -= nonce
+                    if account == [0.0, 0]:
+                        del self.accounts[address]
+            
+            self.height = previous_block['height'] if previous_block else -1
+            self.hash = previous_block['hash'] if previous_block else None
+            self.unsaved_blocks += 1
+    
+    def save_snapshot(self):
+        """Write the index to the snapshot file"""
+        with self.lock:
+            snapshot = {'height': self.height, 'hash': self.hash, 'accounts': self.accounts}
+            atomic_write_json(self.snapshot_file, snapshot)
+            self.unsaved_blocks = 0
+        logger.info(f"State snapshot saved at height {snapshot['height']}")
+    
+    def load(self, blocks):
+        """Restore from the snapshot if it is on the given chain, then catch up"""
+        snapshot = None
+        try:
+            if self.snapshot_file and os.path.exists(self.snapshot_file):
+                with open(self.snapshot_file, 'r') as f:
+                    snapshot = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not load state snapshot: {e}")
+        
+        with self.lock:
+            self.accounts = {}
+            self.height = -1
+            self.hash = None
+            self.undo.clear()
+            self.unsaved_blocks = 0
+            
+            height = snapshot['height'] if snapshot else -1
+            if 0 <= height < len(blocks) and blocks[height]['hash'] == snapshot['hash']:
+                self.accounts = snapshot['accounts']
+                self.height = height
+                self.hash = snapshot['hash']
+            elif snapshot:
+                logger.warning(f"State snapshot at height {height} is not on the chain, rebuilding")
+        
+        self.connect_blocks(blocks[self.height + 1:])
+        logger.info(f"State index at height {self.height}: {len(self.accounts)} accounts")
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Block Validation
+Staged block validation: header and proof-of-work checks inline, transaction
+checks fanned out to a process pool in batches, and in-order commit
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from zerolinkchain_merkle import block_levels
+from zerolinkchain_chain import DEFAULT_DIFFICULTY
+
+logger = logging.getLogger('ZLC-Node')
+
+# Blocks may not be timestamped further than this into the future
+MAX_FUTURE_SECONDS = 2 * 60 * 60
+HEADER_FIELDS = ('height', 'previous_hash', 'timestamp', 'merkle_root', 'difficulty', 'nonce')
+
+class BlockValidationError(ValueError):
+    """A block failed validation"""
+    
+    def __init__(self, block, reason):
+        self.height = block.get('height')
+        self.hash = block.get('hash')
+        self.reason = reason
+        super().__init__(f"Invalid block {self.hash} at height {self.height}: {reason}")
+
+def header_hash(block):
+    """Proof-of-work hash over the header fields"""
+    header = {field: block.get(field) for field in HEADER_FIELDS}
+    return hashlib.sha256(json.dumps(header, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+def target_for(difficulty):
+    return int('0' * difficulty + 'f' * (64 - difficulty), 16)
+
+def seal_block(block, difficulty):
+    """Fill in the merkle root and search for a nonce meeting difficulty"""
+    block['merkle_root'] = block_levels(block)[-1][0].hex()
+    block['difficulty'] = difficulty
+    target = target_for(difficulty)
+    nonce = 0
+    while True:
+        block['nonce'] = nonce
+        block['hash'] = header_hash(block)
+        if int(block['hash'], 16) <= target:
+            return block
+        nonce += 1
+
+def check_header(block, previous, difficulty=DEFAULT_DIFFICULTY, now=None):
+    """Cheap context checks against the previous block and the network
+    difficulty; raises BlockValidationError"""
+    for field in ('height', 'hash', 'previous_hash', 'timestamp'):
+        if field not in block:
+            raise BlockValidationError(block, f"missing {field}")
+    
+    expected_height = previous['height'] + 1 if previous else 0
+    if block['height'] != expected_height:
+        raise BlockValidationError(block, f"height {block['height']}, expected {expected_height}")
+    if previous and block['previous_hash'] != previous['hash']:
+        raise BlockValidationError(block, "does not extend the previous block")
+    if block['timestamp'] > (now or time.time()) + MAX_FUTURE_SECONDS:
+        raise BlockValidationError(block, "timestamp too far in the future")
+    
+    # Every block from outside must prove work at the network difficulty;
+    # the difficulty a block claims for itself is never taken on trust
+    if 'nonce' not in block or 'difficulty' not in block:
+        raise BlockValidationError(block, "missing proof of work")
+    if block['difficulty'] != difficulty:
+        raise BlockValidationError(block, f"difficulty {block['difficulty']}, expected {difficulty}")
+    if block['hash'] != header_hash(block):
+        raise BlockValidationError(block, "hash does not match header")
+    if int(block['hash'], 16) > target_for(difficulty):
+        raise BlockValidationError(block, "hash does not meet difficulty target")
+
+def check_transactions(block):
+    """Context-free transaction checks; returns an error string or None"""
+    transactions = block.get('transactions', [])
+    seen = set()
+    for index, tx in enumerate(transactions):
+        txid = tx.get('txid')
+        if not txid:
+            return f"transaction {index} has no txid"
+        if txid in seen:
+            return f"duplicate transaction {txid}"
+        seen.add(txid)
+        
+        inputs = tx.get('inputs', [])
+        outputs = tx.get('outputs', [])
+        for entry in inputs + outputs:
+            amount = entry.get('amount')
+            if not isinstance(entry.get('address'), str) or not isinstance(amount, (int, float)) or amount <= 0:
+                return f"transaction {txid} has a malformed input or output"
+        
+        if tx.get('type') == 'coinbase':
+            if index != 0 or inputs:
+                return f"misplaced or funded coinbase {txid}"
+        elif not inputs or not outputs:
+            return f"transaction {txid} has no inputs or outputs"
+        elif sum(o['amount'] for o in outputs) > sum(i['amount'] for i in inputs) + 1e-9:
+            return f"transaction {txid} spends more than its inputs"
+    
+    if 'merkle_root' in block and block_levels(block)[-1][0].hex() != block['merkle_root']:
+        return "merkle root mismatch"
+    return None
+
+def check_batch(blocks):
+    """Worker: first failing (offset, reason) in a batch of blocks, or None"""
+    for offset, block in enumerate(blocks):
+        reason = check_transactions(block)
+        if reason:
+            return offset, reason
+    return None
+
+class ValidationPipeline:
+    """Validates runs of blocks and hands valid ones to commit in chain order"""
+    
+    def __init__(self, workers=None, batch_size=64, difficulty=DEFAULT_DIFFICULTY):
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.difficulty = difficulty
+        self.executor = None
+    
+    def check_block(self, block, previous):
+        """Validate a single block inline"""
+        check_header(block, previous, self.difficulty)
+        reason = check_transactions(block)
+        if reason:
+            raise BlockValidationError(block, reason)
+    
+    def validate(self, blocks, commit, previous=None):
+        """Validate consecutive blocks on top of previous, calling commit(batch) in
+        order. Stops at the first invalid block after committing everything before
+        it, then raises BlockValidationError. Returns throughput figures"""
+        start = time.time()
+        committed = 0
+        error = None
+        
+        if self.workers <= 1 or len(blocks) <= self.batch_size:
+            # Not worth the process pool
+            valid = []
+            for block in blocks:
+                try:
+                    self.check_block(block, previous)
+                except BlockValidationError as e:
+                    error = e
+                    break
+                valid.append(block)
+                previous = block
+            if valid:
+                commit(valid)
+                committed = len(valid)
+        else:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            
+            pending = deque()
+            index = 0
+            while index < len(blocks) or pending:
+                # Stage 1: headers inline, keeping a bounded number of batches in flight
+                while error is None and index < len(blocks) and len(pending) < self.workers * 2:
+                    batch = []
+                    while index < len(blocks) and len(batch) < self.batch_size:
+                        block = blocks[index]
+                        try:
+                            check_header(block, previous, self.difficulty)
+                        except BlockValidationError as e:
+                            error = e
+                            break
+                        batch.append(block)
+                        previous = block
+                        index += 1
+                    if batch:
+                        pending.append((batch, self.executor.submit(check_batch, batch)))
+                
+                if not pending:
+                    break
+                
+                # Stage 2/3: transaction results come back in submission order
+                batch, future = pending.popleft()
+                failure = future.result()
+                if failure is not None:
+                    offset, reason = failure
+                    error = BlockValidationError(batch[offset], reason)
+                    batch = batch[:offset]
+                    for _, later in pending:
+                        later.cancel()
+                    pending.clear()
+                if batch:
+                    commit(batch)
+                    committed += len(batch)
+        
+        elapsed = time.time() - start
+        stats = {
+            'validated': committed,
+            'seconds': elapsed,
+            'blocks_per_second': committed / elapsed if elapsed else 0.0
+        }
+        if error is not None:
+            logger.warning(f"{error} ({committed} blocks committed before it)")
+            raise error
+        return stats
+    
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
@@ -11,31 +11,62 @@ import json
 import hashlib
 import socket
 import threading
-import requests
 import logging
 from datetime import datetime
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('/var/log/zerolinkchain-pool.log'),
-        logging.StreamHandler()
-    ]
-)
+# Shared modules live in services/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from zerolinkchain_http import get_client
+from zerolinkchain_merkle import merkle_levels, leaf_hash
+from zerolinkchain_admission import AdmissionController
+from zerolinkchain_logging import setup_logging
+from zerolinkchain_metrics import REGISTRY, metrics_port, serve_metrics
+from zerolinkchain_profiling import Profiler
+
+# Logging is configured by main(); importing the module leaves it alone
 logger = logging.getLogger('ZLC-Pool')
 
+# Upstream API, override with ZLC_API_BASE (e.g. a local stand-in)
+API_BASE = os.environ.get('ZLC_API_BASE', 'https://zerolinkchain.com/api')
+
+# Port serving GET /metrics on localhost (0 disables), override with ZLC_METRICS_PORT
+METRICS_PORT = 9333
+
+share_latency = REGISTRY.histogram('zlc_pool_share_validation_seconds', 'Time to validate a share')
+share_results = {result: REGISTRY.counter('zlc_pool_shares_total', 'Shares by result', result=result)
+                 for result in ('share_accepted', 'block_found', 'share_rejected')}
+template_latency = REGISTRY.histogram('zlc_pool_template_seconds', 'Time to build a work template')
+
+# Local node supplying mempool transactions for templates (e.g. http://127.0.0.1:8335)
+NODE_URL = os.environ.get('ZLC_NODE_URL')
+
 class ZeroLinkChainPool:
-    def __init__(self, pool_address=None, port=8333):
+    def __init__(self, pool_address=None, port=8333, api_base=None, stats_ttl=5.0, node_url=None,
+                 template_bytes=1024 * 1024, admission=None, data_dir="/var/lib/zerolinkchain/pool"):
         self.pool_address = pool_address or self.load_pool_wallet()
         self.port = port
         self.miners = {}
+        # Connection caps and rate limits for the stratum port
+        self.admission = admission or AdmissionController()
         self.shares = []
         self.current_block = None
         self.difficulty = 4
-        self.api_base = "https://zerolinkchain.com/api"
+        self.api_base = api_base or API_BASE
+        self.http = get_client()
+        # Network stats change once per block; every miner's template shares them
+        self.stats_ttl = stats_ttl
+        self.node_url = (node_url or NODE_URL or '').rstrip('/') or None
+        self.template_bytes = template_bytes
+        # Transactions behind the current template's merkle root, kept for block submission
+        self.template_transactions = []
+        self.template_root = (None, None)
         self.running = False
+        # Stack dumps (SIGUSR1) and profiles (SIGUSR2) go to <data_dir>/profiles
+        self.profiler = Profiler(os.path.join(data_dir, "profiles"))
+        
+        REGISTRY.gauge('zlc_pool_connected_miners', 'Connected miners', lambda: len(self.miners))
+        REGISTRY.gauge('zlc_pool_open_connections', 'Admitted pool connections',
+                       lambda: self.admission.stats()['open_connections'])
         
         logger.info(f"ZeroLinkChain Pool initialized on port {port}")
         logger.info(f"Pool wallet: {self.pool_address}")
@@ -57,7 +88,7 @@ class ZeroLinkChainPool:
     def get_blockchain_stats(self):
         """Get current blockchain statistics"""
         try:
-            response = requests.get(f"{self.api_base}/miner/stats", timeout=10)
+            response = self.http.get(f"{self.api_base}/miner/stats", ttl=self.stats_ttl)
             if response.status_code == 200:
                 stats = response.json()
                 self.difficulty = stats.get('difficulty', 4)
@@ -71,9 +102,35 @@ class ZeroLinkChainPool:
             'hashrate_hps': 66666.67
         }
     
+    def get_template_transactions(self):
+        """Best-fee transaction set from the node's mempool (empty without a node)"""
+        if not self.node_url:
+            return {'transactions': [], 'fees': 0.0}
+        
+        try:
+            # The node selects the set; templates within stats_ttl share one fetch
+            response = self.http.get(f"{self.node_url}/mempool/template?max_bytes={self.template_bytes}",
+                                     ttl=self.stats_ttl)
+            if response.status_code == 200:
+                return response.json()
+            logger.warning(f"Mempool template query failed: {response.status_code}")
+        except Exception as e:
+            logger.warning(f"Failed to get mempool transactions: {e}")
+        
+        return {'transactions': [], 'fees': 0.0}
+    
     def create_work_template(self):
         """Create mining work template"""
+        start = time.perf_counter()
         stats = self.get_blockchain_stats()
+        selection = self.get_template_transactions()
+        self.template_transactions = selection['transactions']
+        
+        # The selection only changes when the node's answer does, so reuse its root
+        txids = tuple(tx['txid'] for tx in self.template_transactions)
+        if self.template_root[0] != txids:
+            root = merkle_levels([leaf_hash(tx) for tx in self.template_transactions])[-1][0].hex()
+            self.template_root = (txids, root)
         
         # Create block template
         template = {
@@ -82,15 +139,28 @@ class ZeroLinkChainPool:
             'difficulty': stats['difficulty'],
             'target': '0' * stats['difficulty'] + 'f' * (64 - stats['difficulty']),
             'coinbase_address': self.pool_address,
+            # Miners only need the commitment, not the transactions themselves
+            'merkle_root': self.template_root[1],
+            'transaction_count': len(self.template_transactions),
+            'fees': selection['fees'],
             'timestamp': int(time.time()),
             'nonce_start': 0,
             'nonce_end': 0xFFFFFFFF
         }
         
+        template_latency.observe(time.perf_counter() - start)
         return template
     
     def validate_share(self, miner_id, nonce, block_hash):
-        """Validate submitted mining share"""
+        """Validate submitted mining share, recording its latency and result"""
+        start = time.perf_counter()
+        result = self.check_share(miner_id, nonce, block_hash)
+        share_latency.observe(time.perf_counter() - start)
+        share_results[result['result']].inc()
+        return result
+    
+    def check_share(self, miner_id, nonce, block_hash):
+        """Check a share against the pool difficulty"""
         try:
             # Simple validation - check if hash meets pool difficulty
             hash_int = int(block_hash, 16)
@@ -110,7 +180,7 @@ class ZeroLinkChainPool:
                 
                 # Check if it's a valid block
                 if hash_int <= target_int // 4:  # Block found
-                    logger.info(f"Block found by miner {miner_id}!")
+                    logger.info("Block found by miner %s!", miner_id)
                     self.submit_block(share)
                     return {'result': 'block_found', 'reward': 10.0}
                 else:
@@ -119,7 +189,7 @@ class ZeroLinkChainPool:
                 return {'result': 'share_rejected', 'reason': 'insufficient_difficulty'}
                 
         except Exception as e:
-            logger.error(f"Share validation error: {e}")
+            logger.error("Share validation error: %s", e)
             return {'result': 'share_rejected', 'reason': 'validation_error'}
     
     def submit_block(self, share):
@@ -133,7 +203,7 @@ class ZeroLinkChainPool:
             }
             
             # In production, this would submit to the actual blockchain
-            logger.info(f"Block submitted: {share['hash']}")
+            logger.info("Block submitted: %s", share['hash'])
             
             # Distribute rewards to miners
             self.distribute_rewards(10.0)  # 10 ZLC block reward
@@ -165,12 +235,15 @@ class ZeroLinkChainPool:
             
             if miner_id in self.miners:
                 self.miners[miner_id]['balance'] += reward
-                logger.info(f"Reward distributed: {reward:.6f} ZLC to {miner_id}")
+                logger.debug("Reward distributed: %.6f ZLC to %s", reward, miner_id)
+        # One line per block; per-miner amounts are debug output
+        logger.info("Distributed %.6f ZLC among %d miners", total_reward * 0.98, len(miner_shares))
     
-    def handle_miner_connection(self, conn, addr):
+    def handle_miner_connection(self, conn, addr, admitted=False):
         """Handle individual miner connection"""
         miner_id = f"{addr[0]}:{addr[1]}"
-        logger.info(f"Miner connected: {miner_id}")
+        # Per-event messages pass % args: formatted later, grouped by the rate limit
+        logger.info("Miner connected: %s", miner_id)
         
         self.miners[miner_id] = {
             'address': addr,
@@ -193,6 +266,9 @@ class ZeroLinkChainPool:
                 try:
                     data = conn.recv(1024).decode().strip()
                     if data:
+                        if not self.admission.allow_message(addr[0]):
+                            logger.warning("Miner %s exceeded the message rate", miner_id)
+                            break
                         share_data = json.loads(data)
                         
                         # Validate share
@@ -217,29 +293,38 @@ class ZeroLinkChainPool:
                     conn.send(keepalive.encode())
                     
         except Exception as e:
-            logger.warning(f"Miner {miner_id} disconnected: {e}")
+            logger.warning("Miner %s disconnected: %s", miner_id, e)
         finally:
             conn.close()
             if miner_id in self.miners:
                 del self.miners[miner_id]
-            logger.info(f"Miner disconnected: {miner_id}")
+            # Only a connection the accept loop admitted holds a slot to give back
+            if admitted:
+                self.admission.release(addr[0])
+            logger.info("Miner disconnected: %s", miner_id)
     
     def start_pool_server(self):
         """Start the mining pool server"""
         server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         server_socket.bind(('0.0.0.0', self.port))
-        server_socket.listen(10)
+        server_socket.listen(128)
+        # Port 0 picks a free port; report the real one
+        self.port = server_socket.getsockname()[1]
         
         logger.info(f"Pool server listening on port {self.port}")
         
         while self.running:
             try:
                 conn, addr = server_socket.accept()
+                # Turn floods away before they cost a thread
+                if not self.admission.admit(addr[0]):
+                    conn.close()
+                    continue
                 # Handle each miner in a separate thread
                 miner_thread = threading.Thread(
                     target=self.handle_miner_connection,
-                    args=(conn, addr)
+                    args=(conn, addr, True)
                 )
                 miner_thread.daemon = True
                 miner_thread.start()
@@ -262,13 +347,20 @@ class ZeroLinkChainPool:
             'total_hashrate': total_hashrate,
             'total_shares': total_shares,
             'difficulty': self.difficulty,
-            'miners': list(self.miners.keys())
+            'miners': list(self.miners.keys()),
+            'admission': self.admission.stats()
         }
     
     def run_service(self):
         """Run pool as a service"""
         logger.info("Starting ZeroLinkChain Mining Pool Service")
         self.running = True
+        self.profiler.install_signals()
+        
+        port = metrics_port(METRICS_PORT)
+        if port:
+            serve_metrics(port)
+            logger.info(f"Metrics on http://127.0.0.1:{port}/metrics")
         
         # Start pool server in a separate thread
         server_thread = threading.Thread(target=self.start_pool_server)
@@ -296,6 +388,7 @@ class ZeroLinkChainPool:
 
 def main():
     """Main service entry point"""
+    setup_logging('pool')
     pool_service = ZeroLinkChainPool()
     
     if len(sys.argv) > 1:
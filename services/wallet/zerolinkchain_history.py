@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Wallet Transaction History
+Indexed SQLite store for wallet transactions with paginated queries and
+running totals, kept out of wallet.json
+"""
+
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    txid TEXT NOT NULL UNIQUE,
+    timestamp REAL NOT NULL,
+    type TEXT NOT NULL,
+    counterparty TEXT,
+    amount REAL NOT NULL,
+    height INTEGER,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tx_time ON transactions(timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_tx_type_time ON transactions(type, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_tx_counterparty_time ON transactions(counterparty, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_tx_height ON transactions(height);
+CREATE TABLE IF NOT EXISTS totals (
+    type TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    amount REAL NOT NULL
+);
+"""
+
+CORE_FIELDS = ('txid', 'timestamp', 'type', 'counterparty', 'amount', 'height')
+
+class TransactionHistory:
+    """Append-mostly transaction log for one wallet"""
+    
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        
+        # Running totals per type, kept in memory for O(1) reads
+        self.totals = {
+            tx_type: [count, amount]
+            for tx_type, count, amount in self.conn.execute('SELECT type, count, amount FROM totals')
+        }
+    
+    def normalize(self, tx):
+        """Map a transaction dict onto the stored columns"""
+        row = {
+            'txid': tx.get('txid') or tx.get('tx_id') or tx.get('hash'),
+            'timestamp': float(tx.get('timestamp') or tx.get('time') or time.time()),
+            'type': tx.get('type', 'transfer'),
+            'counterparty': tx.get('counterparty') or tx.get('to') or tx.get('from'),
+            'amount': float(tx.get('amount', 0.0)),
+            'height': tx.get('height')
+        }
+        if not row['txid']:
+            row['txid'] = hashlib.sha256(json.dumps(tx, sort_keys=True).encode()).hexdigest()
+        
+        extra = {key: value for key, value in tx.items() if key not in CORE_FIELDS}
+        row['data'] = json.dumps(extra, separators=(',', ':')) if extra else None
+        return row
+    
+    def add(self, tx):
+        """Record a transaction; returns False if its txid is already stored"""
+        return self.add_many([tx]) == 1
+    
+    def add_many(self, txs):
+        """Record transactions in one commit; returns how many were new"""
+        added = {}
+        with self.lock, self.conn:
+            for tx in txs:
+                row = self.normalize(tx)
+                cursor = self.conn.execute(
+                    'INSERT OR IGNORE INTO transactions '
+                    '(txid, timestamp, type, counterparty, amount, height, data) '
+                    'VALUES (:txid, :timestamp, :type, :counterparty, :amount, :height, :data)',
+                    row
+                )
+                if cursor.rowcount:
+                    delta = added.setdefault(row['type'], [0, 0.0])
+                    delta[0] += 1
+                    delta[1] += row['amount']
+            
+            self.apply_totals(added)
+        
+        return sum(delta[0] for delta in added.values())
+    
+    def remove_from_height(self, height):
+        """Drop transactions at or above height (chain reorganisation)"""
+        removed = {}
+        with self.lock, self.conn:
+            for tx_type, count, amount in self.conn.execute(
+                    'SELECT type, COUNT(*), TOTAL(amount) FROM transactions '
+                    'WHERE height >= ? GROUP BY type', (height,)):
+                removed[tx_type] = [-count, -amount]
+            self.conn.execute('DELETE FROM transactions WHERE height >= ?', (height,))
+            self.apply_totals(removed)
+        
+        return -sum(delta[0] for delta in removed.values())
+    
+    def apply_totals(self, deltas):
+        """Fold per-type deltas into the totals table and cache (caller holds lock)"""
+        for tx_type, (count, amount) in deltas.items():
+            self.conn.execute(
+                'INSERT INTO totals (type, count, amount) VALUES (?, ?, ?) '
+                'ON CONFLICT(type) DO UPDATE SET count = count + excluded.count, '
+                'amount = amount + excluded.amount',
+                (tx_type, count, amount)
+            )
+            total = self.totals.setdefault(tx_type, [0, 0.0])
+            total[0] += count
+            total[1] += amount
+    
+    def query(self, tx_type=None, counterparty=None, since=None, until=None, limit=100, cursor=None):
+        """Newest-first page of transactions and the cursor for the next page"""
+        clauses, params = [], []
+        if tx_type is not None:
+            clauses.append('type = ?')
+            params.append(tx_type)
+        if counterparty is not None:
+            clauses.append('counterparty = ?')
+            params.append(counterparty)
+        if since is not None:
+            clauses.append('timestamp >= ?')
+            params.append(since)
+        if until is not None:
+            clauses.append('timestamp < ?')
+            params.append(until)
+        if cursor:
+            cursor_time, cursor_id = cursor.split(':')
+            clauses.append('(timestamp < ? OR (timestamp = ? AND id < ?))')
+            params.extend([float(cursor_time), float(cursor_time), int(cursor_id)])
+        
+        sql = 'SELECT id, txid, timestamp, type, counterparty, amount, height, data FROM transactions'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY timestamp DESC, id DESC LIMIT ?'
+        params.append(limit)
+        
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        
+        transactions = []
+        for row_id, txid, timestamp, tx_type, party, amount, height, data in rows:
+            tx = json.loads(data) if data else {}
+            tx.update({
+                'txid': txid,
+                'timestamp': timestamp,
+                'type': tx_type,
+                'counterparty': party,
+                'amount': amount,
+                'height': height
+            })
+            transactions.append(tx)
+        
+        next_cursor = None
+        if len(rows) == limit:
+            next_cursor = f"{rows[-1][2]!r}:{rows[-1][0]}"
+        return transactions, next_cursor
+    
+    def count(self, tx_type=None):
+        """Number of stored transactions, overall or for one type"""
+        if tx_type is not None:
+            return self.totals.get(tx_type, [0, 0.0])[0]
+        return sum(total[0] for total in self.totals.values())
+    
+    def total(self, tx_type=None):
+        """Sum of amounts, overall or for one type"""
+        if tx_type is not None:
+            return self.totals.get(tx_type, [0, 0.0])[1]
+        return sum(total[1] for total in self.totals.values())
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
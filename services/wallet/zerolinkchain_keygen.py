@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Wallet Key Generation
+Address and key generation, including bulk and vanity generation spread
+over a process pool and streamed into a keystore directory
+"""
+
+import os
+import time
+import hashlib
+import secrets
+import string
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+# Simple word list for demo (use proper BIP39 in production)
+MNEMONIC_WORDS = [
+    'abandon', 'ability', 'able', 'about', 'above', 'absent',
+    'absorb', 'abstract', 'absurd', 'abuse', 'access', 'accident',
+    'account', 'accuse', 'achieve', 'acid', 'acoustic', 'acquire',
+    'across', 'act', 'action', 'actor', 'actress', 'actual'
+]
+
+def address_from_entropy(entropy):
+    """Format entropy as ZLC address (ZLC + 61 chars = 64 total)"""
+    return f"ZLC{hashlib.sha256(entropy).hexdigest()[:61]}"
+
+def generate_wallet_address():
+    """Generate a ZeroLinkChain wallet address"""
+    return address_from_entropy(secrets.token_bytes(32))
+
+def generate_private_key():
+    """Generate a 64-character hex private key"""
+    return secrets.token_hex(32)
+
+def generate_mnemonic():
+    """Generate a 12-word mnemonic phrase"""
+    return ' '.join(secrets.choice(MNEMONIC_WORDS) for _ in range(12))
+
+def keystore_record(address):
+    """Keystore entry for a freshly generated address"""
+    return {
+        'address': address,
+        'private_key': generate_private_key(),
+        'mnemonic': generate_mnemonic(),
+        'created_at': datetime.now().isoformat(),
+        'balance': 0.0,
+        'mining_rewards': 0.0
+    }
+
+def generate_chunk(count):
+    """Worker: count keystore entries"""
+    return [keystore_record(generate_wallet_address()) for _ in range(count)]
+
+def search_vanity(prefix, attempts):
+    """Worker: try attempts addresses for one starting with prefix"""
+    # A fresh random seed per call plus a counter gives unique entropy cheaply
+    seed = secrets.token_bytes(24)
+    for counter in range(attempts):
+        entropy = seed + counter.to_bytes(8, 'big')
+        address = address_from_entropy(entropy)
+        if address.startswith(prefix):
+            return counter + 1, address
+    return attempts, None
+
+def bulk_generate(count, keystore, workers=None, chunk_size=5000, progress=None):
+    """Generate count wallets across processes, storing each chunk in keystore
+    (a Keystore) as it arrives"""
+    workers = workers or os.cpu_count() or 1
+    start = time.time()
+    written = 0
+    submitted = 0
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        while written < count:
+            # Keep a couple of chunks per worker in flight, never the whole batch
+            while submitted < count and len(pending) < workers * 2:
+                size = min(chunk_size, count - submitted)
+                pending.add(pool.submit(generate_chunk, size))
+                submitted += size
+            
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                written += keystore.add_many(future.result())
+                if progress:
+                    progress(written, time.time() - start)
+    
+    elapsed = time.time() - start
+    return {
+        'count': written,
+        'seconds': elapsed,
+        'addresses_per_second': written / elapsed if elapsed else 0.0,
+        'keystore_dir': keystore.keystore_dir
+    }
+
+def validate_vanity_prefix(prefix):
+    """Prefixes are ZLC followed by lowercase hex"""
+    if not prefix.startswith('ZLC'):
+        prefix = f"ZLC{prefix}"
+    suffix = prefix[3:].lower()
+    if not suffix or any(c not in string.hexdigits.lower() for c in suffix) or len(suffix) > 61:
+        raise ValueError(f"Vanity prefix must be ZLC followed by 1-61 hex characters: {prefix}")
+    return f"ZLC{suffix}"
+
+def vanity_generate(prefix, keystore=None, workers=None, attempts_per_task=20000):
+    """Search for an address starting with prefix across processes, storing the
+    wallet in keystore if given"""
+    prefix = validate_vanity_prefix(prefix)
+    workers = workers or os.cpu_count() or 1
+    start = time.time()
+    attempts = 0
+    address = None
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(search_vanity, prefix, attempts_per_task) for _ in range(workers * 2)}
+        while address is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                tried, found = future.result()
+                attempts += tried
+                if found and address is None:
+                    address = found
+            if address is None:
+                for _ in done:
+                    pending.add(pool.submit(search_vanity, prefix, attempts_per_task))
+        
+        for future in pending:
+            future.cancel()
+    
+    record = keystore_record(address)
+    if keystore is not None:
+        keystore.add(record)
+    
+    elapsed = time.time() - start
+    return {
+        'wallet': record,
+        'attempts': attempts,
+        'expected_attempts': 16 ** (len(prefix) - 3),
+        'seconds': elapsed,
+        'addresses_per_second': attempts / elapsed if elapsed else 0.0
+    }
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Wallet Keystore
+Directory of wallets indexed by address, loaded on demand, with a scheduler
+that refreshes balances in bounded concurrent batches
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from zerolinkchain_http import ZeroLinkChainHTTPClient
+from zerolinkchain_storage import atomic_write_json, fsync_directory
+from zerolinkchain_wallet import ZeroLinkChainWallet
+
+logger = logging.getLogger('ZLC-Wallet')
+
+class Keystore:
+    """Wallet files stored as <address>.json in one directory"""
+    
+    def __init__(self, keystore_dir, api_base=None, http=None, max_loaded=20000):
+        self.keystore_dir = keystore_dir
+        self.api_base = api_base
+        self.http = http
+        self.max_loaded = max_loaded
+        self.addresses = None
+        self.generator = None
+        self.loaded = OrderedDict()
+        self.lock = threading.Lock()
+        
+        os.makedirs(keystore_dir, mode=0o700, exist_ok=True)
+    
+    def path_for(self, address):
+        return os.path.join(self.keystore_dir, f"{address}.json")
+    
+    def list_addresses(self):
+        """Addresses in the keystore, scanned once and kept up to date by add()"""
+        with self.lock:
+            if self.addresses is None:
+                names = sorted(
+                    entry.name[:-len('.json')]
+                    for entry in os.scandir(self.keystore_dir)
+                    if entry.name.startswith('ZLC') and entry.name.endswith('.json')
+                    and '.' not in entry.name[:-len('.json')]
+                )
+                self.addresses = dict.fromkeys(names)
+            return list(self.addresses)
+    
+    def add(self, wallet_data):
+        """Store a new wallet"""
+        address = wallet_data['address']
+        atomic_write_json(self.path_for(address), wallet_data, mode=0o600)
+        with self.lock:
+            if self.addresses is not None:
+                self.addresses[address] = None
+        return address
+    
+    def add_many(self, records):
+        """Store new wallets, flushing the directory once for the whole batch"""
+        for wallet_data in records:
+            atomic_write_json(self.path_for(wallet_data['address']), wallet_data, mode=0o600,
+                              sync_directory=False)
+        fsync_directory(self.keystore_dir)
+        with self.lock:
+            if self.addresses is not None:
+                self.addresses.update(dict.fromkeys(record['address'] for record in records))
+        return len(records)
+    
+    def create(self):
+        """Generate and store a new wallet without contacting the API"""
+        if self.generator is None:
+            self.generator = ZeroLinkChainWallet(data_dir=self.keystore_dir, api_base=self.api_base)
+        return self.add(self.generator.new_wallet_data())
+    
+    def get(self, address):
+        """Wallet for address, loading it on first use"""
+        with self.lock:
+            wallet = self.loaded.get(address)
+            if wallet is not None:
+                self.loaded.move_to_end(address)
+                return wallet
+        
+        wallet_file = self.path_for(address)
+        if not os.path.exists(wallet_file):
+            raise KeyError(address)
+        
+        wallet = ZeroLinkChainWallet(data_dir=self.keystore_dir, api_base=self.api_base,
+                                     wallet_file=wallet_file)
+        if self.http is not None:
+            wallet.http = self.http
+        wallet.load_wallet()
+        
+        evicted = []
+        with self.lock:
+            self.loaded[address] = wallet
+            while len(self.loaded) > self.max_loaded:
+                # Balance updates are saved as they happen, so eviction loses nothing
+                evicted.append(self.loaded.popitem(last=False)[1])
+        # Each loaded wallet may hold an open history database
+        for old in evicted:
+            old.close()
+        return wallet
+
+class MultiWalletService:
+    """Refreshes every keystore balance from one scheduler"""
+    
+    def __init__(self, keystore_dir, api_base=None, max_workers=32, batch_size=1000, interval=30):
+        self.http = ZeroLinkChainHTTPClient(pool_maxsize=max_workers, max_workers=max_workers)
+        self.keystore = Keystore(keystore_dir, api_base=api_base, http=self.http)
+        self.batch_size = batch_size
+        self.interval = interval
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='zlc-wallet')
+        self.last_cycle = None
+    
+    def refresh_wallet(self, address):
+        """Refresh one wallet; returns its balance or None on error"""
+        try:
+            wallet = self.keystore.get(address)
+            if not wallet.session_token:
+                wallet.create_api_session()
+            return wallet.get_balance()
+        except Exception as e:
+            logger.warning(f"Refresh failed for {address}: {e}")
+            return None
+    
+    def refresh_all(self):
+        """Run one refresh cycle over all wallets and report its latency"""
+        start = time.time()
+        addresses = self.keystore.list_addresses()
+        total_balance = 0.0
+        errors = 0
+        
+        # Batches bound the number of outstanding futures
+        for offset in range(0, len(addresses), self.batch_size):
+            batch = addresses[offset:offset + self.batch_size]
+            for balance in self.executor.map(self.refresh_wallet, batch):
+                if balance is None:
+                    errors += 1
+                else:
+                    total_balance += balance
+        
+        elapsed = time.time() - start
+        self.last_cycle = {
+            'wallets': len(addresses),
+            'errors': errors,
+            'total_balance': total_balance,
+            'cycle_seconds': elapsed,
+            'wallets_per_second': len(addresses) / elapsed if elapsed else 0.0
+        }
+        return self.last_cycle
+    
+    def run_service(self):
+        """Refresh all balances every interval"""
+        logger.info(f"Starting multi-wallet service for {self.keystore.keystore_dir}")
+        
+        while True:
+            try:
+                cycle = self.refresh_all()
+                logger.info(f"Refreshed {cycle['wallets']} wallets in {cycle['cycle_seconds']:.2f}s "
+                            f"({cycle['errors']} errors, total {cycle['total_balance']} ZLC)")
+                
+                time.sleep(max(0, self.interval - cycle['cycle_seconds']))
+            
+            except KeyboardInterrupt:
+                logger.info("Multi-wallet service stopped by user")
+                break
+            except Exception as e:
+                logger.error(f"Service error: {e}")
+                time.sleep(10)
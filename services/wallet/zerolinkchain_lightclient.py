@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Wallet Light Client
+Follows blocks from a local ZeroLinkChain node and keeps the wallet balance
+up to date from the outputs that concern its own address
+"""
+
+import os
+import json
+import logging
+
+from zerolinkchain_http import get_client
+from zerolinkchain_storage import atomic_write_json
+from zerolinkchain_filters import match_any
+
+logger = logging.getLogger('ZLC-Wallet')
+
+class LightClient:
+    """Incremental balance tracking for one wallet address"""
+    
+    def __init__(self, wallet, node_url, checkpoint_file=None, batch_size=500):
+        self.wallet = wallet
+        self.address = wallet.wallet_data['address']
+        self.node_url = node_url.rstrip('/')
+        self.checkpoint_file = checkpoint_file or wallet.checkpoint_file
+        self.batch_size = batch_size
+        self.http = get_client()
+        # Scan compact block filters and fetch only matching blocks, when the node serves them
+        self.use_filters = True
+        self.checkpoint = self.load_checkpoint()
+        
+        # The checkpoint is authoritative for the balance in light-client mode
+        self.wallet.update_wallet(balance=self.checkpoint['balance'],
+                                  mining_rewards=self.checkpoint['mining_rewards'])
+    
+    def empty_checkpoint(self):
+        return {'height': -1, 'hash': None, 'balance': 0.0, 'mining_rewards': 0.0}
+    
+    def load_checkpoint(self):
+        """Load the last processed height, or start from genesis"""
+        try:
+            if os.path.exists(self.checkpoint_file):
+                with open(self.checkpoint_file, 'r') as f:
+                    checkpoint = json.load(f)
+                logger.info(f"Light client resuming from height {checkpoint['height']}")
+                return checkpoint
+        except Exception as e:
+            logger.warning(f"Could not load light client checkpoint: {e}")
+        return self.empty_checkpoint()
+    
+    def save_checkpoint(self):
+        atomic_write_json(self.checkpoint_file, self.checkpoint, mode=0o600)
+    
+    def reset(self):
+        """Forget all processed blocks so the next sync rescans from genesis"""
+        self.checkpoint = self.empty_checkpoint()
+        self.wallet.history.remove_from_height(0)
+        self.wallet.update_wallet(balance=0.0, mining_rewards=0.0)
+    
+    def scan_block(self, block):
+        """History entries for the transactions in block touching our address"""
+        entries = []
+        for index, tx in enumerate(block.get('transactions', [])):
+            outputs = tx.get('outputs', [])
+            inputs = tx.get('inputs', [])
+            received = sum(o['amount'] for o in outputs if o.get('address') == self.address)
+            spent = sum(i['amount'] for i in inputs if i.get('address') == self.address)
+            if not received and not spent:
+                continue
+            
+            if tx.get('type') == 'coinbase' or not inputs:
+                tx_type = 'mining_reward'
+                others = []
+            elif spent > received:
+                tx_type = 'send'
+                others = [o.get('address') for o in outputs if o.get('address') != self.address]
+            else:
+                tx_type = 'receive'
+                others = [i.get('address') for i in inputs if i.get('address') != self.address]
+            
+            entries.append({
+                'txid': tx.get('txid') or f"{block['hash']}:{index}",
+                'timestamp': block.get('timestamp'),
+                'type': tx_type,
+                'counterparty': others[0] if others else None,
+                'amount': received - spent,
+                'height': block['height']
+            })
+        return entries
+    
+    def apply_blocks(self, blocks, tip=None):
+        """Apply the relevant blocks of a scanned range ending at tip (default: the
+        last block) and persist the new checkpoint"""
+        entries = []
+        for block in blocks:
+            for entry in self.scan_block(block):
+                self.checkpoint['balance'] += entry['amount']
+                if entry['type'] == 'mining_reward':
+                    self.checkpoint['mining_rewards'] += entry['amount']
+                entries.append(entry)
+        
+        tip = tip or blocks[-1]
+        self.checkpoint['height'] = tip['height']
+        self.checkpoint['hash'] = tip['hash']
+        
+        if entries:
+            self.wallet.record_transactions(entries)
+        self.save_checkpoint()
+        
+        self.wallet.update_wallet(balance=self.checkpoint['balance'],
+                                  mining_rewards=self.checkpoint['mining_rewards'])
+        self.wallet.save_wallet()
+    
+    def wait_for_update(self, timeout=25):
+        """Long-poll the node until a block touching our address arrives, then sync.
+        Returns True if the balance may have changed, False on timeout"""
+        response = self.http.get(
+            f"{self.node_url}/subscribe?address={self.address}"
+            f"&since={self.checkpoint['height']}&timeout={timeout}",
+            timeout=(3.05, timeout + 10)
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"Node subscription failed: {response.status_code}")
+        
+        result = response.json()
+        if not result['changed']:
+            # Still catch up on unrelated blocks so the next wait starts from the tip
+            # and a reorganisation below the checkpoint is noticed
+            if result['tip']['height'] > self.checkpoint['height']:
+                self.sync()
+            return False
+        self.sync()
+        return True
+    
+    def fetch_blocks(self, start, limit):
+        """Blocks from the node, or None if the query failed"""
+        response = self.http.get(f"{self.node_url}/blocks?start={start}&limit={limit}")
+        if response.status_code != 200:
+            logger.warning(f"Node block query failed: {response.status_code}")
+            return None
+        return response.json()['blocks']
+    
+    def fetch_range(self, start, limit):
+        """Filters (or full blocks from nodes without filters) for a height range"""
+        if self.use_filters:
+            response = self.http.get(f"{self.node_url}/filters?start={start}&limit={limit}")
+            if response.status_code == 200:
+                return response.json()['filters']
+            if response.status_code != 404:
+                logger.warning(f"Node filter query failed: {response.status_code}")
+                return None
+            logger.info("Node does not serve block filters, downloading full blocks")
+            self.use_filters = False
+        return self.fetch_blocks(start, limit)
+    
+    def relevant_blocks(self, entries):
+        """Full blocks for the entries whose filter matches our address, or None
+        if the node's chain changed while fetching"""
+        if 'filter' not in entries[0]:
+            return entries
+        
+        matches = [entry for entry in entries
+                   if match_any(bytes.fromhex(entry['filter']), entry['hash'], [self.address])]
+        blocks = []
+        index = 0
+        while index < len(matches):
+            # Fetch runs of consecutive matching heights in one request
+            end = index + 1
+            while end < len(matches) and matches[end]['height'] == matches[end - 1]['height'] + 1:
+                end += 1
+            run = self.fetch_blocks(matches[index]['height'], end - index)
+            if run is None or [b['hash'] for b in run] != [m['hash'] for m in matches[index:end]]:
+                return None
+            blocks.extend(run)
+            index = end
+        return blocks
+    
+    def sync(self):
+        """Process blocks past the checkpoint; returns how many were scanned"""
+        scanned = 0
+        while True:
+            # Re-fetch the checkpoint entry itself to detect a reorganisation below it
+            height = self.checkpoint['height']
+            entries = self.fetch_range(max(height, 0), self.batch_size + 1)
+            if entries is None:
+                return scanned
+            
+            if height >= 0:
+                if not entries or entries[0]['hash'] != self.checkpoint['hash']:
+                    logger.warning(f"Block at height {height} changed, rescanning chain")
+                    self.reset()
+                    continue
+                entries = entries[1:]
+            
+            if not entries:
+                return scanned
+            
+            blocks = self.relevant_blocks(entries)
+            if blocks is None:
+                return scanned
+            
+            self.apply_blocks(blocks, entries[-1])
+            scanned += len(entries)
+            
+            if len(entries) < self.batch_size:
+                return scanned
@@ -8,30 +8,57 @@ import os
 import sys
 import time
 import json
-import hashlib
-import secrets
-import requests
 import logging
+import argparse
 from datetime import datetime
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('/var/log/zerolinkchain-wallet.log'),
-        logging.StreamHandler()
-    ]
-)
+# Shared modules live in services/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from zerolinkchain_http import get_client
+from zerolinkchain_storage import atomic_write_json
+from zerolinkchain_history import TransactionHistory
+from zerolinkchain_lightclient import LightClient
+import zerolinkchain_keygen as keygen
+from zerolinkchain_logging import setup_logging
+from zerolinkchain_metrics import REGISTRY, metrics_port, serve_metrics
+
+# Logging is configured by main(); importing the module leaves it alone
 logger = logging.getLogger('ZLC-Wallet')
 
+# Upstream API, override with ZLC_API_BASE (e.g. a local stand-in)
+API_BASE = os.environ.get('ZLC_API_BASE', 'https://zerolinkchain.com/api')
+
+# Port serving GET /metrics on localhost (0 disables), override with ZLC_METRICS_PORT
+METRICS_PORT = 9336
+
+save_latency = REGISTRY.histogram('zlc_wallet_save_seconds', 'Time to write the wallet file')
+
+# Polling backs off up to this interval while the balance is unchanged
+MAX_POLL_INTERVAL = 300
+
 class ZeroLinkChainWallet:
-    def __init__(self, data_dir="/var/lib/zerolinkchain/wallet"):
+    def __init__(self, data_dir="/var/lib/zerolinkchain/wallet", api_base=None, node_url=None,
+                 wallet_file=None):
         self.data_dir = data_dir
-        self.wallet_file = os.path.join(data_dir, "wallet.json")
-        self.api_base = "https://zerolinkchain.com/api"
+        if wallet_file:
+            # Keystore wallets keep their side files next to <address>.json
+            base = os.path.splitext(wallet_file)[0]
+            self.wallet_file = wallet_file
+            self.history_file = f"{base}.history.db"
+            self.checkpoint_file = f"{base}.lightclient.json"
+        else:
+            self.wallet_file = os.path.join(data_dir, "wallet.json")
+            self.history_file = os.path.join(data_dir, "history.db")
+            self.checkpoint_file = os.path.join(data_dir, "lightclient.json")
+        self._history = None
+        self.api_base = api_base or API_BASE
+        self.http = get_client()
+        # Local node to follow in light-client mode instead of polling the API
+        self.node_url = node_url or os.environ.get('ZLC_NODE_URL')
+        self.light_client = None
         self.wallet_data = None
         self.session_token = None
+        self.dirty = False
         
         # Ensure data directory exists
         os.makedirs(data_dir, exist_ok=True)
@@ -40,55 +67,40 @@ class ZeroLinkChainWallet:
     
     def generate_wallet_address(self):
         """Generate a ZeroLinkChain wallet address"""
-        # Generate 32 bytes of entropy
-        entropy = secrets.token_bytes(32)
-        # Create address hash
-        address_hash = hashlib.sha256(entropy).hexdigest()
-        # Format as ZLC address (ZLC + 61 chars = 64 total)
-        return f"ZLC{address_hash[:61]}"
+        return keygen.generate_wallet_address()
     
     def generate_private_key(self):
         """Generate a 64-character hex private key"""
-        return secrets.token_hex(32)
+        return keygen.generate_private_key()
     
     def generate_mnemonic(self):
         """Generate a 12-word mnemonic phrase"""
-        # Simple word list for demo (use proper BIP39 in production)
-        words = [
-            'abandon', 'ability', 'able', 'about', 'above', 'absent',
-            'absorb', 'abstract', 'absurd', 'abuse', 'access', 'accident',
-            'account', 'accuse', 'achieve', 'acid', 'acoustic', 'acquire',
-            'across', 'act', 'action', 'actor', 'actress', 'actual'
-        ]
-        return ' '.join(secrets.choice(words) for _ in range(12))
+        return keygen.generate_mnemonic()
+    
+    def new_wallet_data(self):
+        """Generate credentials for a new wallet"""
+        return {
+            'address': self.generate_wallet_address(),
+            'private_key': self.generate_private_key(),
+            'mnemonic': self.generate_mnemonic(),
+            'created_at': datetime.now().isoformat(),
+            'balance': 0.0,
+            'mining_rewards': 0.0
+        }
     
     def create_wallet(self):
         """Create a new wallet"""
         try:
             # Generate wallet credentials
-            address = self.generate_wallet_address()
-            private_key = self.generate_private_key()
-            mnemonic = self.generate_mnemonic()
+            wallet_data = self.new_wallet_data()
+            address = wallet_data['address']
             
-            # Create wallet data
-            wallet_data = {
-                'address': address,
-                'private_key': private_key,
-                'mnemonic': mnemonic,
-                'created_at': datetime.now().isoformat(),
-                'balance': 0.0,
-                'mining_rewards': 0.0,
-                'transactions': []
-            }
-            
-            # Save wallet to file
-            with open(self.wallet_file, 'w') as f:
-                json.dump(wallet_data, f, indent=2)
-            
-            # Set secure permissions
-            os.chmod(self.wallet_file, 0o600)
+            # Save wallet to file, created with secure permissions
+            atomic_write_json(self.wallet_file, wallet_data, mode=0o600)
             
             self.wallet_data = wallet_data
+            self.dirty = False
+            
             logger.info(f"Wallet created: {address}")
             
             # Create session with API
@@ -109,6 +121,15 @@ class ZeroLinkChainWallet:
             
             with open(self.wallet_file, 'r') as f:
                 self.wallet_data = json.load(f)
+            self.dirty = False
+            
+            # Move transactions from older wallet.json files into the history store
+            legacy_transactions = self.wallet_data.pop('transactions', None)
+            if legacy_transactions is not None:
+                self.history.add_many(legacy_transactions)
+                self.dirty = True
+                self.save_wallet()
+                logger.info(f"Migrated {len(legacy_transactions)} transactions to {self.history_file}")
             
             logger.info(f"Wallet loaded: {self.wallet_data['address']}")
             
@@ -125,9 +146,8 @@ class ZeroLinkChainWallet:
         """Create API session for secure wallet operations"""
         try:
             # Use the secure wallet API
-            response = requests.post(f"{self.api_base}/wallet/import/privatekey", 
-                                   json={'private_key': self.wallet_data['private_key']},
-                                   timeout=10)
+            response = self.http.post(f"{self.api_base}/wallet/import/privatekey",
+                                      json={'private_key': self.wallet_data['private_key']})
             
             if response.status_code == 200:
                 session_data = response.json()
@@ -141,22 +161,24 @@ class ZeroLinkChainWallet:
     
     def get_balance(self):
         """Get wallet balance from blockchain"""
+        if self.node_url:
+            return self.get_light_balance()
+        
         try:
             if not self.session_token:
                 logger.warning("No API session, using local balance")
                 return self.wallet_data.get('balance', 0.0)
             
             headers = {'Authorization': f'Bearer {self.session_token}'}
-            response = requests.get(f"{self.api_base}/wallet/balance", 
-                                  headers=headers, timeout=10)
+            response = self.http.get(f"{self.api_base}/wallet/balance", headers=headers)
             
             if response.status_code == 200:
                 balance_data = response.json()
                 balance = balance_data.get('balance', 0.0)
                 
-                # Update local wallet data
-                self.wallet_data['balance'] = balance
-                self.wallet_data['mining_rewards'] = balance_data.get('mining_rewards', 0.0)
+                # Update local wallet data, only written when it changed
+                self.update_wallet(balance=balance,
+                                   mining_rewards=balance_data.get('mining_rewards', 0.0))
                 self.save_wallet()
                 
                 return balance
@@ -168,11 +190,61 @@ class ZeroLinkChainWallet:
             logger.error(f"Balance query error: {e}")
             return self.wallet_data.get('balance', 0.0)
     
-    def save_wallet(self):
-        """Save wallet data to file"""
+    def get_light_balance(self):
+        """Get wallet balance by following new blocks from the local node"""
         try:
-            with open(self.wallet_file, 'w') as f:
-                json.dump(self.wallet_data, f, indent=2)
+            if self.light_client is None:
+                self.light_client = LightClient(self, self.node_url)
+            self.light_client.sync()
+        except Exception as e:
+            logger.warning(f"Light client sync failed: {e}")
+        
+        return self.wallet_data.get('balance', 0.0)
+    
+    def wait_for_balance_change(self, timeout=25):
+        """Wait on the local node for a block concerning this wallet (light-client mode)"""
+        if self.light_client is None:
+            self.light_client = LightClient(self, self.node_url)
+        return self.light_client.wait_for_update(timeout)
+    
+    @property
+    def history(self):
+        """Transaction history store, opened on first use"""
+        if self._history is None:
+            self._history = TransactionHistory(self.history_file)
+        return self._history
+    
+    def close(self):
+        """Close the history store; it reopens on next use"""
+        if self._history is not None:
+            self._history.close()
+            self._history = None
+    
+    def record_transactions(self, transactions):
+        """Add transactions to the history; returns how many were new"""
+        return self.history.add_many(transactions)
+    
+    def update_wallet(self, **fields):
+        """Update wallet fields, marking the wallet dirty if anything changed"""
+        changed = False
+        for key, value in fields.items():
+            if self.wallet_data.get(key) != value:
+                self.wallet_data[key] = value
+                changed = True
+        
+        self.dirty = self.dirty or changed
+        return changed
+    
+    def save_wallet(self, force=False):
+        """Save wallet data to file if it changed since the last save"""
+        if not self.dirty and not force:
+            return
+        
+        try:
+            start = time.perf_counter()
+            atomic_write_json(self.wallet_file, self.wallet_data, mode=0o600)
+            save_latency.observe(time.perf_counter() - start)
+            self.dirty = False
             logger.debug("Wallet data saved")
         except Exception as e:
             logger.error(f"Failed to save wallet: {e}")
@@ -190,7 +262,7 @@ class ZeroLinkChainWallet:
             'mining_rewards': self.wallet_data.get('mining_rewards', 0.0),
             'created_at': self.wallet_data.get('created_at'),
             'session_active': bool(self.session_token),
-            'transactions_count': len(self.wallet_data.get('transactions', []))
+            'transactions_count': self.history.count()
         }
     
     def run_service(self):
@@ -205,17 +277,42 @@ class ZeroLinkChainWallet:
         logger.info(f"Wallet Address: {self.wallet_data['address']}")
         logger.info(f"Initial Balance: {self.get_balance()} ZLC")
         
+        REGISTRY.gauge('zlc_wallet_balance', 'Last known wallet balance in ZLC',
+                       lambda: self.wallet_data.get('balance', 0.0))
+        port = metrics_port(METRICS_PORT)
+        if port:
+            serve_metrics(port)
+            logger.info(f"Metrics on http://127.0.0.1:{port}/metrics")
+        
+        # Light-client mode is notified by the node; polling backs off while idle
+        if self.node_url:
+            logger.info(f"Light-client mode, following node at {self.node_url}")
+        min_interval = 5 if self.node_url else 30
+        interval = min_interval
+        balance = self.wallet_data.get('balance', 0.0)
+        
         # Service loop
         while True:
             try:
-                # Update balance every 30 seconds
-                balance = self.get_balance()
-                logger.info(f"Current Balance: {balance} ZLC")
+                if self.node_url:
+                    try:
+                        if self.wait_for_balance_change():
+                            balance = self.wallet_data.get('balance', 0.0)
+                            logger.info(f"Current Balance: {balance} ZLC")
+                        interval = min_interval
+                        continue
+                    except Exception as e:
+                        logger.warning(f"Node subscription unavailable, polling instead: {e}")
                 
-                # Check for new transactions (placeholder)
-                # In production, this would sync with the blockchain
+                new_balance = self.get_balance()
+                if new_balance != balance:
+                    balance = new_balance
+                    logger.info(f"Current Balance: {balance} ZLC")
+                    interval = min_interval
+                else:
+                    interval = min(interval * 2, MAX_POLL_INTERVAL)
                 
-                time.sleep(30)
+                time.sleep(interval)
                 
             except KeyboardInterrupt:
                 logger.info("Wallet service stopped by user")
@@ -224,19 +321,52 @@ class ZeroLinkChainWallet:
                 logger.error(f"Service error: {e}")
                 time.sleep(10)
 
+def parse_generation_options(args, data_dir):
+    """Options for bulk and vanity generation"""
+    parser = argparse.ArgumentParser(prog='zerolinkchain_wallet.py')
+    parser.add_argument('--count', type=int, default=1)
+    parser.add_argument('--prefix')
+    parser.add_argument('--out', default=os.path.join(data_dir, "keystore"))
+    parser.add_argument('--workers', type=int)
+    return parser.parse_args(args)
+
 def main():
     """Main service entry point"""
+    setup_logging('wallet')
     wallet_service = ZeroLinkChainWallet()
     
     if len(sys.argv) > 1:
         command = sys.argv[1]
         
-        if command == "create":
+        if command == "create" and len(sys.argv) > 2:
+            # Bulk generation: create --count N [--out KEYSTORE_DIR] [--workers W]
+            from zerolinkchain_keystore import Keystore
+            options = parse_generation_options(sys.argv[2:], wallet_service.data_dir)
+            print(f"Generating {options.count} wallets into {options.out}...")
+            result = keygen.bulk_generate(options.count, Keystore(options.out), options.workers)
+            print(f"Generated {result['count']} wallets in {result['seconds']:.2f}s "
+                  f"({result['addresses_per_second']:.0f} addresses/sec)")
+        
+        elif command == "create":
             wallet = wallet_service.create_wallet()
             if wallet:
                 print(f"Wallet created: {wallet['address']}")
                 print(f"Private key: {wallet['private_key']}")
                 print(f"Mnemonic: {wallet['mnemonic']}")
+        
+        elif command == "vanity":
+            # Vanity search: vanity --prefix ZLCabc [--out KEYSTORE_DIR] [--workers W]
+            from zerolinkchain_keystore import Keystore
+            options = parse_generation_options(sys.argv[2:], wallet_service.data_dir)
+            if not options.prefix:
+                print("Usage: zerolinkchain_wallet.py vanity --prefix ZLCabc [--out KEYSTORE_DIR] [--workers W]")
+                return
+            print(f"Searching for {options.prefix}...")
+            result = keygen.vanity_generate(options.prefix, Keystore(options.out), options.workers)
+            print(f"Wallet created: {result['wallet']['address']}")
+            print(f"Tried {result['attempts']} addresses in {result['seconds']:.2f}s "
+                  f"({result['addresses_per_second']:.0f} addresses/sec)")
+            print(f"Saved to {options.out}")
             
         elif command == "info":
             wallet_service.load_wallet()
@@ -249,8 +379,20 @@ def main():
             balance = wallet_service.get_balance()
             print(f"Balance: {balance} ZLC")
             
+        elif command == "history":
+            wallet_service.load_wallet()
+            limit = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+            transactions, cursor = wallet_service.history.query(limit=limit)
+            print(json.dumps({'transactions': transactions, 'next_cursor': cursor}, indent=2))
+        
+        elif command == "multi":
+            # Keystore of many wallets refreshed by one scheduler
+            from zerolinkchain_keystore import MultiWalletService
+            keystore_dir = sys.argv[2] if len(sys.argv) > 2 else os.path.join(wallet_service.data_dir, "keystore")
+            MultiWalletService(keystore_dir).run_service()
+        
         else:
-            print("Usage: zerolinkchain_wallet.py [create|info|balance|service]")
+            print("Usage: zerolinkchain_wallet.py [create|vanity|info|balance|history|multi|service]")
     else:
         # Run as service
         wallet_service.run_service()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain HTTP Client Test
+Checks connection reuse, caching, fan-out and circuit breaking
+"""
+
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BASE_DIR, 'services', 'common'))
+
+from zerolinkchain_standin import StandInAPI
+from zerolinkchain_http import ZeroLinkChainHTTPClient, CircuitOpenError
+
+def test_keep_alive():
+    """Sequential calls share one connection"""
+    print("🔗 Testing Keep-Alive...")
+    client = ZeroLinkChainHTTPClient()
+    with StandInAPI() as api:
+        for _ in range(20):
+            assert client.get(f"{api.url}/miner/stats").status_code == 200
+        assert api.request_counts['/api/miner/stats'] == 20
+        assert api.connection_count == 1
+    client.close()
+    print("✅ 20 requests over 1 connection")
+
+def test_ttl_cache():
+    """Cached GETs do not reach upstream until they expire"""
+    print("\n🗄️ Testing TTL Cache...")
+    client = ZeroLinkChainHTTPClient()
+    with StandInAPI() as api:
+        for _ in range(10):
+            client.get(f"{api.url}/miner/stats", ttl=0.2)
+        assert api.request_counts['/api/miner/stats'] == 1
+        
+        time.sleep(0.25)
+        client.get(f"{api.url}/miner/stats", ttl=0.2)
+        assert api.request_counts['/api/miner/stats'] == 2
+    client.close()
+    print("✅ Cache hit until expiry")
+
+def test_fan_out():
+    """Independent calls overlap instead of adding up"""
+    print("\n🔀 Testing Fan-Out...")
+    client = ZeroLinkChainHTTPClient()
+    with StandInAPI(latency=0.2) as api:
+        start = time.time()
+        stats, integrity = client.fan_out([
+            ('GET', f"{api.url}/miner/stats", {}),
+            ('GET', f"{api.url}/integrity/status", {})
+        ])
+        elapsed = time.time() - start
+        
+        assert stats.json()['height'] == 18
+        assert integrity.json()['chain_integrity'] == 'verified'
+        assert elapsed < 0.35
+    client.close()
+    print(f"✅ Two 200 ms calls in {elapsed * 1000:.0f} ms")
+
+def test_circuit_breaker():
+    """A failing host is skipped until the reset timeout passes"""
+    print("\n🛑 Testing Circuit Breaker...")
+    client = ZeroLinkChainHTTPClient(failure_threshold=3, reset_timeout=0.2)
+    with StandInAPI() as api:
+        api.fail('/api/miner/stats')
+        for _ in range(3):
+            assert client.get(f"{api.url}/miner/stats").status_code == 503
+        
+        try:
+            client.get(f"{api.url}/miner/stats")
+            assert False, "circuit should be open"
+        except CircuitOpenError:
+            pass
+        assert api.request_counts['/api/miner/stats'] == 3
+        
+        api.clear_failures()
+        time.sleep(0.25)
+        assert client.get(f"{api.url}/miner/stats").status_code == 200
+        assert client.get(f"{api.url}/miner/stats").status_code == 200
+    client.close()
+    print("✅ Circuit opened after 3 failures and recovered")
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("🚀 ZEROLINKCHAIN HTTP CLIENT TEST")
+    print("=" * 60)
+    
+    tests = [
+        test_keep_alive,
+        test_ttl_cache,
+        test_fan_out,
+        test_circuit_breaker
+    ]
+    
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            print(f"❌ {test.__name__} failed: {e}")
+            failed += 1
+    
+    print(f"\n✅ Passed: {len(tests) - failed}/{len(tests)}")
+    return failed == 0
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Network Test
+Checks VPN host bookkeeping, ChainRoute planning and admission control
+without network access
+"""
+
+import os
+import sys
+import time
+import random
+import itertools
+import socket
+import threading
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+for service_dir in ('common', 'pool'):
+    sys.path.insert(0, os.path.join(BASE_DIR, 'services', service_dir))
+
+from zerolinkchain_routes import RoutePlanner, RouteError
+from zerolinkchain_hosts import HostRegistry
+from zerolinkchain_real import ZeroLinkChainReal
+from zerolinkchain_admission import AdmissionController
+from zerolinkchain_standin import StandInAPI
+from zerolinkchain_pool import ZeroLinkChainPool
+
+def test_route_planner():
+    """Routes take the fastest hosts with distinct ASNs and ISPs"""
+    print("\n🔀 Testing ChainRoute Planner...")
+    planner = RoutePlanner()
+    planner.add_host('fast_a', 'AS1', 'ISP1', 1000)
+    # Same ASN as fast_a, so never in a route with it
+    planner.add_host('fast_b', 'AS1', 'ISP2', 900)
+    # Same ISP as fast_a
+    planner.add_host('fast_c', 'AS2', 'ISP1', 800)
+    planner.add_host('mid', 'AS2', 'ISP3', 500)
+    planner.add_host('slow', 'AS3', 'ISP4', 50)
+    planner.add_host('slower', 'AS4', 'ISP4', 10)
+    
+    route = planner.create_route(min_hops=2, max_hops=5)
+    assert [hop['host_id'] for hop in route['hops']] == ['fast_a', 'mid', 'slow']
+    assert route['asn_diversity'] == 1.0 and route['isp_diversity'] == 1.0
+    assert route['total_bandwidth'] == 50
+    
+    # Repeated requests hit the cache; a host change invalidates it
+    again = planner.create_route(min_hops=2, max_hops=5)
+    assert again['route_id'] != route['route_id'] and again['hops'] == route['hops']
+    assert planner.stats()['cache_hits'] == 1
+    planner.remove_host('fast_a')
+    route = planner.create_route(min_hops=2, max_hops=5)
+    assert [hop['host_id'] for hop in route['hops']] == ['fast_b', 'fast_c', 'slow']
+    
+    # Bandwidth floors and impossible hop counts are refused
+    assert len(planner.create_route(min_hops=2, max_hops=2, min_bandwidth=500)['hops']) == 2
+    for min_hops, max_hops, min_bandwidth in ((5, 6, 0), (3, 3, 500), (3, 2, 0)):
+        try:
+            planner.create_route(min_hops, max_hops, min_bandwidth)
+            assert False, f"planned {min_hops}..{max_hops} hops at {min_bandwidth} Mbps"
+        except RouteError:
+            pass
+    
+    # The fastest host can be the wrong first pick: A conflicts with both others
+    tight = RoutePlanner()
+    tight.add_host('A', 'as1', 'isp1', 100)
+    tight.add_host('B', 'as1', 'isp2', 90)
+    tight.add_host('C', 'as2', 'isp1', 80)
+    assert [hop['host_id'] for hop in tight.create_route(2, 2)['hops']] == ['B', 'C']
+    
+    # Same length and bottleneck as an exhaustive search on small random networks
+    rng = random.Random(7)
+    for _ in range(200):
+        small = RoutePlanner()
+        hosts = [(f"h{i}", f"AS{rng.randrange(4)}", f"ISP{rng.randrange(4)}", rng.randrange(1, 50))
+                 for i in range(rng.randrange(1, 9))]
+        for host in hosts:
+            small.add_host(*host)
+        best = (0, 0)
+        for count in range(1, 5):
+            for combo in itertools.combinations(hosts, count):
+                if len({h[1] for h in combo}) == len({h[2] for h in combo}) == count:
+                    best = max(best, (count, min(h[3] for h in combo)))
+        try:
+            planned = small.create_route(1, 4)
+            assert (len(planned['hops']), planned['total_bandwidth']) == best
+            assert planned['asn_diversity'] == planned['isp_diversity'] == 1.0
+        except RouteError:
+            assert best == (0, 0)
+    print(f"✅ Route of {len(route['hops'])} hops at {route['total_bandwidth']} Mbps")
+
+def test_host_registry():
+    """Heartbeats keep hosts active, the timer wheel expires them, counters follow"""
+    print("\n🖥️ Testing Host Registry...")
+    changes = []
+    registry = HostRegistry(timeout=30, on_change=lambda record: changes.append((record.host_id, record.active)))
+    now = time.time()
+    for i in range(300):
+        registry.heartbeat(f"host_{i:03d}", now=now, host_type=i % 3 + 1, location=f"City {i % 4}",
+                           bandwidth_mbps=10)
+    counts = registry.counts()
+    assert counts['active'] == 300 and counts['active_bandwidth'] == 3000
+    assert counts['types'] == {name: {'total': 100, 'active': 100}
+                               for name in ('found_by_chain', 'joined_for_rewards', 'donated')}
+    assert counts['locations']['City 0'] == 75
+    
+    # A bad field is refused before anything changes, for known and new hosts alike
+    for host_id, details in (('host_000', {'bogus': 1}), ('host_new', {'bogus': 1}),
+                             ('host_000', {'bandwidth_mbps': 'fast'})):
+        try:
+            registry.heartbeat(host_id, now=now, **details)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+    assert registry.counts() == counts and 'host_new' not in registry
+    assert registry.get('host_000').slot is not None
+    
+    # Half the hosts keep sending heartbeats; the rest expire once their deadline passes
+    for i in range(0, 300, 2):
+        registry.heartbeat(f"host_{i:03d}", now=now + 20)
+    assert registry.expire(now + 25) == []
+    expired = registry.expire(now + 31)
+    assert len(expired) == 150 and all(int(record.host_id[5:]) % 2 for record in expired)
+    counts = registry.counts()
+    assert counts['active'] == 150 and counts['types']['donated'] == {'total': 100, 'active': 50}
+    assert sum(counts['locations'].values()) == 150
+    assert ('host_001', False) in changes
+    
+    # A heartbeat brings a host back; removal drops it from every counter
+    registry.heartbeat('host_001', now=now + 32)
+    registry.remove('host_002')
+    assert registry.counts()['active'] == 150 and len(registry) == 299
+    assert registry.expire(now + 51) and registry.counts()['active'] == 1
+    
+    # Cursor pagination walks every host once, in registration order
+    seen = []
+    cursor = None
+    while True:
+        page = registry.list_hosts(cursor, limit=64)
+        seen += [host['host_id'] for host in page['hosts']]
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert seen == [f"host_{i:03d}" for i in range(300) if i != 2]
+    active = registry.list_hosts(limit=10, active_only=True)
+    assert [host['host_id'] for host in active['hosts']] == ['host_001'] and active['next_cursor'] is None
+    print(f"✅ {len(expired)} hosts expired, {len(seen)} listed in pages of 64")
+
+def test_real_system_routes():
+    """Only active hosts in the in-process engine are routable"""
+    print("\n🌐 Testing Engine Routes...")
+    system = ZeroLinkChainReal(difficulty=1)
+    for i in range(10):
+        system.add_host(f"host_{i}", f"City {i}", 10 * (i + 1), asn=f"AS{i}", isp=f"ISP{i}")
+    system.set_host_active('host_9', False)
+    system.remove_host('host_8')
+    
+    route = system.create_route(min_hops=3, max_hops=3)
+    assert [hop['host_id'] for hop in route['hops']] == ['host_7', 'host_6', 'host_5']
+    status = system.get_system_status()
+    assert status['active_hosts'] == 8
+    assert status['network_throughput'] == sum(10 * (i + 1) for i in range(8))
+    
+    system.set_host_active('host_9', True)
+    assert system.create_route(min_hops=3, max_hops=3)['hops'][0]['host_id'] == 'host_9'
+    print(f"✅ {status['active_hosts']} routable hosts, {status['network_throughput']} Mbps")
+
+def test_admission():
+    """Token buckets refill with time and caps hold per address and subnet"""
+    print("\n🛡️ Testing Admission Control...")
+    admission = AdmissionController(connect_rate=1.0, connect_burst=3, subnet_connect_rate=10.0,
+                                    subnet_connect_burst=5, message_rate=10.0, message_burst=5,
+                                    max_per_ip=2, max_per_subnet=4, max_connections=6)
+    now = 1000.0
+    assert admission.admit('10.0.0.1', now) and admission.admit('10.0.0.1', now)
+    assert not admission.admit('10.0.0.1', now)
+    admission.release('10.0.0.1')
+    # The cap has room again, but the third connect in a burst of 3 is the last
+    assert admission.admit('10.0.0.1', now)
+    admission.release('10.0.0.1')
+    assert not admission.admit('10.0.0.1', now)
+    assert admission.admit('10.0.0.1', now + 1.0)
+    
+    # Neighbours share the /24's budget; another subnet has its own
+    assert admission.admit('10.0.0.2', now + 1.0) and admission.admit('10.0.0.3', now + 1.0)
+    assert not admission.admit('10.0.0.4', now + 1.0)
+    assert admission.admit('10.0.1.1', now + 1.0) and admission.admit('10.0.2.1', now + 1.0)
+    assert not admission.admit('10.0.3.1', now + 1.0)
+    
+    assert all(admission.allow_message('10.0.0.1', now) for _ in range(5))
+    assert not admission.allow_message('10.0.0.1', now)
+    assert admission.allow_message('10.0.0.1', now + 0.1)
+    stats = admission.stats()
+    assert stats['open_connections'] == 6
+    assert stats['rejected'] == {'ip_connections': 1, 'ip_rate': 1, 'subnet_connections': 1,
+                                 'max_connections': 1, 'message_rate': 1}
+    # Releasing an address that holds no slot changes nothing
+    assert not admission.release('10.9.9.9')
+    assert admission.release('10.0.2.1') and not admission.release('10.0.2.1')
+    assert admission.stats()['open_connections'] == 5
+    
+    # The pool closes a refused connection without starting a miner thread
+    with StandInAPI() as api:
+        pool = ZeroLinkChainPool(pool_address='ZLC' + 'a' * 61, port=0, api_base=api.url,
+                                 admission=AdmissionController(max_per_ip=1))
+        pool.running = True
+        threading.Thread(target=pool.start_pool_server, daemon=True).start()
+        while not pool.port:
+            time.sleep(0.01)
+        first = socket.create_connection(('127.0.0.1', pool.port), timeout=5)
+        assert first.makefile('rb').readline()
+        second = socket.create_connection(('127.0.0.1', pool.port), timeout=5)
+        assert second.recv(1024) == b''
+        assert len(pool.miners) == 1 and pool.get_pool_stats()['admission']['rejected'] == {'ip_connections': 1}
+        first.close()
+        second.close()
+        pool.running = False
+    print(f"✅ {stats['open_connections']} connections admitted, {sum(stats['rejected'].values())} refused")
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("🚀 ZEROLINKCHAIN NETWORK TEST")
+    print("=" * 60)
+    
+    tests = [
+        test_route_planner,
+        test_host_registry,
+        test_real_system_routes,
+        test_admission
+    ]
+    
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            print(f"❌ {test.__name__} failed: {e}")
+            failed += 1
+    
+    print(f"\n✅ Passed: {len(tests) - failed}/{len(tests)}")
+    return failed == 0
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
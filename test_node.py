@@ -0,0 +1,791 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Node Test
+Checks the node's block store and indexes without network access
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+for service_dir in ('common', 'node', 'pool'):
+    sys.path.insert(0, os.path.join(BASE_DIR, 'services', service_dir))
+
+from zerolinkchain_node import ZeroLinkChainNode, ZeroLinkChainNodeService
+from zerolinkchain_chain import ChainIndex
+from zerolinkchain_filters import match_any
+from zerolinkchain_merkle import verify_proof
+from zerolinkchain_state import BalanceIndex
+from zerolinkchain_validation import ValidationPipeline, BlockValidationError, seal_block
+from zerolinkchain_mempool import Mempool, MempoolError
+from zerolinkchain_deadtx import DeadTxLane, DeadTxQueueFull, make_dead_tx
+from zerolinkchain_merkle import merkle_levels, leaf_hash
+from zerolinkchain_standin import StandInAPI
+from zerolinkchain_pool import ZeroLinkChainPool
+from zerolinkchain_metrics import Registry, metrics_port, serve_metrics
+from zerolinkchain_profiling import Profiler
+
+MINER = 'ZLC' + 'a' * 61
+ALICE = 'ZLC' + 'b' * 61
+BOB = 'ZLC' + 'c' * 61
+
+def make_chain(start, count, previous_hash='0' * 64, tag='main', difficulty=None):
+    """Blocks paying 10 ZLC to the miner, who sends 2 to Alice; Alice sends 1 to Bob every other block.
+    With a difficulty the blocks are sealed, as blocks from peers must be"""
+    blocks = []
+    for height in range(start, start + count):
+        transactions = [
+            {'txid': f"{tag}_coinbase_{height}", 'type': 'coinbase', 'inputs': [],
+             'outputs': [{'address': MINER, 'amount': 10.0}]},
+            {'txid': f"{tag}_pay_{height}", 'type': 'transfer',
+             'inputs': [{'address': MINER, 'amount': 2.0}],
+             'outputs': [{'address': ALICE, 'amount': 2.0}]}
+        ]
+        if height % 2:
+            transactions.append({'txid': f"{tag}_tip_{height}", 'type': 'transfer',
+                                 'inputs': [{'address': ALICE, 'amount': 1.0}],
+                                 'outputs': [{'address': BOB, 'amount': 1.0}]})
+        block = {'height': height, 'hash': f"{tag}_{height}_".ljust(64, '0'), 'previous_hash': previous_hash,
+                 'timestamp': 1000 + height * 600, 'transactions': transactions}
+        if difficulty is not None:
+            seal_block(block, difficulty)
+        blocks.append(block)
+        previous_hash = block['hash']
+    return blocks
+
+def start_api(node):
+    """Serve the node API on a free port; returns the service and base URL"""
+    service = ZeroLinkChainNodeService(node)
+    service.create_api_server()
+    threading.Thread(target=service.start_api_server, daemon=True).start()
+    return service, f"http://127.0.0.1:{node.api_port}"
+
+def get_json(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return json.loads(response.read())
+
+def test_balance_index():
+    """Balances follow appended and disconnected blocks and survive a restart"""
+    print("\n📒 Testing Balance Index...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        node = ZeroLinkChainNode(data_dir=data_dir, api_port=0)
+        node.state.snapshot_interval = 50
+        node.append_blocks(make_chain(0, 100))
+        node.append_blocks(make_chain(100, 20, node.blocks[-1]['hash']))
+        service, node_url = start_api(node)
+        
+        alice = get_json(f"{node_url}/balance/{ALICE}")
+        assert alice == {'address': ALICE, 'balance': 180.0, 'nonce': 60, 'height': 119}
+        assert node.get_balance(MINER)['balance'] == 960.0
+        assert node.get_balance(MINER)['nonce'] == 120
+        assert get_json(f"{node_url}/balance/ZLCunknown")['balance'] == 0.0
+        
+        # Unparseable or out-of-range numbers in the query are a 400, not a dropped
+        # connection or a way around the page caps
+        for query in ('blocks?start=abc', 'filters?limit=1.5', 'mempool/template?max_bytes=x',
+                      'deadtx?limit=ten', 'chainchat/messages?user=a&since=b', 'subscribe?timeout=nan',
+                      'blocks?start=0&limit=-1', 'filters?limit=0', 'deadtx?limit=-5', 'subscribe?timeout=-1'):
+            try:
+                get_json(f"{node_url}/{query}")
+                assert False, f"expected 400 for {query}"
+            except urllib.error.HTTPError as e:
+                assert e.code == 400 and 'must be' in json.loads(e.read())['error']
+        service.stop_api_server()
+        
+        # Disconnecting restores the previous values exactly
+        node.disconnect_tip()
+        node.disconnect_tip()
+        assert node.get_balance(ALICE) == {'address': ALICE, 'balance': 177.0, 'nonce': 59, 'height': 117}
+        assert node.get_balance(BOB)['balance'] == 59.0
+        
+        # The restarted node resumes from the snapshot and catches up from the block file
+        assert os.path.exists(os.path.join(data_dir, 'state.json'))
+        restarted = ZeroLinkChainNode(data_dir=data_dir, api_port=0)
+        restarted.load_blocks()
+        assert restarted.state.height == 117
+        assert restarted.get_balance(ALICE) == node.get_balance(ALICE)
+        assert restarted.get_balance(MINER) == node.get_balance(MINER)
+        
+        # A snapshot from a different chain is discarded and the index rebuilt
+        with open(os.path.join(data_dir, 'state.json'), 'w') as f:
+            json.dump({'height': 10, 'hash': 'other', 'accounts': {BOB: [1e6, 0]}}, f)
+        rebuilt = ZeroLinkChainNode(data_dir=data_dir, api_port=0)
+        rebuilt.load_blocks()
+        assert rebuilt.get_balance(BOB) == node.get_balance(BOB)
+        print(f"✅ {len(restarted.state.accounts)} accounts indexed at height {restarted.state.height}")
+
+def test_block_filters():
+    """Filters match the addresses in their block and are served over HTTP and P2P"""
+    print("\n🧮 Testing Block Filters...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        node = ZeroLinkChainNode(data_dir=data_dir, api_port=0, port=0)
+        node.append_blocks(make_chain(0, 50))
+        service, node_url = start_api(node)
+        
+        filters = get_json(f"{node_url}/filters?start=10&limit=5")['filters']
+        assert [entry['height'] for entry in filters] == [10, 11, 12, 13, 14]
+        assert filters[0]['header'] == node.filter_headers[10]
+        for entry in filters:
+            data = bytes.fromhex(entry['filter'])
+            assert match_any(data, entry['hash'], [MINER])
+            assert match_any(data, entry['hash'], [BOB]) == bool(entry['height'] % 2)
+        
+        # Strangers match at roughly the 1/784931 false-positive rate
+        strangers = [f"ZLC{i:061x}" for i in range(2000)]
+        false_positives = sum(match_any(node.filters[0], node.blocks[0]['hash'], [a]) for a in strangers)
+        assert false_positives <= 1
+        block_bytes = len(json.dumps(node.blocks[0]))
+        assert len(node.filters[0]) * 10 < block_bytes
+        service.stop_api_server()
+        
+        # P2P peers ask with get_filters on the peer connection
+        peer, server = socket.socketpair()
+        node.running = True
+        threading.Thread(target=node.handle_peer_connection, args=(server, ('127.0.0.1', 1)),
+                         daemon=True).start()
+        stream = peer.makefile('r')
+        assert json.loads(stream.readline())['type'] == 'node_info'
+        peer.sendall(json.dumps({'type': 'get_filters', 'start_height': 48, 'count': 10}).encode())
+        reply = json.loads(stream.readline())
+        assert reply['type'] == 'filters'
+        assert [entry['height'] for entry in reply['filters']] == [48, 49]
+        # Bad counts get an error reply and the connection stays up
+        for request in ({'count': 'ten'}, {'count': -1}, {'count': 0}, {'count': 5001}, {'start_height': 'x'}):
+            assert json.loads(stream.readline())['type'] == 'node_info'
+            peer.sendall(json.dumps(dict(request, type='get_filters')).encode())
+            reply = json.loads(stream.readline())
+            assert reply['type'] == 'error' and 'must be' in reply['error']
+        assert json.loads(stream.readline())['type'] == 'node_info'
+        peer.sendall(json.dumps({'type': 'get_filters', 'start_height': 49, 'count': 1}).encode())
+        assert [entry['height'] for entry in json.loads(stream.readline())['filters']] == [49]
+        node.running = False
+        peer.close()
+        
+        # Disconnecting drops the filter with its block
+        node.disconnect_tip()
+        assert len(node.filters) == len(node.filter_headers) == 49
+        print(f"✅ {len(node.filters[0])}-byte filters for {block_bytes}-byte blocks")
+
+def test_merkle_proofs():
+    """Every transaction has a log-size proof against its block's Merkle root"""
+    print("\n🌳 Testing Merkle Proofs...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        node = ZeroLinkChainNode(data_dir=data_dir, api_port=0)
+        node.merkle.cache_size = 4
+        chain = make_chain(0, 20)
+        # A large block with an odd transaction count exercises carried-up nodes
+        chain[5]['transactions'] += [{'txid': f"bulk_{i}", 'type': 'transfer', 'inputs': [],
+                                      'outputs': [{'address': BOB, 'amount': i}]} for i in range(998)]
+        node.append_blocks(chain)
+        service, node_url = start_api(node)
+        
+        for block in (chain[5], chain[19]):
+            for index, tx in enumerate(block['transactions']):
+                proof = node.get_proof(tx['txid'])
+                assert (proof['height'], proof['index']) == (block['height'], index)
+                assert verify_proof(bytes.fromhex(proof['leaf']), proof['proof'], proof['merkle_root'])
+        
+        # Block 5 was evicted from the four-entry cache and rebuilt on demand
+        proof = get_json(f"{node_url}/proof/bulk_500")
+        assert len(proof['proof']) == 10
+        assert proof['merkle_root'] == node.merkle.roots[5]
+        assert not verify_proof(bytes.fromhex(proof['leaf']), proof['proof'][:-1], proof['merkle_root'])
+        assert not verify_proof(bytes(32), proof['proof'], proof['merkle_root'])
+        
+        try:
+            get_json(f"{node_url}/proof/missing")
+            assert False, "expected 404"
+        except urllib.error.HTTPError as e:
+            assert e.code == 404
+        service.stop_api_server()
+        
+        # Disconnected transactions no longer have proofs
+        node.disconnect_tip()
+        assert node.get_proof('main_coinbase_19') is None
+        assert node.get_proof('main_coinbase_18')['height'] == 18
+        # A proof for a block located before a reorg is still built from that block
+        proof = node.merkle.proof('main_coinbase_19', chain[19], 0)
+        assert proof['height'] == 19 and verify_proof(bytes.fromhex(proof['leaf']), proof['proof'], proof['merkle_root'])
+        print(f"✅ {len(proof['proof'])}-step proof for a {len(chain[5]['transactions'])}-transaction block")
+
+def test_deep_reorg():
+    """A heavier fork replaces only the divergent suffix of a long chain"""
+    print("\n🔀 Testing Deep Reorg...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        node = ZeroLinkChainNode(data_dir=data_dir, api_port=0, difficulty=1)
+        main_chain = make_chain(0, 20000)
+        node.append_blocks(main_chain)
+        
+        # A block claiming a huge difficulty counts no more work than any other
+        claim = make_chain(19999, 1, main_chain[19998]['hash'], tag='claim', difficulty=1)[0]
+        claim['difficulty'] = 40
+        node.chain.insert(claim)
+        assert node.chain.best.hash == main_chain[-1]['hash']
+        
+        # A 1100-block fork from height 19000 overtakes the 1000 blocks above it
+        fork = make_chain(19000, 1100, main_chain[18999]['hash'], tag='fork', difficulty=1)
+        assert node.receive_block(fork[1]) is False
+        assert node.chain.orphans
+        for block in fork[:1000]:
+            assert node.receive_block(block) is False
+        assert node.blocks[-1]['hash'] == main_chain[-1]['hash']
+        
+        start = time.time()
+        assert node.receive_block(fork[1000]) is True
+        reorg_seconds = time.time() - start
+        disconnect, connect = node.chain.fork_path(main_chain[-1]['hash'], fork[1000]['hash'])
+        assert (len(disconnect), len(connect)) == (1000, 1001)
+        for block in fork[1001:]:
+            assert node.receive_block(block) is True
+        
+        assert len(node.blocks) == 20100
+        assert node.blocks[-1]['hash'] == fork[-1]['hash']
+        assert node.get_proof('main_coinbase_19500') is None
+        assert node.get_proof('fork_coinbase_19500')['height'] == 19500
+        
+        # Balances match an index built from scratch on the winning chain
+        expected = BalanceIndex()
+        expected.connect_blocks(main_chain[:19000] + fork)
+        for address in (MINER, ALICE, BOB):
+            assert node.get_balance(address) == expected.get(address)
+        
+        # Announcing a known block is a no-op and the block file holds the fork
+        assert node.receive_block(main_chain[-1]) is False
+        restarted = ZeroLinkChainNode(data_dir=data_dir, api_port=0, difficulty=1)
+        restarted.load_blocks()
+        assert restarted.get_tip() == node.get_tip()
+        assert restarted.get_balance(ALICE) == node.get_balance(ALICE)
+        
+        assert reorg_seconds < 2.0
+        
+        # Orphans are capped per parent and in total, oldest evicted first
+        index = ChainIndex(max_orphans=10, max_orphans_per_parent=3)
+        index.insert(main_chain[0])
+        flood = [dict(block, hash=f"flood_{i}", previous_hash='f' * 64) for i, block in enumerate(main_chain[1:21])]
+        for block in flood + flood:
+            assert index.insert(block) is None
+        assert [block['hash'] for block, _ in index.orphans['f' * 64]] == ['flood_17', 'flood_18', 'flood_19']
+        strays = [dict(main_chain[i + 2], previous_hash=f"stray_{i}") for i in range(12)]
+        for block in strays:
+            index.insert(block)
+        assert len(index.orphan_parents) == 10 and 'f' * 64 not in index.orphans
+        # A held orphan still attaches when its parent arrives
+        assert index.insert(main_chain[2]) is None
+        index.insert(main_chain[1])
+        assert index.best.hash == main_chain[2]['hash'] and main_chain[2]['hash'] not in index.orphan_parents
+        print(f"✅ 1000-block reorg on a 20000-block chain in {reorg_seconds * 1000:.0f} ms")
+
+def test_subscribe_reorg():
+    """A long-poll subscriber is woken when blocks it has already seen are disconnected"""
+    print("\n🔔 Testing Subscribe Across a Reorg...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        node = ZeroLinkChainNode(data_dir=data_dir, api_port=0, difficulty=1)
+        main_chain = make_chain(0, 10)
+        node.append_blocks(main_chain)
+        service, node_url = start_api(node)
+        
+        # Alice has processed up to height 9; a fork from height 6 overtakes it
+        fork = make_chain(6, 5, main_chain[5]['hash'], tag='fork', difficulty=1)
+        def announce():
+            time.sleep(0.2)
+            for block in fork:
+                node.receive_block(block)
+        
+        threading.Thread(target=announce, daemon=True).start()
+        start = time.time()
+        result = get_json(f"{node_url}/subscribe?address={ALICE}&since=9&timeout=10")
+        elapsed = time.time() - start
+        assert result['changed'] and result['reorg'] == 6
+        assert 0.15 < elapsed < 5
+        
+        # Disconnects above since, or of blocks not touching the address, do not count
+        assert node.wait_for_blocks(10, ALICE, 0.1) == ([], None)
+        other = make_chain(10, 2, fork[3]['hash'], tag='other', difficulty=1)
+        serial = node.reorg_serial
+        for block in other:
+            node.receive_block(block)
+        assert node.reorg_serial == serial + 1
+        with node.chain_lock:
+            assert node.rewound_height(serial, 9, ALICE) is None
+            assert node.rewound_height(serial, 10, ALICE) == 10
+            assert node.rewound_height(serial, 10, 'ZLC' + 'e' * 61) is None
+        service.stop_api_server()
+        print(f"✅ Subscriber woken {elapsed * 1000:.0f} ms after subscribing, rewound to height 6")
+
+def test_legacy_block_file():
+    """A block file written before blocks stored previous_hash loads and links linearly"""
+    print("\n📼 Testing Legacy Block File...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        # The original simulated sync format: length-prefixed blocks without previous_hash
+        with open(os.path.join(data_dir, 'blockchain.dat'), 'wb') as f:
+            for height in range(19):
+                block_json = json.dumps({'height': height, 'hash': f"legacy_{height}_".ljust(64, '0'),
+                                         'timestamp': 1000 + height * 600, 'transactions': []}).encode()
+                f.write(len(block_json).to_bytes(4, 'big') + block_json)
+        
+        node = ZeroLinkChainNode(data_dir=data_dir, api_port=0, difficulty=1)
+        assert len(node.load_blocks()) == 19
+        assert node.chain.best.hash == node.blocks[-1]['hash']
+        assert node.chain.best.height == 18
+        
+        # Peers extend it as usual
+        block = make_chain(19, 1, node.blocks[-1]['hash'], difficulty=1)[0]
+        assert node.receive_block(block) is True
+        assert node.get_tip() == {'height': 19, 'hash': block['hash']}
+        print(f"✅ {len(node.blocks)} blocks after loading a legacy file and extending it")
+
+def test_block_validation():
+    """Imported blocks are validated in parallel and committed in order up to the first bad one"""
+    print("\n🛡️ Testing Block Validation...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        node = ZeroLinkChainNode(data_dir=data_dir, api_port=0, difficulty=1)
+        node.validator = ValidationPipeline(workers=2, batch_size=16, difficulty=1)
+        chain = make_chain(0, 200, difficulty=1)
+        
+        stats = node.import_blocks(chain[:100])
+        assert stats['validated'] == 100
+        assert node.get_tip()['hash'] == chain[99]['hash']
+        
+        # A transaction spending more than its inputs fails block 150 in a worker
+        chain[150]['transactions'][1]['outputs'][0]['amount'] = 50.0
+        try:
+            node.import_blocks(chain[100:])
+            assert False, "expected BlockValidationError"
+        except BlockValidationError as e:
+            assert e.height == 150
+            assert 'merkle root' in e.reason or 'spends more' in e.reason
+        assert len(node.blocks) == 150
+        
+        # Header checks run inline: a wrong nonce breaks the proof of work
+        bad = dict(chain[151], nonce=chain[151]['nonce'] + 1)
+        try:
+            node.validator.check_block(bad, chain[150])
+            assert False, "expected BlockValidationError"
+        except BlockValidationError as e:
+            assert 'hash does not match' in e.reason
+        
+        # Announced blocks are checked against their parent before joining the tree
+        unlinked = dict(chain[149], hash='f' * 64, nonce=0)
+        try:
+            node.receive_block(unlinked)
+            assert False, "expected BlockValidationError"
+        except BlockValidationError:
+            pass
+        assert 'f' * 64 not in node.chain
+        
+        # Neither a missing nonce nor a self-declared difficulty gets past proof of work
+        fake = {'height': 150, 'hash': 'ff' * 32, 'previous_hash': chain[149]['hash'],
+                'timestamp': chain[149]['timestamp'] + 600, 'difficulty': 40, 'transactions': []}
+        for block in (fake, dict(seal_block(dict(fake), 2), difficulty=40)):
+            try:
+                node.receive_block(block)
+                assert False, "expected BlockValidationError"
+            except BlockValidationError as e:
+                assert 'proof of work' in e.reason or 'expected 1' in e.reason
+        assert node.get_tip()['hash'] == chain[149]['hash']
+        assert len(node.chain.entries) == 150
+        
+        # An atomic import checks every block before appending any
+        tail = make_chain(150, 10, chain[149]['hash'], tag='tail', difficulty=1)
+        tail[5]['transactions'][1]['outputs'][0]['amount'] = 50.0
+        try:
+            node.import_blocks(tail, atomic=True)
+            assert False, "expected BlockValidationError"
+        except BlockValidationError as e:
+            assert e.height == 155
+        assert len(node.blocks) == 150 and len(node.chain.entries) == 150
+        node.validator.close()
+        print(f"✅ {stats['blocks_per_second']:.0f} blocks/sec, bad block rejected at height 150")
+
+def make_tx(sender, nonce, fee, amount=1.0, tag='tx'):
+    """Transfer from sender paying fee"""
+    return {'txid': f"{tag}_{sender[-4:]}_{nonce}_{fee}", 'type': 'transfer', 'nonce': nonce,
+            'inputs': [{'address': sender, 'amount': amount + fee}],
+            'outputs': [{'address': BOB, 'amount': amount}]}
+
+def post_json(url, data):
+    request = urllib.request.Request(url, data=json.dumps(data).encode(), method='POST',
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def test_mempool():
+    """Templates take the best fees in nonce order; the byte cap evicts the cheapest"""
+    print("\n⏳ Testing Mempool...")
+    mempool = Mempool()
+    mempool.add(make_tx(MINER, 0, 0.01))
+    mempool.add(make_tx(MINER, 1, 0.50))
+    mempool.add(make_tx(ALICE, 0, 0.20))
+    mempool.add(make_tx(ALICE, 2, 0.90))
+    
+    # Miner's nonce 1 outbids Alice but must follow nonce 0; Alice's nonce 2 has a gap
+    txids = [tx['txid'] for tx in mempool.select()['transactions']]
+    assert txids == [make_tx(ALICE, 0, 0.20)['txid'], make_tx(MINER, 0, 0.01)['txid'],
+                     make_tx(MINER, 1, 0.50)['txid']]
+    assert mempool.select(max_count=1)['transactions'][0]['txid'] == txids[0]
+    
+    # Replacing a nonce needs a higher fee
+    try:
+        mempool.add(make_tx(MINER, 0, 0.0101))
+        assert False, "expected MempoolError"
+    except MempoolError:
+        pass
+    mempool.add(make_tx(MINER, 0, 0.30))
+    assert mempool.select()['transactions'][0]['txid'] == make_tx(MINER, 0, 0.30)['txid']
+    assert len(mempool) == 4
+    
+    # A stated fee must be what the inputs leave over; claiming more buys no priority
+    stated = Mempool()
+    try:
+        stated.add(dict(make_tx(BOB, 0, 0.0), fee=1e9))
+        assert False, "expected MempoolError"
+    except MempoolError as e:
+        assert 'stated fee' in str(e)
+    stated.add(dict(make_tx(BOB, 0, 0.25), fee=0.25))
+    assert stated.select()['fees'] == 0.25
+    
+    # Under a byte cap the lowest fee rates go, taking their later nonces with them
+    size = mempool.total_bytes // 4
+    capped = Mempool(max_bytes=size * 50)
+    for i in range(60):
+        capped.add(make_tx(f"ZLC{i:061x}", 0, 0.01 + i / 100))
+    assert capped.total_bytes <= capped.max_bytes
+    assert f"tx_{0:04x}_0_0.01" not in capped
+    try:
+        capped.add(make_tx(ALICE, 0, 0.001))
+        assert False, "expected MempoolError"
+    except MempoolError:
+        pass
+    
+    # Selection cost follows the template size, not the mempool size
+    large = Mempool()
+    for i in range(20000):
+        large.add(make_tx(f"ZLC{i:061x}", 0, (i % 997) / 1000 + 0.001))
+    start = time.time()
+    selection = large.select(max_count=500)
+    select_ms = (time.time() - start) * 1000
+    rates = [large.entries[tx['txid']].fee_rate for tx in selection['transactions']]
+    assert rates == sorted(rates, reverse=True) and len(rates) == 500
+    assert rates[-1] >= max(entry.fee_rate for entry in large.entries.values()) * 0.9
+    assert len(large.ready) <= 20000
+    print(f"✅ 500 of 20000 transactions selected in {select_ms:.1f} ms")
+
+def test_mempool_node_and_pool():
+    """Transactions posted to the node reach pool templates and leave when mined"""
+    print("\n📬 Testing Node Mempool And Pool Templates...")
+    with StandInAPI() as api, tempfile.TemporaryDirectory() as data_dir:
+        node = ZeroLinkChainNode(data_dir=data_dir, api_port=0)
+        node.append_blocks(make_chain(0, 3))
+        service, node_url = start_api(node)
+        
+        # The miner has sent three transfers on chain, so its next nonce is 3
+        status, reply = post_json(f"{node_url}/tx", make_tx(MINER, 3, 0.1))
+        assert status == 200 and reply['accepted']
+        status, reply = post_json(f"{node_url}/tx", make_tx(MINER, 2, 0.1))
+        assert status == 400 and 'already used' in reply['error']
+        # A body that is not a JSON object is refused with a reply, not a dropped connection
+        for body in ([make_tx(MINER, 4, 0.2)], "tx", 7):
+            status, reply = post_json(f"{node_url}/tx", body)
+            assert status == 400 and not reply['accepted']
+        post_json(f"{node_url}/tx", make_tx(MINER, 4, 0.2))
+        assert get_json(f"{node_url}/mempool")['count'] == 2
+        
+        pool = ZeroLinkChainPool(pool_address=MINER, api_base=api.url, node_url=node_url)
+        template = pool.create_work_template()
+        assert template['transaction_count'] == 2
+        assert abs(template['fees'] - 0.3) < 1e-9
+        expected_root = merkle_levels([leaf_hash(tx) for tx in pool.template_transactions])[-1][0].hex()
+        assert template['merkle_root'] == expected_root
+        
+        # Mining the first one confirms it; the second stays
+        block = make_chain(3, 1, node.blocks[-1]['hash'])[0]
+        block['transactions'] = [make_tx(MINER, 3, 0.1)]
+        node.append_blocks([block])
+        assert get_json(f"{node_url}/mempool")['count'] == 1
+        
+        # Disconnecting the block puts its transfer back
+        node.disconnect_tip()
+        assert make_tx(MINER, 3, 0.1)['txid'] in node.mempool
+        service.stop_api_server()
+        print(f"✅ Template with {template['transaction_count']} transactions, {template['fees']:.1f} ZLC fees")
+
+def test_dead_tx_lane():
+    """Dead TXs are batched into their own segments, with retention and backpressure"""
+    print("\n💬 Testing Dead TX Lane...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        lane = DeadTxLane(os.path.join(data_dir, 'lane'), segment_bytes=64 * 1024,
+                          retention_bytes=256 * 1024)
+        for i in range(5000):
+            lane.submit(make_dead_tx('chainchat', ALICE, BOB, f"message {i}"))
+        lane.stop()
+        
+        metrics = lane.metrics()
+        assert metrics['written'] == 5000
+        assert metrics['batches'] < 5000
+        # Old segments were pruned down to the byte budget
+        assert metrics['segments_deleted'] > 0
+        sizes = [os.path.getsize(os.path.join(lane.data_dir, name)) for name in lane.segments()]
+        assert sum(sizes) <= 256 * 1024 + 64 * 1024
+        # A batch larger than a segment spills into the next one
+        assert max(sizes) <= 64 * 1024
+        assert lane.recent(1)[0]['data'] == "message 4999"
+        # Reads start from the segment ends; a half-written last line is skipped
+        with open(os.path.join(lane.data_dir, lane.segments()[-1]), 'ab') as f:
+            f.write(b'{"tx_id": "torn')
+        assert [record['data'] for record in lane.recent(300)][:3] == [f"message {i}" for i in (4999, 4998, 4997)]
+        assert [record['data'] for record in lane.recent(300)][-1] == "message 4700"
+        # Age retention runs on a quiet lane too, without waiting for a rotation
+        lane.retention_seconds = 60
+        lane.expire(now=time.time() + 30)
+        assert lane.segments()
+        lane.expire(now=time.time() + 120)
+        assert lane.segments() == [] and lane.recent(1) == []
+        
+        # A full queue rejects instead of blocking the caller
+        full = DeadTxLane(os.path.join(data_dir, 'full'), max_queue=10)
+        # Never started, so nothing drains the queue
+        full.writer = threading.Thread()
+        for i in range(10):
+            full.submit(make_dead_tx('chainstore'))
+        try:
+            full.submit(make_dead_tx('chainstore'))
+            assert False, "full lane accepted a record"
+        except DeadTxQueueFull:
+            pass
+        assert full.metrics()['rejected'] == 1
+        
+        # Over HTTP the node answers before the write and never touches the chain
+        node = ZeroLinkChainNode(data_dir=os.path.join(data_dir, 'node'), api_port=0)
+        node.append_blocks(make_chain(0, 3))
+        service, node_url = start_api(node)
+        status, reply = post_json(f"{node_url}/deadtx", {'tx_type': 'chainchat', 'sender': ALICE,
+                                                         'recipient': BOB, 'data': 'hello'})
+        assert status == 202 and reply['dead_tx'] and not reply['rewarded']
+        status, _ = post_json(f"{node_url}/deadtx", {'tx_type': 'coinbase'})
+        assert status == 400
+        node.dead_txs.stop()
+        
+        listing = get_json(f"{node_url}/deadtx?limit=5")
+        assert listing['dead_txs'][0]['tx_id'] == reply['tx_id']
+        assert listing['dead_txs'][0]['is_dead'] and not listing['dead_txs'][0]['is_rewarded']
+        assert listing['metrics']['written'] == 1
+        assert len(node.blocks) == 3 and len(node.mempool) == 0
+        service.stop_api_server()
+        print(f"✅ {metrics['written']} records in {metrics['batches']} batches, "
+              f"{metrics['segments_deleted']} segments pruned")
+
+def get_metrics(url):
+    """Samples from a /metrics page as {'name{labels}': value}"""
+    with urllib.request.urlopen(url, timeout=5) as response:
+        assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+        lines = response.read().decode().splitlines()
+    return {line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1]) for line in lines if not line.startswith('#')}
+
+def test_metrics():
+    """Counters and histograms add up across threads and are served at /metrics"""
+    print("\n📈 Testing Metrics...")
+    registry = Registry()
+    counter = registry.counter('zlc_test_total', 'Test events', kind='a')
+    histogram = registry.histogram('zlc_test_seconds', 'Test latency', buckets=(0.01, 0.1))
+    assert registry.counter('zlc_test_total', kind='a') is counter
+    
+    def record():
+        for value in (0.005, 0.05, 0.5):
+            counter.inc()
+            histogram.observe(value)
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    record()
+    # Exited threads are folded into the totals rather than kept
+    assert counter.value() == 27 and len(counter.cells.cells) == 1
+    count, total, cumulative = histogram.snapshot()
+    assert count == 27 and abs(total - 9 * 0.555) < 1e-9
+    assert [running for _, running in cumulative] == [9, 18, 27]
+    
+    server = serve_metrics(0, registry=registry)
+    samples = get_metrics(f"http://127.0.0.1:{server.server_address[1]}/metrics")
+    assert samples['zlc_test_total{kind="a"}'] == 27
+    assert samples['zlc_test_seconds_bucket{le="0.1"}'] == 18
+    assert samples['zlc_test_seconds_bucket{le="+Inf"}'] == samples['zlc_test_seconds_count'] == 27
+    server.shutdown()
+    server.server_close()
+    
+    # A malformed ZLC_METRICS_PORT falls back to the default instead of failing
+    saved = os.environ.pop('ZLC_METRICS_PORT', None)
+    try:
+        assert metrics_port(9333) == 9333
+        for value, expected in (('9400', 9400), ('0', 0), ('abc', 9333), ('70000', 9333), ('-1', 9333)):
+            os.environ['ZLC_METRICS_PORT'] = value
+            assert metrics_port(9333) == expected, value
+    finally:
+        os.environ.pop('ZLC_METRICS_PORT', None)
+        if saved is not None:
+            os.environ['ZLC_METRICS_PORT'] = saved
+    
+    # The node serves the shared registry, including pool and upstream metrics in-process
+    with StandInAPI() as api, tempfile.TemporaryDirectory() as data_dir:
+        node = ZeroLinkChainNode(data_dir=data_dir, api_port=0)
+        node.append_blocks(make_chain(0, 3))
+        service, node_url = start_api(node)
+        pool = ZeroLinkChainPool(pool_address=MINER, api_base=api.url)
+        pool.create_work_template()
+        assert pool.validate_share('miner', 1, '0' * 64)['result'] == 'block_found'
+        get_json(f"{node_url}/stats")
+        try:
+            get_json(f"{node_url}/no/such/path")
+        except urllib.error.HTTPError:
+            pass
+        
+        # Malformed request lines get their error response and an 'invalid' route
+        for line in (b'GARBAGE', b'GET / HTTP/9.9', b'GET / HTTP/1.1.1'):
+            with socket.create_connection(('127.0.0.1', node.api_port), timeout=5) as sock:
+                sock.sendall(line + b'\r\n\r\n')
+                response = sock.makefile('rb').read()
+                assert b'Error code: 400' in response or b'Error code: 505' in response
+        
+        samples = get_metrics(f"{node_url}/metrics")
+        assert samples['zlc_api_request_seconds_count{route="invalid"}'] == 3
+        assert samples['zlc_node_height'] == 3
+        assert samples['zlc_api_request_seconds_count{route="/stats"}'] >= 1
+        assert samples['zlc_api_request_seconds_count{route="unmatched"}'] >= 1
+        assert samples['zlc_api_responses_total{code="404"}'] >= 1
+        assert samples['zlc_pool_shares_total{result="block_found"}'] >= 1
+        assert samples['zlc_pool_share_validation_seconds_count'] >= 1
+        assert samples['zlc_upstream_request_seconds_count{method="GET"}'] >= 1
+        service.stop_api_server()
+    print(f"✅ {len(samples)} samples served, {count} observations across 9 threads")
+
+def wait_for_work(event):
+    event.wait()
+
+def spin(event):
+    while not event.is_set():
+        sum(range(1000))
+
+def test_profiling():
+    """Stack dumps and sampling profiles cover every thread and land in the data dir"""
+    print("\n🔬 Testing Profiling Hooks...")
+    done = threading.Event()
+    workers = [threading.Thread(target=wait_for_work, args=(done,), name='blocked-handler'),
+               threading.Thread(target=spin, args=(done,), name='busy-handler')]
+    for worker in workers:
+        worker.start()
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            profiler = Profiler(os.path.join(data_dir, 'profiles'), interval=0.005)
+            report = profiler.profile(0.3)
+            with open(report) as f:
+                text = f.read()
+            assert 'test_node:spin' in text and 'Thread blocked-handler' in text and 'in wait_for_work' in text
+            with open(report[:-len('.txt')] + '.folded') as f:
+                stacks = dict(line.rsplit(' ', 1) for line in f.read().splitlines())
+            assert any(stack.endswith('test_node:wait_for_work;threading:wait;threading:wait') for stack in stacks)
+            
+            # SIGUSR1 writes a stack dump from the signal handler
+            saved = signal.getsignal(signal.SIGUSR1), signal.getsignal(signal.SIGUSR2)
+            profiler.install_signals()
+            try:
+                os.kill(os.getpid(), signal.SIGUSR1)
+                time.sleep(0.1)
+            finally:
+                signal.signal(signal.SIGUSR1, saved[0])
+                signal.signal(signal.SIGUSR2, saved[1])
+            assert [name for name in os.listdir(profiler.out_dir) if name.startswith('stacks-')]
+            
+            # Admin API: off without a token, then loopback clients presenting it
+            node = ZeroLinkChainNode(data_dir=data_dir, api_port=0)
+            node.admin_token = None
+            service, node_url = start_api(node)
+            status, reply = post_json(f"{node_url}/admin/stacks", {})
+            assert status == 404 and 'ZLC_ADMIN_TOKEN' in reply['error']
+            service.stop_api_server()
+            
+            node = ZeroLinkChainNode(data_dir=data_dir, api_port=0, admin_token='secret')
+            service, node_url = start_api(node)
+            status, reply = post_json(f"{node_url}/admin/stacks", {})
+            assert status == 403
+            # A non-ASCII token is refused like any wrong one
+            wrong = urllib.request.Request(f"{node_url}/admin/profile", headers={'X-Admin-Token': 'sécret'})
+            try:
+                urllib.request.urlopen(wrong, timeout=5)
+                assert False, "accepted a wrong token"
+            except urllib.error.HTTPError as e:
+                assert e.code == 403
+            negative = urllib.request.Request(f"{node_url}/admin/profile?seconds=-5", data=b'', method='POST',
+                                              headers={'X-Admin-Token': 'secret'})
+            try:
+                urllib.request.urlopen(negative, timeout=5)
+                assert False, "accepted a negative duration"
+            except urllib.error.HTTPError as e:
+                assert e.code == 400
+            request = urllib.request.Request(f"{node_url}/admin/profile?seconds=0.2", data=b'', method='POST',
+                                             headers={'X-Admin-Token': 'secret'})
+            with urllib.request.urlopen(request, timeout=5) as response:
+                assert response.status == 202
+            try:
+                urllib.request.urlopen(request, timeout=5)
+                assert False, "started a second profile"
+            except urllib.error.HTTPError as e:
+                assert e.code == 409
+            node.profiler.thread.join()
+            status = urllib.request.Request(f"{node_url}/admin/profile", headers={'X-Admin-Token': 'secret'})
+            with urllib.request.urlopen(status, timeout=5) as response:
+                state = json.loads(response.read())
+            assert not state['running'] and os.path.exists(state['last_report'])
+            assert os.path.dirname(state['last_report']) == os.path.join(data_dir, 'profiles')
+            service.stop_api_server()
+    finally:
+        done.set()
+        for worker in workers:
+            worker.join()
+    print(f"✅ {len(stacks)} distinct stacks sampled, report at {os.path.basename(state['last_report'])}")
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("🚀 ZEROLINKCHAIN NODE TEST")
+    print("=" * 60)
+    
+    tests = [
+        test_balance_index,
+        test_block_filters,
+        test_merkle_proofs,
+        test_deep_reorg,
+        test_subscribe_reorg,
+        test_legacy_block_file,
+        test_block_validation,
+        test_mempool,
+        test_mempool_node_and_pool,
+        test_dead_tx_lane,
+        test_metrics,
+        test_profiling
+    ]
+    
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            print(f"❌ {test.__name__} failed: {e}")
+            failed += 1
+    
+    print(f"\n✅ Passed: {len(tests) - failed}/{len(tests)}")
+    return failed == 0
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
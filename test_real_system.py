@@ -3,9 +3,11 @@
 Test the real ZeroLinkChain system
 """
 
+import sys
 import json
 import time
-from zerolinkchain_real import zerolinkchain
+import random
+from zerolinkchain_real import zerolinkchain, ZeroLinkChainReal, BLOCK_REWARD
 
 def test_real_system():
     print("🧪 Testing Real ZeroLinkChain System")
@@ -64,5 +66,101 @@ def test_real_system():
     print(f"\n✅ Real ZeroLinkChain system is working!")
     print(f"🎯 You can now use this system for real blockchain operations!")
 
+def test_status_counters():
+    """Host totals in get_system_status follow every change without a rescan"""
+    print("\n📊 Testing Status Counters...")
+    system = ZeroLinkChainReal()
+    rng = random.Random(7)
+    hosts = [f"host_{i}" for i in range(200)]
+    for host_id in hosts:
+        system.add_host(host_id, 'Somewhere', rng.randint(1, 100), asn=f"AS{rng.randint(1, 50)}",
+                        isp=f"isp{rng.randint(1, 20)}")
+    for _ in range(1000):
+        host_id = rng.choice(hosts)
+        action = rng.random()
+        if action < 0.4:
+            system.set_host_active(host_id, False)
+        elif action < 0.8:
+            system.heartbeat_host(host_id)
+        elif action < 0.9:
+            system.remove_host(host_id)
+        else:
+            system.add_host(host_id, 'Elsewhere', rng.randint(1, 100), active=rng.random() < 0.5)
+    
+    # The running totals match a count from scratch
+    records = system.hosts.list_hosts(limit=None)['hosts']
+    status = system.get_system_status()
+    assert status['total_hosts'] == len(records)
+    assert status['active_hosts'] == sum(1 for host in records if host['active'])
+    assert status['network_throughput'] == sum(host['bandwidth_mbps'] for host in records if host['active'])
+    
+    # Missed heartbeats deactivate hosts and take their bandwidth out of the totals
+    system.hosts.expire(now=time.time() + system.hosts.timeout + 2)
+    assert system.hosts.active_count == 0 and system.hosts.active_bandwidth == 0
+    print(f"✅ {status['active_hosts']} of {status['total_hosts']} hosts active after 1000 changes")
+
+def test_dead_tx_eviction():
+    """Dead TXs beyond the cap leave the index, oldest first, but stay counted"""
+    print("\n💀 Testing Dead TX Cap...")
+    system = ZeroLinkChainReal(max_dead_txs=10)
+    created = [system.create_dead_tx('alice', 'bob', {'n': i}) for i in range(25)]
+    assert len({dead_tx.tx_id for dead_tx in created}) == 25
+    assert len(system.dead_txs) == 10
+    assert list(system.dead_txs) == [dead_tx.tx_id for dead_tx in created[-10:]]
+    assert system.get_dead_tx(created[0].tx_id) is None
+    assert system.get_dead_tx(created[-1].tx_id).data == {'n': 24}
+    assert system.get_system_status()['dead_txs_processed'] == 25
+    print("✅ 25 dead TXs counted, newest 10 kept")
+
+def test_stale_block():
+    """A block mined on a tip that moved is dropped without a reward"""
+    print("\n⛏️ Testing Stale Mining Template...")
+    system = ZeroLinkChainReal(difficulty=1)
+    alice = system.add_user('alice', is_mining=True)
+    bob = system.add_user('bob', is_mining=True)
+    
+    class CompetingBlock:
+        """Block data whose formatting, done after the tip is read, lets Bob's block land first"""
+        def __format__(self, spec):
+            system.mine_block('competitor', bob.wallet_address)
+            return 'late'
+    
+    assert system.mine_block(CompetingBlock(), alice.wallet_address) is None
+    assert len(system.blocks) == 1 and system.blocks[0].miner == bob.wallet_address
+    assert (alice.balance, alice.blocks_mined) == (0.0, 0)
+    assert (bob.balance, bob.blocks_mined) == (BLOCK_REWARD, 1)
+    
+    # The next attempt builds on the new tip
+    block = system.mine_block('retry', alice.wallet_address)
+    assert block.height == 1 and block.previous_hash == system.blocks[0].hash
+    assert block.hash.startswith('0') and alice.balance == BLOCK_REWARD
+    assert system.mine_block('nobody', 'ZLCunknown') is None
+    print(f"✅ Stale block dropped, retry mined at height {block.height}")
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("🚀 ZEROLINKCHAIN REAL SYSTEM TEST")
+    print("=" * 60)
+    
+    tests = [
+        test_real_system,
+        test_status_counters,
+        test_dead_tx_eviction,
+        test_stale_block
+    ]
+    
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            print(f"❌ {test.__name__} failed: {e}")
+            failed += 1
+    
+    print(f"\n✅ Passed: {len(tests) - failed}/{len(tests)}")
+    return failed == 0
+
 if __name__ == "__main__":
-    test_real_system()
+    success = main()
+    sys.exit(0 if success else 1)
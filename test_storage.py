@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Storage Test
+Checks the stores behind dead TXs without network access
+"""
+
+import io
+import os
+import sys
+import json
+import random
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+for service_dir in ('common', 'node'):
+    sys.path.insert(0, os.path.join(BASE_DIR, 'services', service_dir))
+
+from zerolinkchain_chainstore import ChainStore, Chunker
+from zerolinkchain_chainchat import ChainChatStore
+from zerolinkchain_node import ZeroLinkChainNode, ZeroLinkChainNodeService
+
+def start_api(node):
+    """Serve the node API on a free port; returns the service and base URL"""
+    service = ZeroLinkChainNodeService(node)
+    service.create_api_server()
+    threading.Thread(target=service.start_api_server, daemon=True).start()
+    return service, f"http://127.0.0.1:{node.api_port}"
+
+def get_json(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return json.loads(response.read())
+
+def post_json(url, data):
+    request = urllib.request.Request(url, data=json.dumps(data).encode(), method='POST',
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.loads(response.read())
+
+def test_chainstore():
+    """Uploads are chunked by content, stored once per chunk and streamed back"""
+    print("\n📁 Testing ChainStore...")
+    rng = random.Random(7)
+    content = rng.randbytes(2 * 1024 * 1024)
+    # The same file with a few bytes inserted near the start
+    edited = content[:5000] + b'edit' + content[5000:]
+    
+    with tempfile.TemporaryDirectory() as root:
+        store = ChainStore(root, sync=False)
+        first = store.upload(io.BytesIO(content), 'report.bin', uploader='alice')
+        assert first['size'] == len(content) and first['new_bytes'] == len(content)
+        sizes = [size for _, size in first['chunks']]
+        assert max(sizes) <= store.chunker.max_size
+        assert store.chunker.min_size < sum(sizes) / len(sizes) < 2 * store.chunker.avg_size
+        
+        # A duplicate costs no chunk storage; an edit only rewrites nearby chunks
+        again = store.upload(io.BytesIO(content), 'copy.bin')
+        assert again['new_bytes'] == 0 and again['file_id'] != first['file_id']
+        changed = store.upload(io.BytesIO(edited), 'report-v2.bin')
+        assert changed['new_chunks'] <= 3
+        stats = store.stats()
+        assert stats['files'] == 3 and stats['dedup_ratio'] > 2.5
+        
+        assert b''.join(store.read(changed['file_id'])) == edited
+        # Reference counts survive a restart; deleting frees only unshared chunks
+        store = ChainStore(root, sync=False)
+        assert store.stats() == stats
+        store.delete(first['file_id'])
+        assert store.stats()['stored_bytes'] == stats['stored_bytes']
+        store.delete(again['file_id'])
+        assert store.stats()['stored_bytes'] < stats['stored_bytes']
+        assert b''.join(store.read(changed['file_id'])) == edited
+        try:
+            store.get_manifest('file_../../etc')
+            assert False, "accepted a path as file id"
+        except KeyError:
+            pass
+        
+        # A delete while an upload of shared chunks is in flight keeps those chunks
+        shared = store.upload(io.BytesIO(content), 'shared.bin')
+        class DeletingStream(io.BytesIO):
+            def read(self, size=-1):
+                if self.tell() > 0 and store.stats()['files'] == 2:
+                    store.delete(shared['file_id'])
+                return super().read(size)
+        racing = store.upload(DeletingStream(content), 'racing.bin')
+        assert store.stats()['files'] == 2
+        assert b''.join(store.read(racing['file_id'])) == content
+        store.delete(racing['file_id'])
+        
+        # An aborted upload gives its chunks back; a crash leaves files the sweep removes
+        class FailingStream(io.BytesIO):
+            def read(self, size=-1):
+                if self.tell() > len(content) // 2:
+                    raise OSError("connection reset")
+                return super().read(size)
+        before = store.stats()
+        try:
+            store.upload(FailingStream(content), 'aborted.bin')
+            assert False, "aborted upload was stored"
+        except OSError:
+            pass
+        assert store.stats() == before
+        stray = store.chunk_path('ab' * 32)
+        os.makedirs(os.path.dirname(stray), exist_ok=True)
+        for path in (stray, stray + '.1.tmp'):
+            with open(path, 'wb') as f:
+                f.write(b'left by a crash')
+        store = ChainStore(root, sync=False)
+        assert store.stats() == before
+        assert not os.path.exists(stray) and not os.path.exists(stray + '.1.tmp')
+        on_disk = sum(len(os.listdir(os.path.join(store.chunk_dir, d))) for d in os.listdir(store.chunk_dir))
+        assert on_disk == before['chunks']
+    
+    # Short inputs and exact boundaries
+    chunker = Chunker(min_size=64, avg_size=256, max_size=1024)
+    for size in (0, 1, 64, 1024, 5000):
+        data = rng.randbytes(size)
+        assert b''.join(chunker.chunks(io.BytesIO(data))) == data
+    print(f"✅ {stats['files']} files, {stats['chunks']} chunks, dedup ratio {stats['dedup_ratio']:.2f}")
+
+def test_chainstore_node():
+    """The node streams uploads into ChainStore and logs them as dead TXs"""
+    print("\n📤 Testing ChainStore Upload API...")
+    content = random.Random(3).randbytes(300000)
+    with tempfile.TemporaryDirectory() as data_dir:
+        node = ZeroLinkChainNode(data_dir=data_dir, api_port=0)
+        node.chainstore.sync = False
+        service, node_url = start_api(node)
+        
+        request = urllib.request.Request(f"{node_url}/chainstore/upload?filename=notes.bin&uploader=alice",
+                                         data=content, method='POST')
+        with urllib.request.urlopen(request, timeout=5) as response:
+            stored = json.loads(response.read())
+        assert stored['success'] and stored['dead_tx'] and not stored['rewarded']
+        assert stored['size'] == len(content)
+        
+        with urllib.request.urlopen(f"{node_url}/chainstore/files/{stored['file_id']}", timeout=5) as response:
+            assert response.read() == content
+        node.dead_txs.stop()
+        record = get_json(f"{node_url}/deadtx")['dead_txs'][0]
+        assert record['tx_type'] == 'chainstore' and record['data']['file_id'] == stored['file_id']
+        assert len(node.blocks) == 0
+        service.stop_api_server()
+        print(f"✅ Uploaded {stored['size']} bytes in {stored['chunks']} chunks as {stored['file_id']}")
+
+def test_chainchat_store():
+    """Inbox and conversation pages cost O(page) and unread counts follow reads"""
+    print("\n💬 Testing ChainChat Store...")
+    users = [f"user{i}" for i in range(20)]
+    with tempfile.TemporaryDirectory() as root:
+        store = ChainChatStore(root, segment_bytes=4096)
+        # Segments roll between batches
+        for batch in range(0, 2000, 100):
+            store.send_many((users[i % 20], users[(i * 7 + 1) % 20], f"message {i}", False)
+                            for i in range(batch, batch + 100))
+        store.send('user1', 'user0', 'hello', is_video=True)
+        assert store.stats()['segments'] > 10
+        
+        # Walk user0's inbox with cursors
+        expected = [i + 1 for i in range(2000) if (i * 7 + 1) % 20 == 0] + [2001]
+        seen = []
+        cursor = 0
+        while cursor is not None:
+            page = store.inbox('user0', since=cursor, limit=30)
+            seen += [message['id'] for message in page['messages']]
+            cursor = page['next_cursor']
+        assert seen == expected
+        assert all(message['recipient'] == 'user0' for message in page['messages'])
+        assert page['messages'][-1]['is_video'] and page['unread'] == len(expected)
+        
+        # New messages only: nothing after the last id
+        assert store.inbox('user0', since=2001)['messages'] == []
+        assert store.inbox('user0', limit=0) == {'messages': [], 'next_cursor': None, 'unread': len(expected)}
+        assert len(store.inbox('user0', limit=-1)['messages']) == 0
+        conversation = store.conversation('user0', 'user1', limit=1000)
+        assert {message['sender'] for message in conversation['messages']} == {'user0', 'user1'}
+        assert conversation['messages'][-1]['message'] == 'hello' and conversation['next_cursor'] is None
+        
+        assert store.mark_read('user0', expected[9]) == len(expected) - 10
+        assert store.mark_read('user0', expected[5]) == len(expected) - 10
+        store.close()
+        
+        # A torn final record is dropped on restart; indexes and read markers are rebuilt
+        last = os.path.join(root, sorted(os.listdir(root))[-2])
+        with open(last, 'ab') as f:
+            f.write(b'{"id": 2002, "sen')
+        store = ChainChatStore(root, segment_bytes=4096)
+        assert store.unread('user0') == len(expected) - 10
+        assert store.stats()['messages'] == 2001
+        assert store.send('user2', 'user0', 'after restart')['id'] == 2002
+        assert store.inbox('user0', since=2001)['messages'][0]['message'] == 'after restart'
+        store.close()
+    print(f"✅ {len(expected)} inbox messages in pages of 30, {len(expected) - 9} unread")
+
+def test_chainchat_node():
+    """The node stores ChainChat messages and logs them as dead TXs"""
+    print("\n📨 Testing ChainChat API...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        node = ZeroLinkChainNode(data_dir=data_dir, api_port=0)
+        service, node_url = start_api(node)
+        
+        sent = post_json(f"{node_url}/chainchat/send", {'sender': 'alice', 'recipient': 'bob',
+                                                        'message': 'Hi Bob', 'is_video': False})
+        assert sent['success'] and sent['dead_tx'] and not sent['rewarded']
+        post_json(f"{node_url}/chainchat/send", {'sender': 'bob', 'recipient': 'alice', 'message': 'Hi'})
+        
+        inbox = get_json(f"{node_url}/chainchat/messages?user=bob")
+        assert [message['message'] for message in inbox['messages']] == ['Hi Bob'] and inbox['unread'] == 1
+        thread = get_json(f"{node_url}/chainchat/messages?user=bob&with=alice&since={sent['message_id']}")
+        assert [message['message'] for message in thread['messages']] == ['Hi']
+        assert post_json(f"{node_url}/chainchat/read", {'user': 'bob', 'message_id': sent['message_id']})['unread'] == 0
+        # Pages hold at least one message; a non-positive limit is refused, not sliced
+        for limit in (0, -1):
+            try:
+                get_json(f"{node_url}/chainchat/messages?user=bob&limit={limit}")
+                assert False, f"expected 400 for limit={limit}"
+            except urllib.error.HTTPError as e:
+                assert e.code == 400
+        
+        node.dead_txs.stop()
+        records = get_json(f"{node_url}/deadtx")['dead_txs']
+        assert [record['tx_type'] for record in records] == ['chainchat', 'chainchat']
+        assert len(node.blocks) == 0
+        service.stop_api_server()
+        print(f"✅ Messages stored as dead TXs in {inbox['messages'][0]['conversation']}")
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("🚀 ZEROLINKCHAIN STORAGE TEST")
+    print("=" * 60)
+    
+    tests = [
+        test_chainstore,
+        test_chainstore_node,
+        test_chainchat_store,
+        test_chainchat_node
+    ]
+    
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            print(f"❌ {test.__name__} failed: {e}")
+            failed += 1
+    
+    print(f"\n✅ Passed: {len(tests) - failed}/{len(tests)}")
+    return failed == 0
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
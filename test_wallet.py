@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Wallet Test
+Checks wallet persistence against the local API stand-in
+"""
+
+import os
+import sys
+import json
+import stat
+import time
+import tempfile
+import threading
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+for service_dir in ('common', 'node', 'wallet'):
+    sys.path.insert(0, os.path.join(BASE_DIR, 'services', service_dir))
+
+from zerolinkchain_standin import StandInAPI
+from zerolinkchain_wallet import ZeroLinkChainWallet
+from zerolinkchain_history import TransactionHistory
+from zerolinkchain_keystore import Keystore, MultiWalletService
+from zerolinkchain_lightclient import LightClient
+import zerolinkchain_keygen as keygen
+from zerolinkchain_node import ZeroLinkChainNode, ZeroLinkChainNodeService
+
+def test_wallet_file_secure_and_compact():
+    """New wallet file is private, compact and has no temp files beside it"""
+    print("🔐 Testing Wallet File...")
+    with StandInAPI() as api, tempfile.TemporaryDirectory() as data_dir:
+        wallet = ZeroLinkChainWallet(data_dir=data_dir, api_base=api.url)
+        wallet.create_wallet()
+        
+        mode = stat.S_IMODE(os.stat(wallet.wallet_file).st_mode)
+        assert mode == 0o600
+        assert os.listdir(data_dir) == ['wallet.json']
+        
+        with open(wallet.wallet_file) as f:
+            raw = f.read()
+        assert '\n' not in raw
+        assert json.loads(raw)['address'] == wallet.wallet_data['address']
+        print(f"✅ {len(raw)} bytes, mode {oct(mode)}")
+
+def test_wallet_saved_only_on_change():
+    """Unchanged balance polls leave the wallet file untouched"""
+    print("\n💾 Testing Dirty Tracking...")
+    with StandInAPI() as api, tempfile.TemporaryDirectory() as data_dir:
+        wallet = ZeroLinkChainWallet(data_dir=data_dir, api_base=api.url)
+        wallet_data = wallet.create_wallet()
+        created_inode = os.stat(wallet.wallet_file).st_ino
+        
+        for _ in range(5):
+            wallet.get_balance()
+        assert os.stat(wallet.wallet_file).st_ino == created_inode
+        
+        api.set_balance(wallet_data['private_key'], 3.25)
+        assert wallet.get_balance() == 3.25
+        assert os.stat(wallet.wallet_file).st_ino != created_inode
+        assert not wallet.dirty
+        
+        reloaded = ZeroLinkChainWallet(data_dir=data_dir, api_base=api.url)
+        reloaded.load_wallet()
+        assert reloaded.wallet_data['balance'] == 3.25
+        print("✅ Written once, on the balance change")
+
+def test_history_pagination():
+    """History pages newest-first with filters and keeps running totals"""
+    print("\n📜 Testing Transaction History...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        history = TransactionHistory(os.path.join(data_dir, 'history.db'))
+        payouts = [
+            {'txid': f"payout_{i}", 'timestamp': 1000 + i, 'type': 'mining_reward',
+             'counterparty': 'pool', 'amount': 0.5, 'height': i}
+            for i in range(250)
+        ]
+        transfers = [
+            {'txid': f"send_{i}", 'timestamp': 1000 + i, 'type': 'send',
+             'counterparty': f"ZLC{i % 3}", 'amount': -1.0, 'height': i}
+            for i in range(0, 250, 10)
+        ]
+        assert history.add_many(payouts + transfers) == 275
+        assert not history.add(payouts[0])
+        
+        assert history.count() == 275
+        assert history.count('mining_reward') == 250
+        assert history.total('mining_reward') == 125.0
+        
+        seen, cursor = [], None
+        while True:
+            page, cursor = history.query(tx_type='mining_reward', limit=100, cursor=cursor)
+            seen.extend(tx['txid'] for tx in page)
+            if not cursor:
+                break
+        assert len(seen) == 250
+        assert seen[0] == 'payout_249'
+        
+        page, _ = history.query(counterparty='ZLC1', since=1100)
+        assert all(tx['counterparty'] == 'ZLC1' and tx['timestamp'] >= 1100 for tx in page)
+        
+        assert history.remove_from_height(200) == 55
+        assert history.count() == 220
+        assert history.total('mining_reward') == 100.0
+        history.close()
+        print("✅ 275 transactions paged, filtered and rolled back")
+
+def test_legacy_transactions_migrated():
+    """Transactions embedded in an old wallet.json move to the history store"""
+    print("\n📦 Testing Legacy Migration...")
+    with StandInAPI() as api, tempfile.TemporaryDirectory() as data_dir:
+        legacy = {
+            'address': 'ZLC' + 'b' * 61,
+            'private_key': 'c' * 64,
+            'balance': 1.0,
+            'transactions': [{'txid': 'old_1', 'amount': 1.0, 'type': 'receive', 'timestamp': 5}]
+        }
+        with open(os.path.join(data_dir, 'wallet.json'), 'w') as f:
+            json.dump(legacy, f, indent=2)
+        
+        wallet = ZeroLinkChainWallet(data_dir=data_dir, api_base=api.url)
+        wallet.load_wallet()
+        
+        with open(wallet.wallet_file) as f:
+            assert 'transactions' not in json.load(f)
+        assert wallet.get_wallet_info()['transactions_count'] == 1
+        print("✅ Legacy transactions migrated")
+
+def make_blocks(start, count, address, previous_hash='0' * 64, tag='main'):
+    """Blocks paying a coinbase to address, with every third block spending 1 ZLC"""
+    blocks = []
+    for height in range(start, start + count):
+        transactions = [{
+            'txid': f"{tag}_coinbase_{height}",
+            'type': 'coinbase',
+            'inputs': [],
+            'outputs': [{'address': address, 'amount': 10.0}]
+        }]
+        if height % 3 == 0:
+            transactions.append({
+                'txid': f"{tag}_send_{height}",
+                'type': 'transfer',
+                'inputs': [{'address': address, 'amount': 1.0}],
+                'outputs': [{'address': 'ZLC' + 'd' * 61, 'amount': 1.0}]
+            })
+        block_hash = f"{tag}_{height}_".ljust(64, '0')
+        blocks.append({'height': height, 'hash': block_hash, 'previous_hash': previous_hash,
+                       'timestamp': 1000 + height * 600, 'transactions': transactions})
+        previous_hash = block_hash
+    return blocks
+
+def test_light_client_follows_node():
+    """Light-client balance comes from node blocks and resumes from its checkpoint"""
+    print("\n🪶 Testing Light Client...")
+    with StandInAPI() as api, tempfile.TemporaryDirectory() as node_dir, \
+            tempfile.TemporaryDirectory() as data_dir:
+        node = ZeroLinkChainNode(data_dir=node_dir, api_port=0, api_base=api.url)
+        service = ZeroLinkChainNodeService(node)
+        service.create_api_server()
+        threading.Thread(target=service.start_api_server, daemon=True).start()
+        node_url = f"http://127.0.0.1:{node.api_port}"
+        
+        wallet = ZeroLinkChainWallet(data_dir=data_dir, api_base=api.url, node_url=node_url)
+        address = wallet.create_wallet()['address']
+        
+        node.append_blocks(make_blocks(0, 1200, address))
+        assert wallet.get_balance() == 1200 * 10.0 - 400 * 1.0
+        assert wallet.wallet_data['mining_rewards'] == 12000.0
+        assert wallet.history.count('send') == 400
+        
+        # Restart resumes from the checkpoint and only applies new blocks
+        node.append_blocks(make_blocks(1200, 3, address, node.blocks[-1]['hash']))
+        restarted = ZeroLinkChainWallet(data_dir=data_dir, api_base=api.url, node_url=node_url)
+        restarted.load_wallet()
+        assert restarted.get_balance() == 1203 * 10.0 - 401 * 1.0
+        
+        # A replaced chain below the checkpoint triggers a rescan
+        while node.blocks:
+            node.disconnect_tip()
+        node.append_blocks(make_blocks(0, 5, address, tag='fork'))
+        assert restarted.get_balance() == 5 * 10.0 - 2 * 1.0
+        assert restarted.history.count() == 7
+        
+        service.stop_api_server()
+        print(f"✅ Balance {restarted.wallet_data['balance']} ZLC after reorg")
+
+def test_light_client_uses_filters():
+    """With block filters the light client downloads only the blocks that pay it"""
+    print("\n🧮 Testing Filtered Light Client...")
+    with StandInAPI() as api, tempfile.TemporaryDirectory() as node_dir, \
+            tempfile.TemporaryDirectory() as data_dir:
+        node = ZeroLinkChainNode(data_dir=node_dir, api_port=0, api_base=api.url)
+        service = ZeroLinkChainNodeService(node)
+        service.create_api_server()
+        threading.Thread(target=service.start_api_server, daemon=True).start()
+        
+        wallet = ZeroLinkChainWallet(data_dir=data_dir, api_base=api.url,
+                                     node_url=f"http://127.0.0.1:{node.api_port}")
+        address = wallet.create_wallet()['address']
+        
+        # 1500 blocks for other addresses with three paying us
+        for start in range(0, 1500, 500):
+            node.append_blocks(make_blocks(start, 499, 'ZLC' + 'e' * 61,
+                                           node.blocks[-1]['hash'] if node.blocks else '0' * 64))
+            node.append_blocks(make_blocks(start + 499, 1, address, node.blocks[-1]['hash']))
+        
+        wallet.light_client = LightClient(wallet, wallet.node_url, batch_size=400)
+        fetched = []
+        fetch_blocks = wallet.light_client.fetch_blocks
+        wallet.light_client.fetch_blocks = lambda start, limit: fetched.append(limit) or fetch_blocks(start, limit)
+        
+        assert wallet.get_balance() == 3 * 10.0 - 1.0
+        assert wallet.light_client.checkpoint['height'] == 1499
+        assert sum(fetched) == 3
+        
+        service.stop_api_server()
+        print(f"✅ Scanned 1500 filters, downloaded {sum(fetched)} blocks")
+
+def test_balance_notification():
+    """A subscribed wallet is woken by the first block that concerns it"""
+    print("\n🔔 Testing Balance Notifications...")
+    with StandInAPI() as api, tempfile.TemporaryDirectory() as node_dir, \
+            tempfile.TemporaryDirectory() as data_dir:
+        node = ZeroLinkChainNode(data_dir=node_dir, api_port=0, api_base=api.url)
+        service = ZeroLinkChainNodeService(node)
+        service.create_api_server()
+        threading.Thread(target=service.start_api_server, daemon=True).start()
+        node_url = f"http://127.0.0.1:{node.api_port}"
+        
+        wallet = ZeroLinkChainWallet(data_dir=data_dir, api_base=api.url, node_url=node_url)
+        address = wallet.create_wallet()['address']
+        
+        # Nothing arrives: the long-poll times out without a change
+        assert wallet.wait_for_balance_change(timeout=0.2) is False
+        
+        def publish():
+            time.sleep(0.2)
+            # Blocks for someone else do not wake the subscriber
+            node.append_blocks(make_blocks(0, 2, 'ZLC' + 'e' * 61))
+            time.sleep(0.2)
+            node.append_blocks(make_blocks(2, 1, address, node.blocks[-1]['hash']))
+        
+        start = time.time()
+        threading.Thread(target=publish, daemon=True).start()
+        assert wallet.wait_for_balance_change(timeout=10) is True
+        elapsed = time.time() - start
+        assert 0.35 < elapsed < 1.5
+        assert wallet.wallet_data['balance'] == 10.0
+        assert wallet.light_client.checkpoint['height'] == 2
+        
+        service.stop_api_server()
+        print(f"✅ Notified {elapsed * 1000:.0f} ms after subscribing")
+
+def test_multi_wallet_refresh():
+    """One scheduler refreshes every keystore wallet concurrently"""
+    print("\n👛 Testing Multi-Wallet Refresh...")
+    with StandInAPI(latency=0.01, default_balance=2.0) as api, \
+            tempfile.TemporaryDirectory() as keystore_dir:
+        service = MultiWalletService(keystore_dir, api_base=api.url, max_workers=16, batch_size=40)
+        addresses = [service.keystore.create() for _ in range(100)]
+        assert not service.keystore.loaded
+        
+        cycle = service.refresh_all()
+        assert cycle['wallets'] == 100
+        assert cycle['errors'] == 0
+        assert cycle['total_balance'] == 200.0
+        # 100 sessions + 100 balance calls at 10 ms each would take 2 s serially
+        assert cycle['cycle_seconds'] < 1.5
+        
+        rich = service.keystore.get(addresses[0])
+        api.set_balance(rich.wallet_data['private_key'], 50.0)
+        assert service.refresh_all()['total_balance'] == 248.0
+        assert api.request_counts['/api/wallet/import/privatekey'] == 100
+        
+        # Wallets evicted from the loaded set close their history databases
+        keystore = Keystore(keystore_dir, max_loaded=2)
+        first = keystore.get(addresses[0])
+        assert first.history.count() == 0
+        keystore.get(addresses[1])
+        keystore.get(addresses[2])
+        assert first._history is None and list(keystore.loaded) == addresses[1:3]
+        print(f"✅ 100 wallets refreshed in {cycle['cycle_seconds'] * 1000:.0f} ms")
+
+def test_bulk_and_vanity_generation():
+    """Bulk generation streams unique wallets into a keystore; vanity search honours the prefix"""
+    print("\n🏭 Testing Bulk/Vanity Generation...")
+    with tempfile.TemporaryDirectory() as data_dir:
+        keystore = Keystore(os.path.join(data_dir, 'keystore'))
+        result = keygen.bulk_generate(5000, keystore, workers=2, chunk_size=700)
+        assert result['count'] == 5000
+        
+        addresses = keystore.list_addresses()
+        assert len(addresses) == 5000
+        assert all(len(address) == 64 for address in addresses)
+        assert stat.S_IMODE(os.stat(keystore.path_for(addresses[0])).st_mode) == 0o600
+        # Generated wallets load like any other keystore wallet
+        wallet = keystore.get(addresses[0])
+        assert wallet.wallet_data['balance'] == 0.0 and len(wallet.wallet_data['private_key']) == 64
+        
+        vanity = keygen.vanity_generate('ZLCab', keystore, workers=2, attempts_per_task=2000)
+        assert vanity['wallet']['address'].startswith('ZLCab')
+        assert len(keystore.list_addresses()) == 5001
+        assert keystore.get(vanity['wallet']['address']).wallet_data['mnemonic'] == vanity['wallet']['mnemonic']
+        
+        try:
+            keygen.vanity_generate('ZLCxyz')
+            assert False, "non-hex prefix should be rejected"
+        except ValueError:
+            pass
+        print(f"✅ {result['addresses_per_second']:.0f} addresses/sec, vanity in {vanity['attempts']} tries")
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("🚀 ZEROLINKCHAIN WALLET TEST")
+    print("=" * 60)
+    
+    tests = [
+        test_wallet_file_secure_and_compact,
+        test_wallet_saved_only_on_change,
+        test_history_pagination,
+        test_legacy_transactions_migrated,
+        test_light_client_follows_node,
+        test_light_client_uses_filters,
+        test_balance_notification,
+        test_multi_wallet_refresh,
+        test_bulk_and_vanity_generation
+    ]
+    
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            print(f"❌ {test.__name__} failed: {e}")
+            failed += 1
+    
+    print(f"\n✅ Passed: {len(tests) - failed}/{len(tests)}")
+    return failed == 0
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+ZeroLinkChain Real System
+In-process engine for users, VPN hosts, mined blocks and dead transactions,
+with compact records, dict indexes and running totals so status queries are O(1)
+"""
+
+import os
+import sys
+import time
+import hashlib
+import logging
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'services', 'common'))
+
+from zerolinkchain_routes import RoutePlanner
+from zerolinkchain_hosts import HostRegistry, HEARTBEAT_TIMEOUT
+
+logger = logging.getLogger('ZLC-Real')
+
+BLOCK_REWARD = 10.0
+DEFAULT_DIFFICULTY = 4
+# Dead TXs kept in memory; older ones are dropped from the index, not the counters
+MAX_DEAD_TXS = 100000
+
+class Block:
+    """A mined block"""
+    __slots__ = ('height', 'hash', 'previous_hash', 'timestamp', 'data', 'miner', 'nonce', 'difficulty')
+    
+    def __init__(self, height, block_hash, previous_hash, timestamp, data, miner, nonce, difficulty):
+        self.height = height
+        self.hash = block_hash
+        self.previous_hash = previous_hash
+        self.timestamp = timestamp
+        self.data = data
+        self.miner = miner
+        self.nonce = nonce
+        self.difficulty = difficulty
+
+class User:
+    """A registered user and their wallet"""
+    __slots__ = ('username', 'wallet_address', 'balance', 'is_mining', 'blocks_mined', 'created_at')
+    
+    def __init__(self, username, wallet_address, is_mining=False):
+        self.username = username
+        self.wallet_address = wallet_address
+        self.balance = 0.0
+        self.is_mining = is_mining
+        self.blocks_mined = 0
+        self.created_at = time.time()
+
+class DeadTx:
+    """A ChainChat or ChainStore record: stored, never rewarded, never in a block"""
+    __slots__ = ('tx_id', 'tx_type', 'sender', 'recipient', 'data', 'timestamp')
+    
+    def __init__(self, tx_id, tx_type, sender, recipient, data, timestamp):
+        self.tx_id = tx_id
+        self.tx_type = tx_type
+        self.sender = sender
+        self.recipient = recipient
+        self.data = data
+        self.timestamp = timestamp
+
+def wallet_address_for(username):
+    """Deterministic ZLC address for a username (ZLC + 61 chars = 64 total)"""
+    return f"ZLC{hashlib.sha256(username.encode()).hexdigest()[:61]}"
+
+class ZeroLinkChainReal:
+    """Chain, users, hosts and dead TXs held in memory"""
+    
+    def __init__(self, difficulty=DEFAULT_DIFFICULTY, max_dead_txs=MAX_DEAD_TXS,
+                 heartbeat_timeout=HEARTBEAT_TIMEOUT):
+        self.difficulty = difficulty
+        self.max_dead_txs = max_dead_txs
+        self.blocks = []
+        self.users = []
+        self.users_by_address = {}
+        self.dead_txs = {}
+        self.routes = RoutePlanner()
+        self.hosts = HostRegistry(heartbeat_timeout, on_change=self.host_changed)
+        self.lock = threading.Lock()
+        # Running totals behind get_system_status
+        self.dead_txs_processed = 0
+    
+    def add_user(self, username, wallet_address=None, is_mining=False):
+        """Register a user; returns the existing one if the address is known"""
+        wallet_address = wallet_address or wallet_address_for(username)
+        with self.lock:
+            user = self.users_by_address.get(wallet_address)
+            if user is None:
+                user = User(username, wallet_address, is_mining)
+                self.users.append(user)
+                self.users_by_address[wallet_address] = user
+            return user
+    
+    def get_user(self, wallet_address):
+        return self.users_by_address.get(wallet_address)
+    
+    def add_host(self, host_id, location, bandwidth_mbps, country='', asn='', isp='', active=True, host_type=1):
+        """Register or update a host as if it sent a heartbeat; active=False registers it down"""
+        record = self.hosts.heartbeat(host_id, host_type=host_type, location=location, country=country,
+                                      asn=asn, isp=isp, bandwidth_mbps=bandwidth_mbps)
+        if not active:
+            self.hosts.set_active(host_id, False)
+        return record
+    
+    def heartbeat_host(self, host_id):
+        """Keep a host active for another heartbeat period; returns False if unknown"""
+        return self.hosts.set_active(host_id, True)
+    
+    def set_host_active(self, host_id, active):
+        """Mark a host up or down; returns False if it is unknown"""
+        return self.hosts.set_active(host_id, active)
+    
+    def remove_host(self, host_id):
+        """Forget a host; returns False if it is unknown"""
+        return self.hosts.remove(host_id) is not None
+    
+    def host_changed(self, record):
+        """Keep the route planner to the active hosts"""
+        if record.active:
+            self.routes.add_host(record.host_id, record.asn, record.isp, record.bandwidth_mbps, record.location)
+        else:
+            self.routes.remove_host(record.host_id)
+    
+    def create_route(self, min_hops=3, max_hops=5, min_bandwidth=0):
+        """ASN/ISP-diverse route over active hosts; raises RouteError if impossible"""
+        return self.routes.create_route(min_hops, max_hops, min_bandwidth)
+    
+    def mine_block(self, data, miner_address):
+        """Find a nonce for a block on the current tip and credit the miner.
+        Returns None if the miner is not a registered user"""
+        miner = self.users_by_address.get(miner_address)
+        if miner is None:
+            logger.warning(f"Unknown miner {miner_address}")
+            return None
+        
+        with self.lock:
+            height = len(self.blocks)
+            previous_hash = self.blocks[-1].hash if self.blocks else '0' * 64
+        timestamp = time.time()
+        
+        # Hash the fixed header prefix once and only feed the nonce per attempt
+        prefix = hashlib.sha256(f"{height}{previous_hash}{timestamp}{data}{miner_address}".encode())
+        target = '0' * self.difficulty
+        nonce = 0
+        while True:
+            attempt = prefix.copy()
+            attempt.update(str(nonce).encode())
+            block_hash = attempt.hexdigest()
+            if block_hash.startswith(target):
+                break
+            nonce += 1
+        
+        block = Block(height, block_hash, previous_hash, timestamp, data, miner_address, nonce, self.difficulty)
+        with self.lock:
+            if len(self.blocks) != height:
+                # Another block landed while mining; this one is stale
+                return None
+            self.blocks.append(block)
+            miner.balance += BLOCK_REWARD
+            miner.blocks_mined += 1
+        logger.info(f"Block {height} mined by {miner.username}: {block_hash[:16]}... (nonce {nonce})")
+        return block
+    
+    def create_dead_tx(self, sender, recipient, data, tx_type='chainchat'):
+        """Record a dead TX; the oldest are evicted beyond max_dead_txs"""
+        timestamp = time.time()
+        with self.lock:
+            self.dead_txs_processed += 1
+            seed = f"{self.dead_txs_processed}:{sender}:{recipient}:{timestamp}"
+            tx_id = f"dead_{hashlib.sha256(seed.encode()).hexdigest()[:32]}"
+            dead_tx = DeadTx(tx_id, tx_type, sender, recipient, data, timestamp)
+            self.dead_txs[tx_id] = dead_tx
+            if len(self.dead_txs) > self.max_dead_txs:
+                del self.dead_txs[next(iter(self.dead_txs))]
+        return dead_tx
+    
+    def get_dead_tx(self, tx_id):
+        return self.dead_txs.get(tx_id)
+    
+    def get_system_status(self):
+        """Chain and network totals, all kept up to date incrementally"""
+        self.hosts.expire()
+        return {
+            'blocks_mined': len(self.blocks),
+            'dead_txs_processed': self.dead_txs_processed,
+            'active_hosts': self.hosts.active_count,
+            'total_hosts': len(self.hosts),
+            'total_users': len(self.users),
+            'network_throughput': self.hosts.active_bandwidth,
+            'difficulty': self.difficulty,
+            'tip': self.blocks[-1].hash if self.blocks else None
+        }
+    
+    def get_hosts_data(self, cursor=None, limit=None, active_only=False):
+        """Host totals and a page of hosts after cursor (all of them when limit is
+        None); pass next_cursor back to get the following page"""
+        self.hosts.expire()
+        counts = self.hosts.counts(locations=False)
+        page = self.hosts.list_hosts(cursor, limit, active_only)
+        return {
+            'total_hosts': counts['total'],
+            'active_hosts': counts['active'],
+            'types': counts['types'],
+            'hosts': page['hosts'],
+            'next_cursor': page['next_cursor']
+        }
+
+def create_default_system():
+    """The demo network: seed users and the reference VPN hosts"""
+    system = ZeroLinkChainReal()
+    system.add_user('alice', is_mining=True)
+    system.add_user('bob')
+    system.add_user('carol', is_mining=True)
+    system.add_host('host_001_nl', 'Amsterdam, NL', 10, 'NL', 'AS20473', 'Vultr')
+    system.add_host('host_002_de', 'Frankfurt, DE', 25, 'DE', 'AS24940', 'Hetzner')
+    system.add_host('host_003_us', 'New York, US', 5, 'US', 'AS7922', 'Comcast')
+    system.add_host('host_004_sg', 'Singapore, SG', 15, 'SG', 'AS7473', 'Singtel')
+    system.add_host('host_005_ca', 'Toronto, CA', 20, 'CA', 'AS812', 'Rogers')
+    return system
+
+zerolinkchain = create_default_system()